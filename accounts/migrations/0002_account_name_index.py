@@ -0,0 +1,21 @@
+# Generated by Django 6.0.1 on 2026-10-18 03:36
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="account",
+            index=models.Index(
+                fields=["user", "name"], name="accounts_ac_user_id_dfa6cb_idx"
+            ),
+        ),
+    ]
@@ -69,6 +69,8 @@ class Account(models.Model):
         indexes = [
             models.Index(fields=['user', 'is_active']),
             models.Index(fields=['user', 'account_type']),
+            # Reference data and choices, ordered by name
+            models.Index(fields=['user', 'name']),
         ]
 
     def __str__(self):
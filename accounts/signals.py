@@ -0,0 +1,31 @@
+"""
+Signals for the accounts app.
+
+Invalidates the owner's cached fragments (e.g. the dashboard) and refreshes
+their cached reference data (core.reference) when an account is created,
+updated, or deleted.
+"""
+
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from core.cache import bump_user_data_version_on_commit
+from core.reference import refresh_reference_data_on_commit
+
+from .models import Account
+
+
+@receiver(post_save, sender=Account)
+@receiver(post_delete, sender=Account)
+def invalidate_user_cache_on_account_change(sender, instance, **kwargs):
+    """
+    Bump the owner's data version and refresh their cached reference data
+    after an account is saved or deleted.
+
+    Args:
+        sender: The model class (Account)
+        instance: The Account instance being saved or deleted
+        **kwargs: Additional keyword arguments
+    """
+    bump_user_data_version_on_commit(instance.user_id)
+    refresh_reference_data_on_commit(instance.user_id)
@@ -1,3 +1,63 @@
-from django.test import TestCase
+from datetime import date, timedelta
+from decimal import Decimal
 
-# Create your tests here.
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from users.models import CustomUser
+
+from .models import Account
+from .views import BALANCE_CHART_DAYS
+
+
+class AccountBalanceChartTests(TestCase):
+    """
+    Tests for the period of the balance chart on the account detail page.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(email='chart@example.com', password='password123')
+        cls.account = Account.objects.create(
+            user=cls.user,
+            name='Conta Corrente',
+            initial_balance=Decimal('100.00'),
+            current_balance=Decimal('100.00'),
+        )
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def get_period(self, **params):
+        response = self.client.get(reverse('accounts:detail', args=[self.account.pk]), params)
+        self.assertEqual(response.status_code, 200)
+        return response.context['date_from'], response.context['date_to']
+
+    def test_selected_period_is_kept(self):
+        date_to = date.today() - timedelta(days=10)
+        date_from = date_to - timedelta(days=30)
+
+        self.assertEqual(
+            self.get_period(date_from=date_from.isoformat(), date_to=date_to.isoformat()),
+            (date_from, date_to),
+        )
+
+    @override_settings(BALANCE_CHART_MAX_DAYS=365)
+    def test_long_periods_fall_back_to_the_default(self):
+        today = date.today()
+        default = (today - timedelta(days=BALANCE_CHART_DAYS - 1), today)
+
+        self.assertEqual(self.get_period(date_from='0001-01-01', date_to='9999-12-31'), default)
+        self.assertEqual(
+            self.get_period(date_from=(today - timedelta(days=365)).isoformat()),
+            default,
+        )
+
+    def test_period_ends_today_at_the_latest(self):
+        today = date.today()
+
+        self.assertEqual(
+            self.get_period(date_from=(today - timedelta(days=5)).isoformat(), date_to=date.max.isoformat()),
+            (today - timedelta(days=5), today),
+        )
+        self.assertEqual(self.get_period(date_from=date.max.isoformat(), date_to=date.max.isoformat()), (today, today))
@@ -1,3 +1,6 @@
+from datetime import date, timedelta
+
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.contrib.messages.views import SuccessMessageMixin
@@ -5,10 +8,20 @@ from django.db.models import Sum
 from django.urls import reverse_lazy
 from django.views.generic import ListView, CreateView, UpdateView, DeleteView, DetailView
 
+from transactions.snapshots import get_balance_series
+
 from .forms import AccountForm
 from .models import Account
 
 
+# Days shown by the balance chart when no period is selected
+BALANCE_CHART_DAYS = 90
+
+# Size of the balance chart drawing area (SVG user units)
+BALANCE_CHART_WIDTH = 600
+BALANCE_CHART_HEIGHT = 200
+
+
 class AccountListView(LoginRequiredMixin, ListView):
     """
     Display list of user's bank accounts.
@@ -130,6 +143,7 @@ class AccountDetailView(LoginRequiredMixin, UserPassesTestMixin, DetailView):
     """
     Display detailed information about a bank account.
     Verifies that the user owns this account.
+    Includes a daily balance chart for a period, read from the balance snapshots.
     Future: Will include list of transactions for this account.
     """
     model = Account
@@ -142,3 +156,72 @@ class AccountDetailView(LoginRequiredMixin, UserPassesTestMixin, DetailView):
         """
         account = self.get_object()
         return account.user == self.request.user
+
+    def get_chart_period(self):
+        """
+        Return (date_from, date_to) from GET parameters.
+        Defaults to the last BALANCE_CHART_DAYS days. The period ends today at
+        the latest, and periods longer than settings.BALANCE_CHART_MAX_DAYS
+        fall back to the default.
+        """
+        today = date.today()
+        default = (today - timedelta(days=BALANCE_CHART_DAYS - 1), today)
+        date_from, date_to = default
+
+        try:
+            if self.request.GET.get('date_from'):
+                date_from = date.fromisoformat(self.request.GET['date_from'])
+            if self.request.GET.get('date_to'):
+                date_to = date.fromisoformat(self.request.GET['date_to'])
+        except ValueError:
+            return default
+
+        date_from = min(date_from, today)
+        date_to = min(date_to, today)
+        if date_from > date_to:
+            date_from, date_to = date_to, date_from
+
+        if (date_to - date_from).days >= settings.BALANCE_CHART_MAX_DAYS:
+            return default
+
+        return date_from, date_to
+
+    def get_balance_chart(self, series):
+        """
+        Scale a (date, balance) series into SVG polyline points.
+        """
+        balances = [balance for _, balance in series]
+        lowest = min(balances)
+        highest = max(balances)
+        spread = (highest - lowest) or 1
+        step = BALANCE_CHART_WIDTH / max(len(series) - 1, 1)
+
+        points = ' '.join(
+            f'{index * step:.1f},{BALANCE_CHART_HEIGHT - float((balance - lowest) / spread) * BALANCE_CHART_HEIGHT:.1f}'
+            for index, balance in enumerate(balances)
+        )
+
+        return {
+            'points': points,
+            'width': BALANCE_CHART_WIDTH,
+            'height': BALANCE_CHART_HEIGHT,
+            'lowest': lowest,
+            'highest': highest,
+            'opening': balances[0],
+            'closing': balances[-1],
+        }
+
+    def get_context_data(self, **kwargs):
+        """
+        Add the balance chart for the selected period to context.
+        """
+        context = super().get_context_data(**kwargs)
+
+        date_from, date_to = self.get_chart_period()
+        series = get_balance_series(self.object, date_from, date_to)
+
+        context['balance_chart'] = self.get_balance_chart(series)
+        context['date_from'] = date_from
+        context['date_to'] = date_to
+
+        return context
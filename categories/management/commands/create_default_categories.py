@@ -1,14 +1,18 @@
 from django.core.management.base import BaseCommand
 from django.contrib.auth import get_user_model
 
-from categories.utils import create_default_categories_for_user
+from categories.utils import DEFAULT_CATEGORY_BATCH_SIZE, create_default_categories_for_users
 
 
 User = get_user_model()
 
 
 class Command(BaseCommand):
-    help = 'Creates default income and expense categories for users'
+    help = (
+        'Creates default income and expense categories for users. Users are processed '
+        'in chunks: one query finds the categories each chunk already has and one bulk '
+        'insert creates the missing ones.'
+    )
 
     def add_arguments(self, parser):
         parser.add_argument(
@@ -16,50 +20,41 @@ class Command(BaseCommand):
             type=int,
             help='Create categories for a specific user ID. If not provided, creates for all users without default categories.'
         )
+        parser.add_argument(
+            '--batch_size',
+            type=int,
+            default=DEFAULT_CATEGORY_BATCH_SIZE,
+            help=f'Number of users processed per chunk (default: {DEFAULT_CATEGORY_BATCH_SIZE}).'
+        )
 
     def handle(self, *args, **options):
         user_id = options.get('user_id')
+        batch_size = options['batch_size']
 
         # Get users to process
         if user_id:
-            try:
-                users = [User.objects.get(pk=user_id)]
-                self.stdout.write(f'Processing user ID: {user_id}')
-            except User.DoesNotExist:
+            if not User.objects.filter(pk=user_id).exists():
                 self.stdout.write(
                     self.style.ERROR(f'User with ID {user_id} does not exist')
                 )
                 return
+            self.stdout.write(f'Processing user ID: {user_id}')
+            chunks = [[user_id]]
         else:
-            users = User.objects.all()
-            self.stdout.write(f'Processing all users ({users.count()} total)')
+            self.stdout.write(f'Processing all users ({User.objects.count()} total)')
+            chunks = self.iter_user_id_chunks(batch_size)
 
         total_created = 0
         total_existing = 0
 
-        for user in users:
-            self.stdout.write(f'\nProcessing user: {user.email}')
-
-            created_count, existing_count = create_default_categories_for_user(user)
+        for chunk in chunks:
+            created_count, existing_count = create_default_categories_for_users(chunk, batch_size)
 
             total_created += created_count
             total_existing += existing_count
 
-            if created_count > 0:
-                self.stdout.write(
-                    self.style.SUCCESS(
-                        f'  Created {created_count} new categories'
-                    )
-                )
-            if existing_count > 0:
-                self.stdout.write(
-                    self.style.WARNING(
-                        f'  {existing_count} categories already existed'
-                    )
-                )
-
             self.stdout.write(
-                f'  Summary for {user.email}: {created_count} created, {existing_count} already existed'
+                f'  Users {chunk[0]}-{chunk[-1]}: {created_count} created, {existing_count} already existed'
             )
 
         # Final summary
@@ -69,3 +64,17 @@ class Command(BaseCommand):
                 f'TOTAL: {total_created} categories created, {total_existing} already existed'
             )
         )
+
+    def iter_user_id_chunks(self, batch_size):
+        """
+        Yield the user IDs in ascending chunks, paging by primary key.
+        """
+        last_id = 0
+        while True:
+            chunk = list(
+                User.objects.filter(pk__gt=last_id).order_by('pk').values_list('pk', flat=True)[:batch_size]
+            )
+            if not chunk:
+                return
+            yield chunk
+            last_id = chunk[-1]
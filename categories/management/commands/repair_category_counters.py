@@ -0,0 +1,65 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from transactions.partitions import PartitioningError, check_no_detached_years
+from transactions.services import find_category_counter_mismatches, fix_category_counter_mismatches
+
+
+# Maximum number of mismatching categories listed in the command output
+MAX_REPORTED_MISMATCHES = 50
+
+
+class Command(BaseCommand):
+    help = (
+        'Recomputes the transaction count and total of each category from its '
+        'transactions and corrects the stored counters that drifted'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user_id',
+            type=int,
+            help='Repair categories of a specific user ID. If not provided, repairs all users.'
+        )
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Only report the categories with drifted counters, without correcting them.'
+        )
+
+    def handle(self, *args, **options):
+        # Counters still count the transactions of detached years
+        if not options['check']:
+            try:
+                check_no_detached_years(connection)
+            except PartitioningError as error:
+                raise CommandError(str(error))
+
+        user_id = options.get('user_id')
+        mismatches = find_category_counter_mismatches([user_id] if user_id else None)
+
+        for category_id, category_user_id, stored, expected in mismatches[:MAX_REPORTED_MISMATCHES]:
+            self.stdout.write(
+                self.style.WARNING(
+                    f'  Category {category_id} (user {category_user_id}): '
+                    f'stored R$ {stored[0]} ({stored[1]} transactions), '
+                    f'expected R$ {expected[0]} ({expected[1]} transactions)'
+                )
+            )
+        if len(mismatches) > MAX_REPORTED_MISMATCHES:
+            self.stdout.write(
+                self.style.WARNING(f'  ... and {len(mismatches) - MAX_REPORTED_MISMATCHES} more mismatches')
+            )
+
+        self.stdout.write('\n' + '=' * 60)
+
+        if not mismatches:
+            self.stdout.write(self.style.SUCCESS('Category counters are consistent with the transactions'))
+            return
+
+        if options['check']:
+            self.stdout.write(self.style.ERROR(f'TOTAL: {len(mismatches)} categories with drifted counters'))
+            return
+
+        updated = fix_category_counter_mismatches(mismatches)
+        self.stdout.write(self.style.SUCCESS(f'TOTAL: {updated} category counters corrected'))
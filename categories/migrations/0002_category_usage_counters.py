@@ -0,0 +1,57 @@
+# Generated by Django 6.0.1 on 2026-10-18 03:19
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def populate_counters(apps, schema_editor):
+    """Count the transactions created before this migration into each category."""
+    Category = apps.get_model("categories", "Category")
+    Transaction = apps.get_model("transactions", "Transaction")
+
+    rows = (
+        Transaction.objects.values("category_id")
+        .annotate(total=Sum("amount"), transaction_count=Count("id"))
+        .order_by()
+    )
+    Category.objects.bulk_update(
+        [
+            Category(
+                pk=row["category_id"],
+                transaction_total=row["total"],
+                transaction_count=row["transaction_count"],
+            )
+            for row in rows.iterator()
+        ],
+        ["transaction_total", "transaction_count"],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("categories", "0001_initial"),
+        ("transactions", "0005_dailybalancesnapshot"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="category",
+            name="transaction_count",
+            field=models.IntegerField(
+                default=0, verbose_name="Quantidade de transações"
+            ),
+        ),
+        migrations.AddField(
+            model_name="category",
+            name="transaction_total",
+            field=models.DecimalField(
+                decimal_places=2,
+                default=0,
+                max_digits=14,
+                verbose_name="Total das transações",
+            ),
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
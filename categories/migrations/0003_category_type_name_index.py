@@ -0,0 +1,26 @@
+# Generated by Django 6.0.1 on 2026-10-18 03:36
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("categories", "0002_category_usage_counters"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="category",
+            name="categories__user_id_f0c68e_idx",
+        ),
+        migrations.AddIndex(
+            model_name="category",
+            index=models.Index(
+                fields=["user", "category_type", "name"],
+                name="categories__user_id_60a575_idx",
+            ),
+        ),
+    ]
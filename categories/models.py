@@ -10,6 +10,9 @@ class Category(models.Model):
     INCOME = 'income'
     EXPENSE = 'expense'
 
+    # Fields only changed by F() updates of the transaction write path
+    COUNTER_FIELDS = ('transaction_count', 'transaction_total')
+
     CATEGORY_TYPE_CHOICES = [
         (INCOME, 'Receita'),
         (EXPENSE, 'Despesa'),
@@ -41,6 +44,18 @@ class Category(models.Model):
         verbose_name='Categoria padrão',
         help_text='Categorias padrão não podem ser excluídas'
     )
+    # Denormalized usage, kept in sync by the transaction write path
+    # (see transactions.services.apply_category_deltas)
+    transaction_count = models.IntegerField(
+        default=0,
+        verbose_name='Quantidade de transações'
+    )
+    transaction_total = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0,
+        verbose_name='Total das transações'
+    )
     created_at = models.DateTimeField(
         auto_now_add=True,
         verbose_name='Criado em'
@@ -56,8 +71,24 @@ class Category(models.Model):
         verbose_name_plural = 'Categorias'
         unique_together = ['user', 'name']
         indexes = [
-            models.Index(fields=['user', 'category_type']),
+            # Also serves the reference data and choices, ordered by type and name
+            models.Index(fields=['user', 'category_type', 'name']),
         ]
 
     def __str__(self):
         return f'{self.name} ({self.get_category_type_display()})'
+
+    def save(self, *args, **kwargs):
+        """
+        Save the category without writing back its usage counters.
+
+        The counters held by this instance were read when it was loaded, and
+        transactions written since then have moved the stored ones, so a full
+        save of an existing row (edit form, admin) leaves them out.
+        """
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.COUNTER_FIELDS
+            ]
+        super().save(*args, **kwargs)
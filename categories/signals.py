@@ -0,0 +1,31 @@
+"""
+Signals for the categories app.
+
+Invalidates the owner's cached fragments (e.g. the dashboard) and refreshes
+their cached reference data (core.reference) when a category is created,
+updated, or deleted.
+"""
+
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from core.cache import bump_user_data_version_on_commit
+from core.reference import refresh_reference_data_on_commit
+
+from .models import Category
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_user_cache_on_category_change(sender, instance, **kwargs):
+    """
+    Bump the owner's data version and refresh their cached reference data
+    after a category is saved or deleted.
+
+    Args:
+        sender: The model class (Category)
+        instance: The Category instance being saved or deleted
+        **kwargs: Additional keyword arguments
+    """
+    bump_user_data_version_on_commit(instance.user_id)
+    refresh_reference_data_on_commit(instance.user_id)
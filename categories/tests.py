@@ -1,3 +1,67 @@
+from datetime import date
+from decimal import Decimal
+
 from django.test import TestCase
 
-# Create your tests here.
+from accounts.models import Account
+from transactions.models import Transaction
+from users.models import CustomUser
+
+from .forms import CategoryForm
+from .models import Category
+from .utils import create_default_categories_for_users, get_default_categories
+
+
+class DefaultCategoriesTests(TestCase):
+    """
+    Tests for the bulk provisioning of default categories.
+    """
+
+    def test_provisions_users_over_several_chunks(self):
+        users = [
+            CustomUser.objects.create_user(email=f'defaults{index}@example.com', password='password123')
+            for index in range(3)
+        ]
+        user_ids = [user.pk for user in users]
+        # Signup already provisions the defaults; drop some so every chunk has work
+        Category.objects.filter(user_id__in=user_ids, name='Lazer').delete()
+        default_count = len(get_default_categories())
+
+        created, existing = create_default_categories_for_users(user_ids, batch_size=1)
+
+        self.assertEqual((created, existing), (3, 3 * (default_count - 1)))
+        for user_id in user_ids:
+            self.assertEqual(Category.objects.filter(user_id=user_id).count(), default_count)
+
+
+class CategoryCounterSaveTests(TestCase):
+    """
+    Tests that saving a category does not overwrite its usage counters.
+    """
+
+    def test_edit_keeps_counters_moved_by_concurrent_writes(self):
+        user = CustomUser.objects.create_user(email='counters-save@example.com', password='password123')
+        category = Category.objects.create(user=user, name='Mercado', category_type=Category.EXPENSE)
+        # The edit page loaded the category before the transaction was written
+        stale = Category.objects.get(pk=category.pk)
+        Transaction.objects.create(
+            user=user,
+            account=Account.objects.create(user=user, name='Conta Corrente'),
+            category=category,
+            description='Compras',
+            amount=Decimal('30.00'),
+            transaction_type=Transaction.EXPENSE,
+            transaction_date=date.today(),
+        )
+
+        form = CategoryForm(
+            data={'name': 'Supermercado', 'category_type': Category.EXPENSE, 'color': '#123456'},
+            instance=stale,
+            user=user,
+        )
+        self.assertTrue(form.is_valid(), form.errors)
+        form.save()
+
+        category.refresh_from_db()
+        self.assertEqual(category.name, 'Supermercado')
+        self.assertEqual((category.transaction_count, category.transaction_total), (1, Decimal('30.00')))
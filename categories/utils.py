@@ -2,6 +2,11 @@
 Utility functions for the categories app.
 """
 
+from django.db import transaction
+
+from core.cache import bump_user_data_version_on_commit
+from core.reference import refresh_reference_data_on_commit
+
 from .models import Category
 
 
@@ -25,49 +30,118 @@ DEFAULT_EXPENSE_CATEGORIES = [
 ]
 
 
-def create_default_categories_for_user(user):
+# Number of users provisioned per existence query and bulk insert
+DEFAULT_CATEGORY_BATCH_SIZE = 1000
+
+
+def get_default_categories():
     """
-    Create default income and expense categories for a user.
+    Return the default categories as (name, category_type, color) tuples.
+
+    Names are unique per user, so a name listed under both types ('Outros')
+    is only created with the first type, as the income one.
+    """
+    defaults = {}
+    for category_type, categories in (
+        (Category.INCOME, DEFAULT_INCOME_CATEGORIES),
+        (Category.EXPENSE, DEFAULT_EXPENSE_CATEGORIES),
+    ):
+        for cat_data in categories:
+            defaults.setdefault(cat_data['name'], (cat_data['name'], category_type, cat_data['color']))
+
+    return list(defaults.values())
+
+
+def build_default_categories(user_id, exclude_names=()):
+    """
+    Build (without saving) the default Category instances of a user.
 
     Args:
-        user: The User instance to create categories for
+        user_id: The ID of the user owning the categories
+        exclude_names: Names the user already has
+
+    Returns:
+        list: Unsaved Category instances
+    """
+    return [
+        Category(user_id=user_id, name=name, category_type=category_type, color=color, is_default=True)
+        for name, category_type, color in get_default_categories()
+        if name not in exclude_names
+    ]
+
+
+def create_default_categories_for_new_user(user):
+    """
+    Create the default categories of a user that was just created, in one INSERT.
+
+    A new user has no categories yet, so the existence check is skipped;
+    a conflicting row is ignored by the (user, name) unique constraint.
+
+    Args:
+        user: The newly created User instance
+    """
+    Category.objects.bulk_create(build_default_categories(user.pk), ignore_conflicts=True)
+    # Drop any reference data cached under a reused user ID, without querying
+    refresh_reference_data_on_commit(user.pk, preload=False)
+
+
+def create_default_categories_for_users(user_ids, batch_size=DEFAULT_CATEGORY_BATCH_SIZE):
+    """
+    Create the missing default categories for many users.
+
+    Each chunk of users costs one query to find the (user, name) pairs that
+    already exist and one bulk INSERT for the missing ones. Conflicts with
+    rows created concurrently are ignored by the (user, name) unique
+    constraint, in which case they are still counted as created.
+
+    Args:
+        user_ids: IDs of the users to provision
+        batch_size: Number of users handled per chunk
 
     Returns:
         tuple: (created_count, existing_count) - number of categories created vs. already existing
     """
+    user_ids = list(user_ids)
+    names = [name for name, _, _ in get_default_categories()]
     created_count = 0
     existing_count = 0
 
-    # Create income categories
-    for cat_data in DEFAULT_INCOME_CATEGORIES:
-        _, created = Category.objects.get_or_create(
-            user=user,
-            name=cat_data['name'],
-            defaults={
-                'category_type': Category.INCOME,
-                'color': cat_data['color'],
-                'is_default': True,
-            }
-        )
-        if created:
-            created_count += 1
-        else:
-            existing_count += 1
-
-    # Create expense categories
-    for cat_data in DEFAULT_EXPENSE_CATEGORIES:
-        _, created = Category.objects.get_or_create(
-            user=user,
-            name=cat_data['name'],
-            defaults={
-                'category_type': Category.EXPENSE,
-                'color': cat_data['color'],
-                'is_default': True,
-            }
-        )
-        if created:
-            created_count += 1
-        else:
-            existing_count += 1
+    for start in range(0, len(user_ids), batch_size):
+        chunk = user_ids[start:start + batch_size]
+
+        existing = {}
+        for user_id, name in Category.objects.filter(
+            user_id__in=chunk,
+            name__in=names,
+        ).values_list('user_id', 'name'):
+            existing.setdefault(user_id, set()).add(name)
+
+        new_categories = []
+        for user_id in chunk:
+            new_categories.extend(build_default_categories(user_id, existing.get(user_id, ())))
+
+        if new_categories:
+            with transaction.atomic():
+                Category.objects.bulk_create(new_categories, ignore_conflicts=True)
+                # bulk_create skips the post_save signal that invalidates the cache
+                provisioned_ids = {category.user_id for category in new_categories}
+                bump_user_data_version_on_commit(*provisioned_ids)
+                refresh_reference_data_on_commit(*provisioned_ids)
+
+        created_count += len(new_categories)
+        existing_count += sum(len(item) for item in existing.values())
 
     return created_count, existing_count
+
+
+def create_default_categories_for_user(user):
+    """
+    Create default income and expense categories for a user.
+
+    Args:
+        user: The User instance to create categories for
+
+    Returns:
+        tuple: (created_count, existing_count) - number of categories created vs. already existing
+    """
+    return create_default_categories_for_users([user.pk])
@@ -1,6 +1,7 @@
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.contrib.messages.views import SuccessMessageMixin
+from django.db.models import ProtectedError
 from django.shortcuts import redirect
 from django.urls import reverse_lazy
 from django.views.generic import ListView, CreateView, UpdateView, DeleteView
@@ -125,7 +126,7 @@ class CategoryDeleteView(LoginRequiredMixin, UserPassesTestMixin, SuccessMessage
     Delete a transaction category.
     Verifies that the user owns this category before allowing deletion.
     Does NOT allow deleting if is_default = True.
-    Checks if category has linked transactions (future: when Transaction model exists).
+    Does NOT allow deleting categories with linked transactions.
     """
     model = Category
     template_name = 'categories/category_confirm_delete.html'
@@ -155,25 +156,28 @@ class CategoryDeleteView(LoginRequiredMixin, UserPassesTestMixin, SuccessMessage
 
         return super().dispatch(request, *args, **kwargs)
 
-    def delete(self, request, *args, **kwargs):
+    def form_valid(self, form):
         """
-        Override delete to check for linked transactions and add success message.
+        Block deletion of categories with linked transactions and add success message.
+        Uses the denormalized transaction_count, so no transaction is scanned;
+        the PROTECT foreign key still guards against a drifted counter.
         SuccessMessageMixin doesn't work with DeleteView by default.
         """
-        category = self.get_object()
+        category = self.object
+        linked_message = (
+            'Esta categoria não pode ser excluída pois possui transações vinculadas. '
+            'Exclua ou mova as transações primeiro.'
+        )
 
-        # TODO: When Transaction model exists, uncomment this validation
-        # Check if category has linked transactions
-        # if category.transactions.exists():
-        #     messages.error(
-        #         request,
-        #         'Esta categoria não pode ser excluída pois possui transações vinculadas. '
-        #         'Exclua ou mova as transações primeiro.'
-        #     )
-        #     return redirect('categories:list')
+        if category.transaction_count > 0:
+            messages.error(self.request, linked_message)
+            return redirect('categories:list')
 
-        # For now, just add a placeholder comment since Transaction model doesn't exist yet
-        # Future implementation will query: category.transactions.exists()
+        try:
+            response = super().form_valid(form)
+        except ProtectedError:
+            messages.error(self.request, linked_message)
+            return redirect('categories:list')
 
         messages.success(self.request, self.success_message)
-        return super().delete(request, *args, **kwargs)
+        return response
@@ -0,0 +1,150 @@
+"""
+Synthetic data for the benchmark commands.
+
+generate_benchmark_data creates throwaway users with realistic amounts of
+accounts, categories and transactions. The data is drawn from a seeded
+random generator, so two runs with the same arguments produce the same
+accounts, amounts and dates. Benchmark users are recognized by their
+e-mail domain and removed with delete_benchmark_users.
+"""
+
+import random
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+
+from accounts.models import Account
+from categories.models import Category
+from transactions.models import Transaction
+from transactions.services import bulk_insert_transactions, delete_transaction_rows
+
+
+User = get_user_model()
+
+# Domain of every user created by the benchmarks
+BENCHMARK_EMAIL_DOMAIN = 'benchmark.invalid'
+
+# Account types with their relative frequency and initial balance range (in reais)
+ACCOUNT_PROFILES = [
+    (Account.CHECKING, 6, (500, 10000)),
+    (Account.SAVINGS, 3, (1000, 50000)),
+    (Account.INVESTMENT, 1, (5000, 200000)),
+]
+
+# Share of expenses among the generated transactions
+EXPENSE_RATIO = 0.8
+
+# Descriptions used for the generated transactions, per type
+DESCRIPTIONS = {
+    Transaction.INCOME: ['Salário', 'Projeto freelance', 'Rendimentos', 'Reembolso'],
+    Transaction.EXPENSE: [
+        'Supermercado', 'Restaurante', 'Combustível', 'Aluguel', 'Farmácia',
+        'Cinema', 'Conta de luz', 'Internet', 'Uber', 'Curso online',
+    ],
+}
+
+
+def get_benchmark_email(run_id, index):
+    """
+    Return the e-mail of the index-th benchmark user of a run.
+    """
+    return f'{run_id}-{index}@{BENCHMARK_EMAIL_DOMAIN}'
+
+
+def new_run_id():
+    """
+    Return a unique prefix for the users of one benchmark run.
+    """
+    return f'benchmark-{uuid.uuid4().hex[:8]}'
+
+
+def generate_benchmark_data(user_count, transactions_per_user, seed=0, max_accounts=3, history_days=730):
+    """
+    Create benchmark users with accounts, categories and transactions.
+
+    Each user gets the default categories (provisioned on signup), between
+    one and max_accounts accounts and transactions_per_user transactions
+    spread over the last history_days days, inserted in bulk. Incomes are
+    fewer and larger than expenses.
+
+    Args:
+        user_count: Number of users to create
+        transactions_per_user: Number of transactions per user
+        seed: Seed of the random generator, for reproducible data
+        max_accounts: Maximum number of accounts per user
+        history_days: How far back transaction dates go
+
+    Returns:
+        list: The created User instances
+    """
+    rng = random.Random(seed)
+    run_id = new_run_id()
+    today = date.today()
+    users = []
+
+    account_types = [account_type for account_type, _, _ in ACCOUNT_PROFILES]
+    account_weights = [weight for _, weight, _ in ACCOUNT_PROFILES]
+    balance_ranges = {account_type: balance_range for account_type, _, balance_range in ACCOUNT_PROFILES}
+
+    for index in range(user_count):
+        user = User.objects.create_user(email=get_benchmark_email(run_id, index))
+
+        accounts = []
+        for account_index in range(rng.randint(1, max_accounts)):
+            account_type = rng.choices(account_types, account_weights)[0]
+            initial_balance = Decimal(rng.randint(*balance_ranges[account_type]))
+            accounts.append(Account.objects.create(
+                user=user,
+                name=f'Conta {account_index + 1}',
+                account_type=account_type,
+                initial_balance=initial_balance,
+                current_balance=initial_balance,
+            ))
+
+        categories = {Transaction.INCOME: [], Transaction.EXPENSE: []}
+        for category in Category.objects.filter(user=user).order_by('pk'):
+            categories[category.category_type].append(category)
+
+        transactions = []
+        for _ in range(transactions_per_user):
+            if rng.random() < EXPENSE_RATIO:
+                transaction_type = Transaction.EXPENSE
+                amount = Decimal(rng.randint(500, 50000)) / 100
+            else:
+                transaction_type = Transaction.INCOME
+                amount = Decimal(rng.randint(50000, 1000000)) / 100
+
+            transactions.append(Transaction(
+                user=user,
+                account=rng.choice(accounts),
+                category=rng.choice(categories[transaction_type]),
+                transaction_type=transaction_type,
+                amount=amount,
+                transaction_date=today - timedelta(days=rng.randint(0, history_days)),
+                description=rng.choice(DESCRIPTIONS[transaction_type]),
+            ))
+        bulk_insert_transactions(transactions)
+
+        users.append(user)
+
+    return users
+
+
+def delete_benchmark_users(users=None):
+    """
+    Delete benchmark users with all their data.
+
+    Args:
+        users: The users to delete (default: every user in BENCHMARK_EMAIL_DOMAIN,
+               e.g. leftovers of an interrupted run)
+    """
+    if users is None:
+        users = User.objects.filter(email__endswith=f'@{BENCHMARK_EMAIL_DOMAIN}')
+    user_ids = [user.pk for user in users]
+
+    # Categories protect their transactions, so those have to go first. The per-row
+    # delete signals are skipped: accounts and rollups are deleted with the users.
+    delete_transaction_rows(list(Transaction.objects.filter(user_id__in=user_ids).values_list('pk', flat=True)))
+    User.objects.filter(pk__in=user_ids).delete()
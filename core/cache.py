@@ -0,0 +1,94 @@
+"""
+Per-user cache helpers.
+
+Every user has a data version stored in Django's cache. Cache keys for
+user-specific fragments embed that version, so bumping it whenever the
+user's transactions, accounts or categories change makes all previously
+cached fragments unreachable at once: no stale reads and no time-based
+expiry.
+"""
+
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+
+USER_DATA_VERSION_KEY = 'user-data-version:{user_id}'
+
+
+def _new_version():
+    """
+    Return a fresh version number.
+    Time-based, so a version key evicted from the cache is never recreated
+    with a value that older fragments were cached under.
+    """
+    return time.time_ns()
+
+
+def get_user_data_version(user_id):
+    """
+    Return the current data version of a user, creating it if needed.
+    """
+    key = USER_DATA_VERSION_KEY.format(user_id=user_id)
+    version = cache.get(key)
+    if version is None:
+        version = _new_version()
+        if not cache.add(key, version, timeout=None):
+            version = cache.get(key, version)
+    return version
+
+
+async def aget_user_data_version(user_id):
+    """
+    Async version of get_user_data_version.
+    """
+    key = USER_DATA_VERSION_KEY.format(user_id=user_id)
+    version = await cache.aget(key)
+    if version is None:
+        version = _new_version()
+        if not await cache.aadd(key, version, timeout=None):
+            version = await cache.aget(key, version)
+    return version
+
+
+def bump_user_data_version(user_id):
+    """
+    Invalidate every cached fragment of a user by moving to a new data version.
+
+    Every bump writes a fresh version instead of incrementing the current
+    one: incr() is a read followed by a write on several backends, so two
+    concurrent bumps could both write the same v+1, and a fragment cached
+    under it between them would survive the second write.
+    """
+    key = USER_DATA_VERSION_KEY.format(user_id=user_id)
+    cache.set(key, _new_version(), timeout=None)
+
+
+def bump_user_data_version_on_commit(*user_ids):
+    """
+    Bump the data version of the given users once the current transaction commits.
+    Bumping after commit prevents a concurrent request from caching pre-commit data
+    under the new version.
+    """
+    for user_id in set(user_ids):
+        if user_id is not None:
+            transaction.on_commit(lambda user_id=user_id: bump_user_data_version(user_id))
+
+
+def get_user_cache_key(user_id, *parts):
+    """
+    Build a cache key for a user-specific fragment, bound to the user's data version.
+    """
+    version = get_user_data_version(user_id)
+    suffix = ':'.join(str(part) for part in parts)
+    return f'user:{user_id}:v{version}:{suffix}'
+
+
+async def aget_user_cache_key(user_id, *parts):
+    """
+    Async version of get_user_cache_key.
+    """
+    version = await aget_user_data_version(user_id)
+    suffix = ':'.join(str(part) for part in parts)
+    return f'user:{user_id}:v{version}:{suffix}'
@@ -0,0 +1,35 @@
+"""
+System checks for the core app.
+"""
+
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+
+# Cache backends whose entries are not shared between processes or hosts
+LOCAL_CACHE_BACKENDS = {
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.filebased.FileBasedCache',
+    'django.core.cache.backends.dummy.DummyCache',
+}
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """
+    Require a cache shared by every process and host in deployments.
+
+    The per-user data versions (see core.cache) must be seen by every
+    worker: with a per-process or per-host cache, a write served by one
+    worker leaves the others serving fragments cached before it.
+    """
+    backend = settings.CACHES['default']['BACKEND']
+    if backend not in LOCAL_CACHE_BACKENDS:
+        return []
+    return [
+        Error(
+            f'The default cache ({backend}) is not shared between processes and hosts.',
+            hint='Use the database cache or Redis (see CACHE_BACKEND in core/settings.py).',
+            id='core.E001',
+        )
+    ]
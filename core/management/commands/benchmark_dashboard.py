@@ -0,0 +1,190 @@
+import asyncio
+import json
+import random
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+from asgiref.sync import sync_to_async
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.test import AsyncRequestFactory, RequestFactory, override_settings
+
+from core.benchmarks import delete_benchmark_users, generate_benchmark_data
+from core.views import AsyncDashboardView, DashboardView
+
+DUMMY_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Compares dashboard latency between the WSGI path (DashboardView on a pool of '
+        'worker threads) and the ASGI path (AsyncDashboardView on one event loop) with '
+        'many concurrent users. Each simulated user sends its requests one after another; '
+        'latency includes the time spent waiting for a free worker. The dashboard cache '
+        'is disabled unless --cache is given, so every request runs its queries.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--users',
+            type=int,
+            default=200,
+            help='Number of concurrent users (default: 200).'
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=5,
+            help='Number of requests sent by each user (default: 5).'
+        )
+        parser.add_argument(
+            '--threads',
+            type=int,
+            default=8,
+            help='Worker threads serving the WSGI path (default: 8).'
+        )
+        parser.add_argument(
+            '--accounts',
+            type=int,
+            default=20,
+            help='Number of seeded benchmark users the requests are spread over (default: 20).'
+        )
+        parser.add_argument(
+            '--transactions',
+            type=int,
+            default=2000,
+            help='Number of transactions seeded for each benchmark user (default: 2000).'
+        )
+        parser.add_argument(
+            '--cache',
+            action='store_true',
+            help='Keep the dashboard cache enabled.'
+        )
+        parser.add_argument(
+            '--output',
+            help='Write the results as JSON to this file.'
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f'Seeding {options["accounts"]} benchmark users with {options["transactions"]} transactions each'
+        )
+        users = generate_benchmark_data(options['accounts'], options['transactions'])
+
+        try:
+            with override_settings(**({} if options['cache'] else {'CACHES': DUMMY_CACHES})):
+                self.stdout.write(
+                    f'WSGI: {options["users"]} users x {options["requests"]} requests '
+                    f'on {options["threads"]} threads'
+                )
+                wsgi = self.run_wsgi(users, options['users'], options['requests'], options['threads'])
+
+                self.stdout.write(f'ASGI: {options["users"]} users x {options["requests"]} requests')
+                asgi = self.run_asgi(users, options['users'], options['requests'])
+        finally:
+            delete_benchmark_users(users)
+
+        report = {'wsgi': wsgi, 'asgi': asgi}
+
+        self.stdout.write('\n' + '=' * 60)
+        for path, stats in report.items():
+            self.stdout.write(
+                f'  {path.upper()}: p50 {stats["p50_ms"]} ms, p99 {stats["p99_ms"]} ms, '
+                f'max {stats["max_ms"]} ms, {stats["throughput"]} req/s, {stats["failed"]} failed'
+            )
+
+        style = self.style.ERROR if wsgi['failed'] or asgi['failed'] else self.style.SUCCESS
+        self.stdout.write(
+            style(
+                f'TOTAL: ASGI p50 {self.format_change(wsgi["p50_ms"], asgi["p50_ms"])}, '
+                f'p99 {self.format_change(wsgi["p99_ms"], asgi["p99_ms"])} compared to WSGI'
+            )
+        )
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output_file:
+                json.dump(report, output_file, indent=2)
+            self.stdout.write(f'\nResults written to {options["output"]}')
+
+    def get_query(self):
+        """
+        Return the GET parameters of a dashboard request for a random period.
+        """
+        today = date.today()
+        return {
+            'period': 'custom',
+            'date_from': (today - timedelta(days=random.randint(30, 365))).isoformat(),
+            'date_to': today.isoformat(),
+        }
+
+    def run_wsgi(self, users, concurrency, requests_per_user, threads):
+        factory = RequestFactory()
+        view = DashboardView.as_view()
+
+        def handle_request(user):
+            request = factory.get('/dashboard/', self.get_query())
+            request.user = user
+            response = view(request)
+            response.render()
+            # Same connection handling as the end of a request
+            close_old_connections()
+            return response.status_code
+
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            async def simulate_user(user, samples):
+                loop = asyncio.get_running_loop()
+                for _ in range(requests_per_user):
+                    started = time.perf_counter()
+                    status = await loop.run_in_executor(pool, handle_request, user)
+                    samples.append((time.perf_counter() - started, status != 200))
+
+            return asyncio.run(self.simulate(users, concurrency, simulate_user))
+
+    def run_asgi(self, users, concurrency, requests_per_user):
+        factory = AsyncRequestFactory()
+        view = AsyncDashboardView.as_view()
+
+        async def simulate_user(user, samples):
+            for _ in range(requests_per_user):
+                started = time.perf_counter()
+                request = factory.get('/dashboard/', self.get_query())
+                request.user = user
+                request.auser = lambda user=user: self.resolve_user(user)
+                response = await view(request)
+                # ASGIHandler renders template responses in a thread as well
+                await sync_to_async(response.render)()
+                samples.append((time.perf_counter() - started, response.status_code != 200))
+
+        return asyncio.run(self.simulate(users, concurrency, simulate_user))
+
+    async def resolve_user(self, user):
+        return user
+
+    async def simulate(self, users, concurrency, simulate_user):
+        """
+        Run concurrency simulated users at the same time and summarize their latencies.
+        """
+        samples = []
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            simulate_user(users[index % len(users)], samples)
+            for index in range(concurrency)
+        ))
+        elapsed = time.perf_counter() - started
+
+        latencies = sorted(seconds * 1000 for seconds, _ in samples)
+        return {
+            'requests': len(samples),
+            'failed': sum(1 for _, failed in samples if failed),
+            'p50_ms': round(statistics.median(latencies), 2),
+            'p99_ms': round(latencies[max(int(len(latencies) * 0.99) - 1, 0)], 2),
+            'max_ms': round(latencies[-1], 2),
+            'throughput': round(len(samples) / elapsed, 1),
+        }
+
+    def format_change(self, before, after):
+        return f'{(after - before) / before:+.0%}' if before else 'n/a'
@@ -0,0 +1,284 @@
+import json
+import re
+from datetime import date, timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from core.benchmarks import delete_benchmark_users, generate_benchmark_data
+from transactions.models import Transaction
+from transactions.pagination import BACKWARD, FORWARD, encode_cursor
+from transactions.views import TransactionListView
+
+
+User = get_user_model()
+
+DUMMY_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+}
+
+# Apps whose tables are checked; queries touching only other tables are skipped
+PROJECT_APPS = ['accounts', 'categories', 'profiles', 'transactions', 'users']
+
+# Maximum length of the SQL printed for a flagged query
+MAX_PRINTED_SQL_LENGTH = 300
+
+SQLITE_FULL_SCAN = re.compile(r'^SCAN (\w+)$')
+SQLITE_TEMP_SORT = re.compile(r'^USE TEMP B-TREE FOR (.+)$')
+
+
+class QueryCollector:
+    """
+    Database execute wrapper that keeps the SELECT statements with their parameters.
+    """
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        if not many and sql.lstrip().upper().startswith('SELECT'):
+            self.queries.append((sql, params))
+        return execute(sql, params, many, context)
+
+
+class Command(BaseCommand):
+    help = (
+        'Index advisor for the finanpy read paths. Requests the dashboard (each period), '
+        'the transaction list (each filter, search and the next keyset page) and the '
+        'transaction form, which renders the filter and form choices, with the cache '
+        'disabled. Every SELECT on the project tables is explained (EXPLAIN QUERY PLAN on '
+        'SQLite, EXPLAIN on PostgreSQL) and full table scans and temporary sorts are '
+        'flagged. Uses the data of --user_id, or seeds benchmark users when omitted.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user_id',
+            type=int,
+            help='Explain the queries of an existing user instead of seeding benchmark data.'
+        )
+        parser.add_argument(
+            '--users',
+            type=int,
+            default=3,
+            help='Number of seeded benchmark users, the first one being explained (default: 3).'
+        )
+        parser.add_argument(
+            '--transactions',
+            type=int,
+            default=20000,
+            help='Number of transactions seeded for each user (default: 20000).'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Seed of the data generator (default: 0).'
+        )
+        parser.add_argument(
+            '--analyze',
+            action='store_true',
+            help='Refresh the planner statistics (ANALYZE) before explaining.'
+        )
+        parser.add_argument(
+            '--scenario',
+            action='append',
+            help='Only run the given scenario (repeatable).'
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor not in ('sqlite', 'postgresql'):
+            raise CommandError(f'Unsupported database: {connection.vendor}')
+
+        self.project_tables = {
+            model._meta.db_table
+            for label in PROJECT_APPS
+            for model in apps.get_app_config(label).get_models()
+        }
+
+        seeded_users = []
+        if options['user_id']:
+            try:
+                user = User.objects.get(pk=options['user_id'])
+            except User.DoesNotExist:
+                raise CommandError(f'User with ID {options["user_id"]} does not exist')
+        else:
+            self.stdout.write(
+                f'Seeding {options["users"]} benchmark users with {options["transactions"]} '
+                f'transactions each (seed {options["seed"]})'
+            )
+            seeded_users = generate_benchmark_data(options['users'], options['transactions'], seed=options['seed'])
+            user = seeded_users[0]
+
+        scenarios = self.get_scenarios(user)
+        selected = options['scenario'] or list(scenarios)
+        unknown = set(selected) - set(scenarios)
+        if unknown:
+            delete_benchmark_users(seeded_users)
+            raise CommandError(f'Unknown scenarios: {", ".join(sorted(unknown))}')
+
+        explained = 0
+        flagged = {}
+        try:
+            if options['analyze']:
+                self.analyze()
+
+            client = Client()
+            client.force_login(user)
+            overrides = {
+                'ALLOWED_HOSTS': [*settings.ALLOWED_HOSTS, 'testserver'],
+                'CACHES': DUMMY_CACHES,
+            }
+            with override_settings(**overrides):
+                for name in selected:
+                    queries = self.collect_queries(client, scenarios[name])
+                    self.stdout.write(f'\n{name} ({len(queries)} queries)')
+                    for sql, params in queries:
+                        explained += 1
+                        plan, problems = self.explain(sql, params)
+                        if problems:
+                            flagged.setdefault(sql, (problems, []))[1].append(name)
+                            self.stdout.write(self.style.WARNING(f'  ! {"; ".join(problems)}'))
+                            self.stdout.write(f'    {sql[:MAX_PRINTED_SQL_LENGTH]}')
+                        elif options['verbosity'] >= 2:
+                            self.stdout.write(f'  ok {sql[:MAX_PRINTED_SQL_LENGTH]}')
+                        if problems or options['verbosity'] >= 2:
+                            for line in plan:
+                                self.stdout.write(f'      {line}')
+        finally:
+            delete_benchmark_users(seeded_users)
+
+        self.stdout.write('\n' + '=' * 60)
+        for sql, (problems, names) in flagged.items():
+            self.stdout.write(self.style.WARNING(f'{", ".join(problems)} in {", ".join(names)}'))
+            self.stdout.write(f'  {sql[:MAX_PRINTED_SQL_LENGTH]}')
+
+        style = self.style.WARNING if flagged else self.style.SUCCESS
+        self.stdout.write(style(f'TOTAL: {explained} queries explained, {len(flagged)} distinct queries flagged'))
+
+    def get_scenarios(self, user):
+        """
+        Return the requests to explain by name, as (url, GET parameters) pairs.
+        """
+        today = date.today()
+        list_url = reverse('transactions:list')
+        account = user.accounts.order_by('pk').first()
+        category = user.categories.filter(category_type=Transaction.EXPENSE).order_by('pk').first()
+        description = Transaction.objects.filter(user=user).values_list('description', flat=True).first() or ''
+
+        scenarios = {
+            'dashboard': (reverse('dashboard'), {}),
+            'dashboard_last_3_months': (reverse('dashboard'), {'period': 'last_3_months'}),
+            'dashboard_custom': (reverse('dashboard'), {
+                'period': 'custom',
+                'date_from': (today - timedelta(days=400)).isoformat(),
+                'date_to': (today - timedelta(days=10)).isoformat(),
+            }),
+            'transaction_list': (list_url, {}),
+            'transaction_list_next_page': (list_url, {'cursor': self.get_next_page_cursor(user)}),
+            'transaction_list_last_page': (list_url, {'cursor': encode_cursor(None, BACKWARD)}),
+            'transaction_list_offset': (list_url, {'page': 2}),
+            'transaction_list_type': (list_url, {'transaction_type': Transaction.EXPENSE}),
+            'transaction_list_dates': (list_url, {
+                'date_from': (today - timedelta(days=90)).isoformat(),
+                'date_to': today.isoformat(),
+            }),
+            'transaction_list_search': (list_url, {'q': description.split(' ')[0]}),
+            'transaction_form': (reverse('transactions:create'), {}),
+        }
+        if account:
+            scenarios['transaction_list_account'] = (list_url, {'account': account.pk})
+        if category:
+            scenarios['transaction_list_category'] = (list_url, {'category': category.pk})
+        if account and category:
+            scenarios['transaction_list_all_filters'] = (list_url, {
+                'transaction_type': Transaction.EXPENSE,
+                'account': account.pk,
+                'category': category.pk,
+                'date_from': (today - timedelta(days=365)).isoformat(),
+                'date_to': today.isoformat(),
+            })
+        return scenarios
+
+    def get_next_page_cursor(self, user):
+        """
+        Return the keyset cursor of the second page of the user's transaction list.
+        """
+        last = (
+            Transaction.objects.filter(user=user)
+            .order_by('-transaction_date', '-created_at', '-id')
+            .values_list('transaction_date', 'created_at', 'id')[TransactionListView.paginate_by - 1:]
+            .first()
+        )
+        return encode_cursor(last, FORWARD) if last else ''
+
+    def collect_queries(self, client, scenario):
+        """
+        Send the scenario's request and return its distinct SELECTs on project tables.
+        """
+        url, params = scenario
+        collector = QueryCollector()
+        with connection.execute_wrapper(collector):
+            response = client.get(url, params)
+        if response.status_code != 200:
+            raise CommandError(f'{url} returned {response.status_code}')
+
+        queries = {}
+        for sql, query_params in collector.queries:
+            if any(f'"{table}"' in sql for table in self.project_tables):
+                queries.setdefault(sql, query_params)
+        return list(queries.items())
+
+    def analyze(self):
+        with connection.cursor() as cursor:
+            for table in sorted(self.project_tables):
+                cursor.execute(f'ANALYZE {connection.ops.quote_name(table)}')
+
+    def explain(self, sql, params):
+        """
+        Explain a query and return its plan lines and the problems found in them.
+        """
+        with connection.cursor() as cursor:
+            if connection.vendor == 'sqlite':
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+                details = [row[3] for row in cursor.fetchall()]
+                return details, self.get_sqlite_problems(details)
+
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            lines = []
+            problems = []
+            self.walk_postgresql_plan(plan[0]['Plan'], lines, problems)
+            return lines, problems
+
+    def get_sqlite_problems(self, details):
+        problems = []
+        for detail in details:
+            scan = SQLITE_FULL_SCAN.match(detail)
+            if scan and scan.group(1) in self.project_tables:
+                problems.append(f'full scan of {scan.group(1)}')
+            sort = SQLITE_TEMP_SORT.match(detail)
+            if sort:
+                problems.append(f'temp b-tree for {sort.group(1).lower()}')
+        return problems
+
+    def walk_postgresql_plan(self, node, lines, problems, depth=0):
+        node_type = node['Node Type']
+        relation = node.get('Relation Name')
+        index = node.get('Index Name')
+        lines.append('  ' * depth + ' '.join(part for part in (node_type, relation, index) if part))
+
+        if node_type == 'Seq Scan' and relation in self.project_tables:
+            problems.append(f'full scan of {relation}')
+        elif node_type == 'Sort':
+            problems.append(f'sort on {", ".join(node.get("Sort Key", []))}')
+
+        for child in node.get('Plans', []):
+            self.walk_postgresql_plan(child, lines, problems, depth + 1)
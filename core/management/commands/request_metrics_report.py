@@ -0,0 +1,145 @@
+import json
+import math
+import statistics
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.middleware import LOG_PREFIX
+
+
+class Command(BaseCommand):
+    help = (
+        'Aggregates the request metrics log (see REQUEST_METRICS in settings) into '
+        'per-URL-name latency percentiles, query counts and repeated statements, '
+        'sorted by the slowest p95 first.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'log_files',
+            nargs='+',
+            help='Log files written by the request metrics middleware.'
+        )
+        parser.add_argument(
+            '--sort',
+            choices=['p95', 'count', 'queries'],
+            default='p95',
+            help='Sort the URL names by p95 total time, request count or mean query count (default: p95).'
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            help='Only show the first N URL names.'
+        )
+        parser.add_argument(
+            '--output',
+            help='Write the report as JSON to this file.'
+        )
+
+    def handle(self, *args, **options):
+        records, skipped = self.read_records(options['log_files'])
+        if not records:
+            raise CommandError('No request metrics found in the given log files')
+
+        report = self.build_report(records)
+        sort_key = {
+            'p95': lambda row: row['total_ms']['p95'],
+            'count': lambda row: row['count'],
+            'queries': lambda row: row['queries']['mean'],
+        }[options['sort']]
+        rows = sorted(report, key=sort_key, reverse=True)[:options['limit']]
+
+        self.stdout.write(
+            f'{"URL name":30} {"count":>7} {"p50 ms":>9} {"p95 ms":>9} {"p99 ms":>9} '
+            f'{"SQL p95":>9} {"queries":>8} {"max q":>6} {"repeated":>9}'
+        )
+        for row in rows:
+            self.stdout.write(
+                f'{row["url_name"][:30]:30} {row["count"]:>7} {row["total_ms"]["p50"]:>9} '
+                f'{row["total_ms"]["p95"]:>9} {row["total_ms"]["p99"]:>9} {row["sql_ms"]["p95"]:>9} '
+                f'{row["queries"]["mean"]:>8} {row["queries"]["max"]:>6} {row["duplicate_queries"]["mean"]:>9}'
+            )
+            if row['most_repeated']:
+                self.stdout.write(
+                    self.style.WARNING(
+                        f'  repeated {row["most_repeated"]["count"]}x: {row["most_repeated"]["sql"][:120]}'
+                    )
+                )
+
+        self.stdout.write('\n' + '=' * 60)
+        if skipped:
+            self.stdout.write(self.style.WARNING(f'{skipped} malformed lines skipped'))
+        self.stdout.write(
+            self.style.SUCCESS(f'TOTAL: {len(records)} requests across {len(report)} URL names')
+        )
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output_file:
+                json.dump(rows, output_file, indent=2)
+            self.stdout.write(f'\nReport written to {options["output"]}')
+
+    def read_records(self, log_files):
+        """
+        Return the JSON records found in the log files and the number of malformed lines.
+        Lines not written by the middleware are ignored.
+        """
+        records = []
+        skipped = 0
+
+        for log_file in log_files:
+            try:
+                with open(log_file, encoding='utf-8') as lines:
+                    for line in lines:
+                        marker = line.find(f'{LOG_PREFIX} {{')
+                        if marker == -1:
+                            continue
+                        try:
+                            records.append(json.loads(line[marker + len(LOG_PREFIX) + 1:]))
+                        except json.JSONDecodeError:
+                            skipped += 1
+            except OSError as error:
+                raise CommandError(f'Could not read {log_file}: {error}')
+
+        return records, skipped
+
+    def build_report(self, records):
+        """
+        Group the records by URL name and summarize each group.
+        """
+        groups = defaultdict(list)
+        for record in records:
+            groups[record.get('url_name') or '(unresolved)'].append(record)
+
+        report = []
+        for url_name, group in groups.items():
+            # The most repeated statement of the group, by its highest count in one request
+            most_repeated = max(
+                (record['most_repeated'] for record in group if record.get('most_repeated')),
+                key=lambda item: item['count'],
+                default=None,
+            )
+            queries = [record['queries'] for record in group]
+            report.append({
+                'url_name': url_name,
+                'count': len(group),
+                'total_ms': self.get_percentiles([record['total_ms'] for record in group]),
+                'sql_ms': self.get_percentiles([record['sql_ms'] for record in group]),
+                'queries': {'mean': round(statistics.mean(queries), 1), 'max': max(queries)},
+                'duplicate_queries': {
+                    'mean': round(statistics.mean(record['duplicate_queries'] for record in group), 1),
+                },
+                'most_repeated': most_repeated,
+            })
+
+        return report
+
+    def get_percentiles(self, values):
+        """
+        Return the nearest-rank p50, p95 and p99 of a list of values.
+        """
+        values = sorted(values)
+        return {
+            f'p{percent}': values[max(math.ceil(len(values) * percent / 100) - 1, 0)]
+            for percent in (50, 95, 99)
+        }
@@ -0,0 +1,360 @@
+import json
+import math
+import platform
+import random
+import statistics
+import time
+from datetime import date, timedelta
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.benchmarks import delete_benchmark_users, generate_benchmark_data, get_benchmark_email, new_run_id
+from transactions.models import Transaction
+from transactions.search import analyze_transactions
+
+
+User = get_user_model()
+
+DUMMY_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+}
+
+# Password of the users created by the signup scenario
+SIGNUP_PASSWORD = 'Benchmark-Senha-2024'
+
+# Scenarios sent by anonymous clients; each request gets a fresh client
+ANONYMOUS_SCENARIOS = {'signup'}
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark suite for the finanpy views and write paths. Seeds benchmark users with '
+        'a reproducible data generator, then measures the dashboard, the transaction list '
+        'with each filter, transaction create/update/delete and signup through the full '
+        'request stack, reporting latency percentiles and query counts. Pass a previous '
+        'run (from --output) to --baseline to fail when a scenario regresses by more than '
+        '--threshold or issues more queries. The dashboard cache is disabled unless '
+        '--cache is given.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--users',
+            type=int,
+            default=5,
+            help='Number of seeded benchmark users (default: 5).'
+        )
+        parser.add_argument(
+            '--transactions',
+            type=int,
+            default=2000,
+            help='Number of transactions seeded for each user (default: 2000).'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Seed of the data generator and of the request parameters (default: 0).'
+        )
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=30,
+            help='Measured requests per scenario, after one warm-up request (default: 30).'
+        )
+        parser.add_argument(
+            '--scenario',
+            action='append',
+            help='Only run the given scenario (repeatable).'
+        )
+        parser.add_argument(
+            '--cache',
+            action='store_true',
+            help='Keep the dashboard cache enabled.'
+        )
+        parser.add_argument(
+            '--output',
+            help='Write the results as JSON to this file.'
+        )
+        parser.add_argument(
+            '--baseline',
+            help='JSON results of a previous run (from --output) to compare against.'
+        )
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=0.2,
+            help='Allowed p50 slowdown against the baseline before failing (default: 0.2 = 20%%).'
+        )
+
+    def handle(self, *args, **options):
+        scenarios = self.get_scenarios()
+        selected = options['scenario'] or list(scenarios)
+        unknown = set(selected) - set(scenarios)
+        if unknown:
+            raise CommandError(f'Unknown scenarios: {", ".join(sorted(unknown))}')
+
+        self.rng = random.Random(options['seed'])
+
+        self.stdout.write(
+            f'Seeding {options["users"]} benchmark users with {options["transactions"]} '
+            f'transactions each (seed {options["seed"]})'
+        )
+        started = time.perf_counter()
+        self.users = generate_benchmark_data(options['users'], options['transactions'], seed=options['seed'])
+        analyze_transactions(connection)
+        self.stdout.write(f'Seeded in {time.perf_counter() - started:.1f}s')
+
+        self.signup_run_id = new_run_id()
+        self.signup_count = 0
+
+        overrides = {'ALLOWED_HOSTS': [*settings.ALLOWED_HOSTS, 'testserver']}
+        if not options['cache']:
+            overrides['CACHES'] = DUMMY_CACHES
+
+        results = {}
+        try:
+            with override_settings(**overrides):
+                for name in selected:
+                    self.stdout.write(f'Running {name}')
+                    results[name] = self.run_scenario(name, scenarios[name], options['iterations'])
+        finally:
+            delete_benchmark_users(self.users)
+            delete_benchmark_users(self.get_signup_users())
+
+        report = {
+            'environment': {
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+                'cache': options['cache'],
+            },
+            'data': {
+                'users': options['users'],
+                'transactions_per_user': options['transactions'],
+                'seed': options['seed'],
+                'iterations': options['iterations'],
+            },
+            'scenarios': results,
+        }
+
+        self.stdout.write('\n' + '=' * 60)
+        self.stdout.write(
+            f'{"scenario":28} {"p50 ms":>9} {"p95 ms":>9} {"mean ms":>9} {"queries":>8} {"failed":>7}'
+        )
+        for name, stats in results.items():
+            self.stdout.write(
+                f'{name:28} {stats["p50_ms"]:>9} {stats["p95_ms"]:>9} {stats["mean_ms"]:>9} '
+                f'{stats["queries"]:>8} {stats["failed"]:>7}'
+            )
+
+        failed = sum(stats['failed'] for stats in results.values())
+        style = self.style.ERROR if failed else self.style.SUCCESS
+        self.stdout.write(style(f'TOTAL: {len(results)} scenarios, {failed} failed requests'))
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output_file:
+                json.dump(report, output_file, indent=2)
+            self.stdout.write(f'\nResults written to {options["output"]}')
+
+        if options['baseline']:
+            with open(options['baseline'], encoding='utf-8') as baseline_file:
+                baseline = json.load(baseline_file)
+            regressions = self.compare(baseline, report, options['threshold'])
+            if regressions:
+                raise CommandError(f'{regressions} scenarios regressed against {options["baseline"]}')
+
+    def get_scenarios(self):
+        """
+        Return the benchmark scenarios by name.
+
+        Each scenario is a function of (iteration, user) returning a function
+        that sends one request with a client and the expected status code.
+        """
+        today = date.today()
+
+        def get(url_name):
+            def build(iteration, user):
+                return lambda client: client.get(reverse(url_name)), 200
+            return build
+
+        def filtered_list(get_params):
+            def build(iteration, user):
+                params = get_params(user)
+                return lambda client: client.get(reverse('transactions:list'), params), 200
+            return build
+
+        return {
+            'dashboard': get('dashboard'),
+            'transaction_list': get('transactions:list'),
+            'transaction_list_type': filtered_list(lambda user: {'transaction_type': Transaction.EXPENSE}),
+            'transaction_list_account': filtered_list(
+                lambda user: {'account': self.rng.choice(self.get_account_ids(user))}
+            ),
+            'transaction_list_category': filtered_list(
+                lambda user: {'category': self.rng.choice(self.get_category_ids(user))}
+            ),
+            'transaction_list_dates': filtered_list(
+                lambda user: {
+                    'date_from': (today - timedelta(days=90)).isoformat(),
+                    'date_to': today.isoformat(),
+                }
+            ),
+            'transaction_list_all_filters': filtered_list(
+                lambda user: {
+                    'transaction_type': Transaction.EXPENSE,
+                    'account': self.rng.choice(self.get_account_ids(user)),
+                    'date_from': (today - timedelta(days=365)).isoformat(),
+                    'date_to': today.isoformat(),
+                }
+            ),
+            'transaction_list_search': filtered_list(lambda user: {'q': 'super'}),
+            'transaction_create': self.build_create,
+            'transaction_update': self.build_update,
+            'transaction_delete': self.build_delete,
+            'signup': self.build_signup,
+        }
+
+    def get_account_ids(self, user):
+        return list(user.accounts.order_by('pk').values_list('pk', flat=True))
+
+    def get_category_ids(self, user):
+        return list(user.categories.order_by('pk').values_list('pk', flat=True))
+
+    def get_transaction_data(self, user):
+        """
+        Return valid form data for a new transaction of the user.
+        """
+        category = self.rng.choice(list(user.categories.order_by('pk')))
+        return {
+            'description': 'Benchmark',
+            'amount': f'{self.rng.randint(100, 100000) / 100:.2f}',
+            'transaction_date': (date.today() - timedelta(days=self.rng.randint(0, 365))).isoformat(),
+            'transaction_type': category.category_type,
+            'category': category.pk,
+            'account': self.rng.choice(self.get_account_ids(user)),
+        }
+
+    def pick_transaction(self, user):
+        """
+        Return a random transaction of the user, loaded in one query.
+        """
+        transaction_ids = list(Transaction.objects.filter(user=user).values_list('pk', flat=True))
+        return Transaction.objects.get(pk=self.rng.choice(transaction_ids))
+
+    def build_create(self, iteration, user):
+        data = self.get_transaction_data(user)
+        return lambda client: client.post(reverse('transactions:create'), data), 302
+
+    def build_update(self, iteration, user):
+        transaction = self.pick_transaction(user)
+        data = self.get_transaction_data(user)
+        data.update(
+            transaction_type=transaction.transaction_type,
+            category=transaction.category_id,
+            account=transaction.account_id,
+        )
+        url = reverse('transactions:update', args=[transaction.pk])
+        return lambda client: client.post(url, data), 302
+
+    def build_delete(self, iteration, user):
+        url = reverse('transactions:delete', args=[self.pick_transaction(user).pk])
+        return lambda client: client.post(url), 302
+
+    def build_signup(self, iteration, user):
+        email = get_benchmark_email(self.signup_run_id, self.signup_count)
+        self.signup_count += 1
+        data = {'email': email, 'password1': SIGNUP_PASSWORD, 'password2': SIGNUP_PASSWORD}
+        return lambda client: client.post(reverse('users:signup'), data), 302
+
+    def get_signup_users(self):
+        emails = [get_benchmark_email(self.signup_run_id, index) for index in range(self.signup_count)]
+        return list(User.objects.filter(email__in=emails))
+
+    def run_scenario(self, name, build_request, iterations):
+        """
+        Run one warm-up and iterations measured requests of a scenario,
+        spread over the benchmark users, and summarize them.
+        """
+        anonymous = name in ANONYMOUS_SCENARIOS
+        clients = []
+        for user in self.users:
+            client = Client()
+            if not anonymous:
+                client.force_login(user)
+            clients.append(client)
+
+        latencies = []
+        queries = []
+        failed = 0
+
+        for iteration in range(iterations + 1):
+            index = iteration % len(self.users)
+            send, expected_status = build_request(iteration, self.users[index])
+            # Signup logs the new user in, so anonymous requests need a fresh client
+            client = Client() if anonymous else clients[index]
+
+            with CaptureQueriesContext(connection) as context:
+                started = time.perf_counter()
+                response = send(client)
+                elapsed = time.perf_counter() - started
+
+            if iteration == 0:
+                continue
+            latencies.append(elapsed * 1000)
+            queries.append(len(context.captured_queries))
+            if response.status_code != expected_status:
+                failed += 1
+
+        latencies.sort()
+        return {
+            'iterations': iterations,
+            'p50_ms': round(statistics.median(latencies), 2),
+            'p95_ms': round(latencies[max(math.ceil(len(latencies) * 0.95) - 1, 0)], 2),
+            'mean_ms': round(statistics.mean(latencies), 2),
+            'queries': max(queries),
+            'failed': failed,
+        }
+
+    def compare(self, baseline, report, threshold):
+        """
+        Print the changes against a baseline run and return the number of regressions.
+
+        A scenario regresses when its p50 grows by more than threshold, or when
+        it issues more queries than in the baseline.
+        """
+        self.stdout.write('\n' + '=' * 60)
+        if baseline.get('data') != report['data']:
+            self.stdout.write(
+                self.style.WARNING(f'Baseline was seeded differently: {baseline.get("data")}')
+            )
+
+        regressions = 0
+        for name, stats in report['scenarios'].items():
+            before = baseline.get('scenarios', {}).get(name)
+            if before is None:
+                self.stdout.write(f'  {name:28} not in baseline')
+                continue
+
+            change = (stats['p50_ms'] - before['p50_ms']) / before['p50_ms'] if before['p50_ms'] else 0
+            line = (
+                f'  {name:28} p50 {before["p50_ms"]:>9} -> {stats["p50_ms"]:>9} ({change:+.0%}), '
+                f'queries {before["queries"]} -> {stats["queries"]}'
+            )
+            if change > threshold or stats['queries'] > before['queries']:
+                regressions += 1
+                self.stdout.write(self.style.ERROR(line))
+            else:
+                self.stdout.write(line)
+
+        style = self.style.ERROR if regressions else self.style.SUCCESS
+        self.stdout.write(style(f'TOTAL: {regressions} regressions (threshold {threshold:.0%})'))
+
+        return regressions
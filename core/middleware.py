@@ -0,0 +1,161 @@
+"""
+Request instrumentation for the project.
+
+RequestMetricsMiddleware measures, for each request, the SQL queries it
+issued (count, total time and repeated statements), the time spent in the
+view and rendering its template, and the total time. The figures are sent
+back in a Server-Timing header and logged as one JSON line on the
+'core.request_metrics' logger, which the request_metrics_report command
+aggregates per URL name.
+
+The middleware is opt-in: settings only add it to MIDDLEWARE when
+REQUEST_METRICS is enabled, so it costs nothing when turned off.
+"""
+
+import json
+import logging
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.db import connections
+
+
+logger = logging.getLogger('core.request_metrics')
+
+# Prefix of every log line, followed by the JSON record
+LOG_PREFIX = 'request_metrics'
+
+# Maximum length of the repeated statement included in the log record
+MAX_LOGGED_SQL_LENGTH = 300
+
+
+class QueryRecorder:
+    """
+    Database execute wrapper that records the SQL and duration of every query.
+    """
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, time.perf_counter() - started))
+
+    def get_summary(self):
+        """
+        Return the query count, total SQL time (ms) and repeated statements.
+
+        Statements are compared without their parameters, so the same query
+        run once per row of a list (an N+1) shows up as repeated.
+        """
+        statements = Counter(sql for sql, _ in self.queries)
+        duplicates = sum(count - 1 for count in statements.values())
+        summary = {
+            'queries': len(self.queries),
+            'sql_ms': round(sum(seconds for _, seconds in self.queries) * 1000, 2),
+            'duplicate_queries': duplicates,
+        }
+
+        if duplicates:
+            sql, count = statements.most_common(1)[0]
+            summary['most_repeated'] = {'sql': sql[:MAX_LOGGED_SQL_LENGTH], 'count': count}
+
+        return summary
+
+
+class RequestMetrics:
+    """
+    Timings of one request, filled in by RequestMetricsMiddleware.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.view_started = None
+        self.view_finished = None
+        self.render_finished = None
+        self.recorder = QueryRecorder()
+
+    def mark_rendered(self, response):
+        self.render_finished = time.perf_counter()
+
+    def get_record(self, request, response):
+        """
+        Return the metrics of the request as a JSON-serializable dict (times in ms).
+
+        Views returning a TemplateResponse are split into view and render
+        time; for other responses, rendering is part of the view time.
+        """
+        finished = time.perf_counter()
+        view_finished = self.view_finished or finished
+        render_ms = None
+        if self.view_finished and self.render_finished:
+            render_ms = round((self.render_finished - self.view_finished) * 1000, 2)
+
+        resolver_match = getattr(request, 'resolver_match', None)
+        record = {
+            'url_name': resolver_match.view_name if resolver_match else None,
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'total_ms': round((finished - self.started) * 1000, 2),
+            'view_ms': round((view_finished - self.view_started) * 1000, 2) if self.view_started else None,
+            'render_ms': render_ms,
+        }
+        record.update(self.recorder.get_summary())
+        return record
+
+
+class RequestMetricsMiddleware:
+    """
+    Record query counts and timings of each request.
+
+    Place it first in MIDDLEWARE so the total time and query count include
+    the other middleware (sessions, authentication).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        request.request_metrics = metrics
+
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(metrics.recorder))
+            response = self.get_response(request)
+
+        record = metrics.get_record(request, response)
+        response['Server-Timing'] = self.get_server_timing(record)
+        logger.info('%s %s', LOG_PREFIX, json.dumps(record))
+
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.request_metrics.view_started = time.perf_counter()
+
+    def process_template_response(self, request, response):
+        metrics = request.request_metrics
+        metrics.view_finished = time.perf_counter()
+        response.add_post_render_callback(metrics.mark_rendered)
+        return response
+
+    def get_server_timing(self, record):
+        """
+        Return the Server-Timing header value for a metrics record.
+        """
+        entries = [
+            f'db;dur={record["sql_ms"]};desc="{record["queries"]} queries, '
+            f'{record["duplicate_queries"]} repeated"'
+        ]
+        if record['view_ms'] is not None:
+            entries.append(f'view;dur={record["view_ms"]}')
+        if record['render_ms'] is not None:
+            entries.append(f'render;dur={record["render_ms"]}')
+        entries.append(f'total;dur={record["total_ms"]}')
+
+        return ', '.join(entries)
@@ -0,0 +1,148 @@
+"""
+Per-user reference data: the user's accounts and categories.
+
+They are small and change rarely, so they are cached per user as compact
+tuples and turned back into model instances on read. The cache is
+write-through: saving or deleting an account or category moves the user to
+a new reference version once the transaction commits and stores freshly
+loaded tuples under it (see the accounts and categories signals). Like the
+data version in core.cache, tuples loaded before a write can only end up
+under a version that is no longer current, so reads are never stale.
+"""
+
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils.functional import cached_property
+
+from accounts.models import Account
+from categories.models import Category
+from transactions.models import Transaction
+
+from .cache import _new_version
+
+
+REFERENCE_VERSION_KEY = 'reference-version:{user_id}'
+REFERENCE_DATA_KEY = 'reference-data:{user_id}:v{version}'
+
+# Fields kept in the cached tuples, in tuple order
+ACCOUNT_FIELDS = ('id', 'name', 'account_type', 'is_active')
+CATEGORY_FIELDS = ('id', 'name', 'category_type', 'color', 'is_default')
+
+
+class ReferenceData:
+    """
+    Accounts (ordered by name) and categories (ordered by type and name) of a user.
+    Instances only carry the cached fields; any other field is loaded on access.
+    """
+
+    def __init__(self, user_id, account_rows, category_rows):
+        self.user_id = user_id
+        self.account_rows = account_rows
+        self.category_rows = category_rows
+
+    @cached_property
+    def accounts(self):
+        return self._build(Account, ACCOUNT_FIELDS, self.account_rows)
+
+    @cached_property
+    def categories(self):
+        return self._build(Category, CATEGORY_FIELDS, self.category_rows)
+
+    @cached_property
+    def accounts_by_id(self):
+        return {account.pk: account for account in self.accounts}
+
+    @cached_property
+    def categories_by_id(self):
+        return {category.pk: category for category in self.categories}
+
+    def _build(self, model, fields, rows):
+        # from_db expects the values in the model's field order
+        attnames = [field.attname for field in model._meta.concrete_fields if field.attname in {'user_id', *fields}]
+        instances = []
+        for row in rows:
+            values = dict(zip(fields, row), user_id=self.user_id)
+            instances.append(model.from_db(DEFAULT_DB_ALIAS, attnames, [values[name] for name in attnames]))
+        return instances
+
+    def attach_to(self, transactions):
+        """
+        Set the account and category of each transaction from the reference data,
+        so templates can show their labels without joining or querying them.
+        """
+        account_field = Transaction._meta.get_field('account')
+        category_field = Transaction._meta.get_field('category')
+
+        for item in transactions:
+            account = self.accounts_by_id.get(item.account_id)
+            if account is not None:
+                account_field.set_cached_value(item, account)
+            category = self.categories_by_id.get(item.category_id)
+            if category is not None:
+                category_field.set_cached_value(item, category)
+
+
+def load_reference_rows(user_id):
+    """
+    Read the reference tuples of a user from the database (one query per model).
+
+    Returns:
+        tuple: (account_rows, category_rows)
+    """
+    account_rows = list(
+        Account.objects.filter(user_id=user_id).order_by('name', 'pk').values_list(*ACCOUNT_FIELDS)
+    )
+    category_rows = list(
+        Category.objects.filter(user_id=user_id).order_by('category_type', 'name').values_list(*CATEGORY_FIELDS)
+    )
+    return account_rows, category_rows
+
+
+def get_reference_data(user_id):
+    """
+    Return the ReferenceData of a user, from the cache when possible.
+    """
+    version_key = REFERENCE_VERSION_KEY.format(user_id=user_id)
+    version = cache.get(version_key)
+    if version is None:
+        version = _new_version()
+        if not cache.add(version_key, version, timeout=None):
+            version = cache.get(version_key, version)
+
+    data_key = REFERENCE_DATA_KEY.format(user_id=user_id, version=version)
+    rows = cache.get(data_key)
+    if rows is None:
+        rows = load_reference_rows(user_id)
+        cache.set(data_key, rows, timeout=None)
+
+    return ReferenceData(user_id, *rows)
+
+
+def refresh_reference_data(user_id, preload=True):
+    """
+    Move a user to a new reference version and cache the current tuples under it.
+    With preload=False the tuples are left for the next read to load.
+    """
+    version_key = REFERENCE_VERSION_KEY.format(user_id=user_id)
+    previous_version = cache.get(version_key)
+
+    version = _new_version()
+    cache.set(version_key, version, timeout=None)
+    if preload:
+        cache.set(
+            REFERENCE_DATA_KEY.format(user_id=user_id, version=version),
+            load_reference_rows(user_id),
+            timeout=None,
+        )
+
+    if previous_version is not None:
+        cache.delete(REFERENCE_DATA_KEY.format(user_id=user_id, version=previous_version))
+
+
+def refresh_reference_data_on_commit(*user_ids, preload=True):
+    """
+    Refresh the reference data of the given users once the current transaction commits.
+    """
+    for user_id in set(user_ids):
+        if user_id is not None:
+            transaction.on_commit(lambda user_id=user_id: refresh_reference_data(user_id, preload))
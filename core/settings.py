@@ -51,6 +51,7 @@ INSTALLED_APPS = [
     "django_browser_reload",
 
     # Project apps
+    "core",
     "accounts",
     "categories",
     "profiles",
@@ -92,15 +93,149 @@ WSGI_APPLICATION = "core.wsgi.application"
 
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
+# DB_ENGINE selects the profile: 'sqlite' (default, single-node deployments) or
+# 'postgresql' (concurrent writers; requires psycopg, plus psycopg-pool for DB_POOL).
+
+DB_ENGINE = config('DB_ENGINE', default='sqlite')
+
+if DB_ENGINE == 'postgresql':
+    DB_POOL = config('DB_POOL', default=False, cast=bool)
+
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.postgresql",
+            "NAME": config('DB_NAME', default='finanpy'),
+            "USER": config('DB_USER', default='finanpy'),
+            "PASSWORD": config('DB_PASSWORD', default=''),
+            "HOST": config('DB_HOST', default='127.0.0.1'),
+            "PORT": config('DB_PORT', default='5432'),
+            # Persistent connections are incompatible with the connection pool
+            "CONN_MAX_AGE": 0 if DB_POOL else config('DB_CONN_MAX_AGE', default=60, cast=int),
+            "CONN_HEALTH_CHECKS": True,
+            "OPTIONS": {},
+        }
+    }
+
+    if DB_POOL:
+        DATABASES["default"]["OPTIONS"]["pool"] = {
+            "min_size": config('DB_POOL_MIN_SIZE', default=2, cast=int),
+            "max_size": config('DB_POOL_MAX_SIZE', default=10, cast=int),
+            "timeout": config('DB_POOL_TIMEOUT', default=10, cast=int),
+        }
+else:
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": config('DB_NAME', default=str(BASE_DIR / "db.sqlite3")),
+            "CONN_MAX_AGE": config('DB_CONN_MAX_AGE', default=0, cast=int),
+            "OPTIONS": {
+                # Take the write lock when the transaction starts, so concurrent
+                # writers wait on busy_timeout instead of failing with "database is locked"
+                "transaction_mode": "IMMEDIATE",
+                # WAL lets readers run alongside the single writer; synchronous=NORMAL
+                # is durable in WAL mode except for the last commits on power loss
+                "init_command": (
+                    "PRAGMA journal_mode=WAL;"
+                    f"PRAGMA busy_timeout={config('SQLITE_BUSY_TIMEOUT', default=5000, cast=int)};"
+                    "PRAGMA synchronous=NORMAL;"
+                    "PRAGMA temp_store=MEMORY;"
+                    "PRAGMA cache_size=-20000;"
+                    "PRAGMA mmap_size=134217728;"
+                ),
+            },
+        }
+    }
+
 
-DATABASES = {
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+# Per-user fragments (e.g. the dashboard) are invalidated by bumping a versioned key,
+# so entries never expire by time. Every process and host must see the same version
+# keys: production uses a shared backend, the database cache by default (create its
+# table with `python manage.py createcachetable`) or Redis
+# (CACHE_BACKEND=django.core.cache.backends.redis.RedisCache, CACHE_LOCATION=redis://...).
+# Local memory (per process) and file-based (per host) caches are only for development;
+# `python manage.py check --deploy` rejects them (see core.checks).
+
+CACHE_BACKEND = config(
+    'CACHE_BACKEND',
+    default='django.core.cache.backends.locmem.LocMemCache' if DEBUG
+    else 'django.core.cache.backends.db.DatabaseCache'
+)
+
+CACHES = {
     "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+        "BACKEND": CACHE_BACKEND,
+        "LOCATION": config('CACHE_LOCATION', default='finanpy_cache'),
+        "TIMEOUT": None,
+        "OPTIONS": {
+            "MAX_ENTRIES": config('CACHE_MAX_ENTRIES', default=10000, cast=int),
+        },
     }
 }
 
 
+# Async views
+# Serve the dashboard with AsyncDashboardView. Only worth enabling when the
+# project runs under an ASGI server (core.asgi:application).
+
+ASYNC_DASHBOARD = config('ASYNC_DASHBOARD', default=False, cast=bool)
+
+
+# Transaction archive
+# `python manage.py archive_transactions` moves transactions dated before the
+# first day of the month TRANSACTION_ARCHIVE_MONTHS months ago into the
+# archive table, and back when the horizon grows. The dashboard and the date
+# filters of the transaction list read through to the archive for older dates.
+# 0 disables the archive.
+
+TRANSACTION_ARCHIVE_MONTHS = config('TRANSACTION_ARCHIVE_MONTHS', default=24, cast=int)
+
+
+# Balance chart
+# Longest period, in days, the account balance chart draws one point per day
+# for. Longer periods requested in the query string fall back to the default
+# period (the last 90 days).
+
+BALANCE_CHART_MAX_DAYS = config('BALANCE_CHART_MAX_DAYS', default=731, cast=int)
+
+
+# Request metrics
+# Opt-in per-request instrumentation (core.middleware.RequestMetricsMiddleware):
+# query count, SQL time, repeated statements, view and template render time.
+# Sent as Server-Timing headers (visible to clients) and logged as JSON lines,
+# to REQUEST_METRICS_LOG when set or to the console otherwise. Aggregate the
+# log with `python manage.py request_metrics_report`.
+
+REQUEST_METRICS = config('REQUEST_METRICS', default=False, cast=bool)
+REQUEST_METRICS_LOG = config('REQUEST_METRICS_LOG', default='')
+
+if REQUEST_METRICS:
+    MIDDLEWARE.insert(0, "core.middleware.RequestMetricsMiddleware")
+
+    LOGGING = {
+        "version": 1,
+        "disable_existing_loggers": False,
+        "formatters": {
+            "request_metrics": {"format": "{asctime} {message}", "style": "{"},
+        },
+        "handlers": {
+            "request_metrics": (
+                {"class": "logging.FileHandler", "filename": REQUEST_METRICS_LOG, "delay": True}
+                if REQUEST_METRICS_LOG
+                else {"class": "logging.StreamHandler"}
+            ) | {"formatter": "request_metrics"},
+        },
+        "loggers": {
+            "core.request_metrics": {
+                "handlers": ["request_metrics"],
+                "level": "INFO",
+                "propagate": False,
+            },
+        },
+    }
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -0,0 +1,281 @@
+import json
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.contrib.auth.models import AnonymousUser
+from django.test import AsyncRequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from accounts.models import Account
+from categories.models import Category
+from core.cache import USER_DATA_VERSION_KEY, bump_user_data_version, get_user_data_version
+from core.checks import check_shared_cache
+from core.reference import get_reference_data
+from core.views import AsyncDashboardView, DashboardView, get_dashboard_view
+from transactions.models import Transaction
+from users.models import CustomUser
+
+
+class DashboardViewTests(TestCase):
+    """
+    Tests for the dashboard metrics and the number of queries it issues.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(email='dashboard@example.com', password='password123')
+        cls.account = Account.objects.create(
+            user=cls.user,
+            name='Conta Corrente',
+            initial_balance=Decimal('1000.00'),
+            current_balance=Decimal('1000.00')
+        )
+        # Default categories created on signup
+        salary = Category.objects.get(user=cls.user, name='Salário')
+        food = Category.objects.get(user=cls.user, name='Alimentação')
+        transport = Category.objects.get(user=cls.user, name='Transporte')
+
+        today = date.today()
+        for category, transaction_type, amount in [
+            (salary, Transaction.INCOME, Decimal('3000.00')),
+            (food, Transaction.EXPENSE, Decimal('200.00')),
+            (food, Transaction.EXPENSE, Decimal('50.00')),
+            (transport, Transaction.EXPENSE, Decimal('100.00')),
+        ]:
+            Transaction.objects.create(
+                user=cls.user,
+                account=cls.account,
+                category=category,
+                description=f'{category.name} {amount}',
+                amount=amount,
+                transaction_date=today,
+                transaction_type=transaction_type
+            )
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def test_period_metrics(self):
+        response = self.client.get(reverse('dashboard'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['total_balance'], Decimal('3650.00'))
+        self.assertEqual(response.context['period_income'], Decimal('3000.00'))
+        self.assertEqual(response.context['period_expenses'], Decimal('350.00'))
+        self.assertEqual(response.context['period_balance'], Decimal('2650.00'))
+        self.assertEqual(
+            [(row['category__name'], row['total']) for row in response.context['category_summary']],
+            [('Alimentação', Decimal('250.00')), ('Transporte', Decimal('100.00'))]
+        )
+
+    def test_query_count(self):
+        # Session, user, navbar profile, total balance, period aggregate, recent transactions
+        with self.assertNumQueries(6):
+            response = self.client.get(reverse('dashboard'))
+            self.assertEqual(response.status_code, 200)
+
+    def test_cached_metrics_skip_queries(self):
+        self.client.get(reverse('dashboard'))
+
+        # Session, user and navbar profile only
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('dashboard'))
+        self.assertEqual(response.context['period_income'], Decimal('3000.00'))
+
+    def test_transaction_write_invalidates_cache(self):
+        self.client.get(reverse('dashboard'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Transaction.objects.create(
+                user=self.user,
+                account=self.account,
+                category=Category.objects.get(user=self.user, name='Salário'),
+                description='Bônus',
+                amount=Decimal('500.00'),
+                transaction_date=date.today(),
+                transaction_type=Transaction.INCOME
+            )
+
+        response = self.client.get(reverse('dashboard'))
+        self.assertEqual(response.context['period_income'], Decimal('3500.00'))
+        self.assertEqual(response.context['total_balance'], Decimal('4150.00'))
+
+    async def get_async_dashboard(self, user, params=None):
+        """
+        Serve AsyncDashboardView for a request of user, as the ASGI handler would.
+        """
+        async def auser():
+            return user
+
+        request = AsyncRequestFactory().get('/dashboard/', params or {})
+        request.user = user
+        request.auser = auser
+        response = await AsyncDashboardView.as_view()(request)
+        if hasattr(response, 'render'):
+            response.render()
+        return response
+
+    async def test_async_view_renders_the_same_context(self):
+        params = {'period': 'last_3_months'}
+        # The URL serves DashboardView, the synchronous path
+        await self.async_client.aforce_login(self.user)
+        expected = (await self.async_client.get(reverse('dashboard'), params)).context
+
+        await cache.aclear()
+        async_response = await self.get_async_dashboard(self.user, params)
+
+        self.assertEqual(async_response.status_code, 200)
+        context = async_response.context_data
+        names = [
+            'total_balance', 'period_income', 'period_expenses', 'period_balance',
+            'category_summary', 'selected_period', 'date_from', 'date_to',
+        ]
+        for name in names:
+            self.assertEqual(context[name], expected[name], name)
+        self.assertEqual(
+            [item.pk for item in context['recent_transactions']],
+            [item.pk for item in expected['recent_transactions']],
+        )
+
+    async def test_async_view_requires_login(self):
+        response = await self.get_async_dashboard(AnonymousUser())
+
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(response['Location'].startswith(settings.LOGIN_URL))
+
+    def test_async_view_only_when_enabled(self):
+        self.assertIs(get_dashboard_view(), DashboardView)
+        with override_settings(ASYNC_DASHBOARD=True):
+            self.assertIs(get_dashboard_view(), AsyncDashboardView)
+
+
+@override_settings(MIDDLEWARE=['core.middleware.RequestMetricsMiddleware', *settings.MIDDLEWARE])
+class RequestMetricsMiddlewareTests(TestCase):
+    """
+    Tests for the opt-in request metrics middleware.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(email='metrics@example.com', password='password123')
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def test_metrics_header_and_log(self):
+        with self.assertLogs('core.request_metrics', level='INFO') as logs:
+            response = self.client.get(reverse('dashboard'))
+
+        self.assertIn('db;dur=', response['Server-Timing'])
+        self.assertIn('render;dur=', response['Server-Timing'])
+
+        record = json.loads(logs.records[0].getMessage().split(' ', 1)[1])
+        self.assertEqual(record['url_name'], 'dashboard')
+        self.assertEqual(record['status'], 200)
+        # Session, user, navbar profile, total balance, period aggregate, recent transactions
+        self.assertEqual(record['queries'], 6)
+        self.assertIsNotNone(record['view_ms'])
+
+
+class ReferenceDataTests(TestCase):
+    """
+    Tests for the per-user reference data cache of accounts and categories.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(email='reference@example.com', password='password123')
+        cls.account = Account.objects.create(user=cls.user, name='Conta Corrente')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_cached_after_first_read(self):
+        with self.assertNumQueries(2):
+            reference = get_reference_data(self.user.pk)
+        self.assertEqual([account.name for account in reference.accounts], ['Conta Corrente'])
+        self.assertEqual(len(reference.categories), 10)
+
+        with self.assertNumQueries(0):
+            reference = get_reference_data(self.user.pk)
+            self.assertEqual(reference.accounts_by_id[self.account.pk].name, 'Conta Corrente')
+
+    def test_writes_refresh_cached_data(self):
+        get_reference_data(self.user.pk)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.account.name = 'Conta Salário'
+            self.account.save()
+            Account.objects.create(user=self.user, name='Poupança', account_type=Account.SAVINGS)
+
+        with self.assertNumQueries(0):
+            reference = get_reference_data(self.user.pk)
+            self.assertEqual([account.name for account in reference.accounts], ['Conta Salário', 'Poupança'])
+
+
+class IndexAdvisorCommandTests(TestCase):
+    """
+    Tests for the index_advisor command.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(email='advisor@example.com', password='password123')
+        account = Account.objects.create(user=cls.user, name='Conta Corrente')
+        Transaction.objects.create(
+            user=cls.user,
+            account=account,
+            category=Category.objects.get(user=cls.user, name='Alimentação'),
+            description='Mercado',
+            amount=Decimal('10.00'),
+            transaction_date=date.today(),
+            transaction_type=Transaction.EXPENSE
+        )
+
+    def test_list_queries_use_indexes(self):
+        output = StringIO()
+        call_command(
+            'index_advisor',
+            user_id=self.user.pk,
+            scenario=['transaction_list', 'transaction_list_account', 'transaction_form'],
+            stdout=output,
+        )
+
+        self.assertIn('TOTAL:', output.getvalue())
+        self.assertIn('0 distinct queries flagged', output.getvalue())
+
+
+class UserDataVersionTests(TestCase):
+    """
+    Tests for the per-user data versions that invalidate cached fragments.
+    """
+
+    def test_every_bump_writes_a_new_version(self):
+        version = get_user_data_version(1)
+
+        # A concurrent bump read the same version: both must still move it
+        bump_user_data_version(1)
+        first = cache.get(USER_DATA_VERSION_KEY.format(user_id=1))
+        bump_user_data_version(1)
+
+        self.assertEqual(len({version, first, get_user_data_version(1)}), 3)
+
+    def test_bump_recreates_an_evicted_version(self):
+        cache.delete(USER_DATA_VERSION_KEY.format(user_id=2))
+        bump_user_data_version(2)
+        self.assertIsNotNone(cache.get(USER_DATA_VERSION_KEY.format(user_id=2)))
+
+    def test_deploy_check_requires_a_shared_cache(self):
+        for backend, errors in [
+            ('django.core.cache.backends.filebased.FileBasedCache', ['core.E001']),
+            ('django.core.cache.backends.locmem.LocMemCache', ['core.E001']),
+            ('django.core.cache.backends.db.DatabaseCache', []),
+        ]:
+            with self.subTest(backend=backend), override_settings(CACHES={'default': {'BACKEND': backend}}):
+                self.assertEqual([error.id for error in check_shared_cache(None)], errors)
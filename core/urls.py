@@ -21,13 +21,17 @@ from django.conf import settings
 from django.conf.urls.static import static
 from django.views.generic import RedirectView
 
-from core.views import DashboardView
+from core.views import get_dashboard_view
 
 
 urlpatterns = [
     # Main routes
     path('', RedirectView.as_view(url='/login/', permanent=False), name='home'),
-    path('dashboard/', DashboardView.as_view(), name='dashboard'),
+    path(
+        'dashboard/',
+        get_dashboard_view().as_view(),
+        name='dashboard'
+    ),
 
     path("admin/", admin.site.urls),
     path("__reload__/", include("django_browser_reload.urls")),
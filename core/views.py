@@ -1,13 +1,17 @@
+import asyncio
 from datetime import date, timedelta
 from decimal import Decimal
 
+from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Sum, Q
+from django.core.cache import cache
+from django.db.models import Sum
 from django.views.generic import TemplateView
 
 from accounts.models import Account
+from core.cache import aget_user_cache_key, get_user_cache_key
 from transactions.models import Transaction
-from categories.models import Category
+from transactions.rollups import aget_category_totals, get_category_totals
 
 
 class DashboardView(LoginRequiredMixin, TemplateView):
@@ -75,35 +79,14 @@ class DashboardView(LoginRequiredMixin, TemplateView):
 
         return total or Decimal('0.00')
 
-    def get_period_income(self, date_from, date_to):
+    def get_period_category_totals(self, date_from, date_to):
         """
-        Calculate total income for the specified period.
+        Aggregate income and expenses per category for the specified period.
+        Whole months come from the monthly rollups; only partial months at the
+        edges of the period scan raw transactions, with conditional aggregation
+        (one Sum per transaction type) feeding both totals and category summary.
         """
-        total = Transaction.objects.filter(
-            user=self.request.user,
-            transaction_type=Transaction.INCOME,
-            transaction_date__gte=date_from,
-            transaction_date__lte=date_to
-        ).aggregate(
-            total=Sum('amount')
-        )['total']
-
-        return total or Decimal('0.00')
-
-    def get_period_expenses(self, date_from, date_to):
-        """
-        Calculate total expenses for the specified period.
-        """
-        total = Transaction.objects.filter(
-            user=self.request.user,
-            transaction_type=Transaction.EXPENSE,
-            transaction_date__gte=date_from,
-            transaction_date__lte=date_to
-        ).aggregate(
-            total=Sum('amount')
-        )['total']
-
-        return total or Decimal('0.00')
+        return get_category_totals(self.request.user, date_from, date_to)
 
     def get_recent_transactions(self):
         """
@@ -117,25 +100,60 @@ class DashboardView(LoginRequiredMixin, TemplateView):
             '-transaction_date', '-created_at'
         )[:5]
 
-    def get_category_summary(self, date_from, date_to):
+    def get_period_summary(self, date_from, date_to):
         """
-        Get top 5 expense categories by total amount for the period.
-        Returns list of dicts with category info and total.
+        Calculate period income, period expenses and the top 5 expense
+        categories by total amount, all from the same grouped aggregate.
+        Returns tuple (period_income, period_expenses, category_summary).
         """
-        category_totals = Transaction.objects.filter(
-            user=self.request.user,
-            transaction_type=Transaction.EXPENSE,
-            transaction_date__gte=date_from,
-            transaction_date__lte=date_to
-        ).values(
-            'category__id',
-            'category__name',
-            'category__color'
-        ).annotate(
-            total=Sum('amount')
-        ).order_by('-total')[:5]
-
-        return list(category_totals)
+        return self.build_period_summary(self.get_period_category_totals(date_from, date_to))
+
+    def build_period_summary(self, category_totals):
+        """
+        Build (period_income, period_expenses, category_summary) from per-category totals.
+        """
+        period_income = sum((row['income'] or Decimal('0.00') for row in category_totals), Decimal('0.00'))
+        period_expenses = sum((row['expense'] or Decimal('0.00') for row in category_totals), Decimal('0.00'))
+
+        category_summary = sorted(
+            (
+                {
+                    'category__id': row['category__id'],
+                    'category__name': row['category__name'],
+                    'category__color': row['category__color'],
+                    'total': row['expense'],
+                }
+                for row in category_totals
+                if row['expense']
+            ),
+            key=lambda row: row['total'],
+            reverse=True
+        )[:5]
+
+        return period_income, period_expenses, category_summary
+
+    def get_dashboard_metrics(self, date_from, date_to):
+        """
+        Calculate the dashboard metrics for the period.
+        Results are cached per user under a versioned key that is bumped on every
+        transaction, account or category write, so a hit is never stale.
+        """
+        cache_key = get_user_cache_key(self.request.user.pk, 'dashboard', date_from, date_to)
+        metrics = cache.get(cache_key)
+
+        if metrics is None:
+            period_income, period_expenses, category_summary = self.get_period_summary(date_from, date_to)
+            metrics = {
+                'total_balance': self.get_total_balance(),
+                'period_income': period_income,
+                'period_expenses': period_expenses,
+                'period_balance': period_income - period_expenses,
+                'recent_transactions': list(self.get_recent_transactions()),
+                'category_summary': category_summary,
+            }
+            cache.set(cache_key, metrics, timeout=None)
+
+        return metrics
 
     def get_context_data(self, **kwargs):
         """
@@ -146,27 +164,104 @@ class DashboardView(LoginRequiredMixin, TemplateView):
         # Get period dates
         date_from, date_to = self.get_period_dates()
 
-        # Calculate metrics
-        total_balance = self.get_total_balance()
-        period_income = self.get_period_income(date_from, date_to)
-        period_expenses = self.get_period_expenses(date_from, date_to)
-        period_balance = period_income - period_expenses
+        # Add metrics and data to context
+        context.update(self.get_dashboard_metrics(date_from, date_to))
+        context.update({
+            'selected_period': self.request.GET.get('period', 'current_month'),
+            'date_from': date_from,
+            'date_to': date_to,
+        })
+
+        return context
+
+
+class AsyncDashboardView(DashboardView):
+    """
+    Async version of DashboardView for ASGI deployments.
+    The independent dashboard queries (balance, period totals and recent
+    transactions) are awaited concurrently through the async ORM, so a slow
+    aggregate does not hold a worker thread while it runs.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        """
+        Resolve the user without blocking, then apply the LoginRequiredMixin check.
+        """
+        request.user = await request.auser()
+        if not request.user.is_authenticated:
+            return self.handle_no_permission()
+        return await super().dispatch(request, *args, **kwargs)
+
+    async def get(self, request, *args, **kwargs):
+        context = await self.aget_context_data(**kwargs)
+        return self.render_to_response(context)
+
+    async def aget_total_balance(self):
+        """
+        Async version of get_total_balance.
+        """
+        total = (await Account.objects.filter(
+            user=self.request.user,
+            is_active=True
+        ).aaggregate(
+            total=Sum('current_balance')
+        ))['total']
+
+        return total or Decimal('0.00')
+
+    async def aget_recent_transactions(self):
+        """
+        Async version of get_recent_transactions.
+        """
+        return [transaction async for transaction in self.get_recent_transactions()]
+
+    async def aget_dashboard_metrics(self, date_from, date_to):
+        """
+        Async version of get_dashboard_metrics, sharing its cache entries.
+        """
+        cache_key = await aget_user_cache_key(self.request.user.pk, 'dashboard', date_from, date_to)
+        metrics = await cache.aget(cache_key)
+
+        if metrics is None:
+            total_balance, category_totals, recent_transactions = await asyncio.gather(
+                self.aget_total_balance(),
+                aget_category_totals(self.request.user, date_from, date_to),
+                self.aget_recent_transactions(),
+            )
+            period_income, period_expenses, category_summary = self.build_period_summary(category_totals)
+            metrics = {
+                'total_balance': total_balance,
+                'period_income': period_income,
+                'period_expenses': period_expenses,
+                'period_balance': period_income - period_expenses,
+                'recent_transactions': recent_transactions,
+                'category_summary': category_summary,
+            }
+            await cache.aset(cache_key, metrics, timeout=None)
+
+        return metrics
 
-        # Get data
-        recent_transactions = self.get_recent_transactions()
-        category_summary = self.get_category_summary(date_from, date_to)
+    async def aget_context_data(self, **kwargs):
+        """
+        Async version of get_context_data.
+        """
+        # Skip DashboardView.get_context_data, which runs the queries synchronously
+        context = super(DashboardView, self).get_context_data(**kwargs)
+
+        date_from, date_to = self.get_period_dates()
 
-        # Add to context
+        context.update(await self.aget_dashboard_metrics(date_from, date_to))
         context.update({
-            'total_balance': total_balance,
-            'period_income': period_income,
-            'period_expenses': period_expenses,
-            'period_balance': period_balance,
-            'recent_transactions': recent_transactions,
-            'category_summary': category_summary,
             'selected_period': self.request.GET.get('period', 'current_month'),
             'date_from': date_from,
             'date_to': date_to,
         })
 
         return context
+
+
+def get_dashboard_view():
+    """
+    Return the dashboard view class selected by settings.ASYNC_DASHBOARD.
+    """
+    return AsyncDashboardView if settings.ASYNC_DASHBOARD else DashboardView
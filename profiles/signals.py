@@ -1,17 +1,17 @@
 """
 Signals for the profiles app.
 
-Automatically creates a Profile instance when a new User is created.
+Automatically creates a Profile instance and the default categories
+when a new User is created.
 """
 
 from django.conf import settings
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 
-from .models import Profile
+from categories.utils import create_default_categories_for_new_user
 
-# TODO: Implement default categories creation after categories.utils module is ready
-# from categories.utils import create_default_categories_for_user
+from .models import Profile
 
 
 @receiver(post_save, sender=settings.AUTH_USER_MODEL)
@@ -33,20 +33,22 @@ def create_user_profile(sender, instance, created, **kwargs):
         )
 
 
-# TODO: Uncomment this signal when categories.utils.create_default_categories_for_user is implemented
-# @receiver(post_save, sender=settings.AUTH_USER_MODEL)
-# def create_user_default_categories(sender, instance, created, **kwargs):
-#     """
-#     Create default categories automatically when a new User is created.
-#
-#     Args:
-#         sender: The model class (User)
-#         instance: The actual User instance being saved
-#         created: Boolean indicating if this is a new User
-#         **kwargs: Additional keyword arguments
-#     """
-#     if created:
-#         create_default_categories_for_user(instance)
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def create_user_default_categories(sender, instance, created, **kwargs):
+    """
+    Create default categories automatically when a new User is created.
+
+    The categories are inserted in a single query (see
+    categories.utils.create_default_categories_for_new_user).
+
+    Args:
+        sender: The model class (User)
+        instance: The actual User instance being saved
+        created: Boolean indicating if this is a new User
+        **kwargs: Additional keyword arguments
+    """
+    if created and not kwargs.get('raw'):
+        create_default_categories_for_new_user(instance)
 
 
 @receiver(post_save, sender=settings.AUTH_USER_MODEL)
@@ -6,6 +6,7 @@
  * - Dynamic category filtering based on transaction type
  * - Date picker enhancements
  * - Numeric value validation and formatting
+ * - Bulk selection of transactions in the list
  */
 
 (function() {
@@ -400,6 +401,70 @@
         }
     };
 
+    /**
+     * BulkActions class handles the bulk action bar of the transaction list
+     */
+    class BulkActions {
+        constructor() {
+            this.form = document.getElementById('bulk-action-form');
+            this.selectAll = document.getElementById('bulk-select-all');
+            this.actionSelect = document.getElementById('bulk_action');
+            this.counter = document.getElementById('bulk-selected-count');
+
+            if (this.form) {
+                this.init();
+            }
+        }
+
+        /**
+         * Initialize selection and submit handlers
+         */
+        init() {
+            this.checkboxes = Array.from(document.querySelectorAll('input[name="transactions"][form="bulk-action-form"]'));
+
+            if (this.selectAll) {
+                this.selectAll.addEventListener('change', () => {
+                    this.checkboxes.forEach(checkbox => {
+                        checkbox.checked = this.selectAll.checked;
+                    });
+                    this.updateCounter();
+                });
+            }
+
+            this.checkboxes.forEach(checkbox => {
+                checkbox.addEventListener('change', () => this.updateCounter());
+            });
+
+            // Ask for confirmation before deleting the selected transactions
+            this.form.addEventListener('submit', (event) => {
+                const selected = this.getSelectedCount();
+                if (!selected) {
+                    event.preventDefault();
+                    return;
+                }
+                if (this.actionSelect && this.actionSelect.value === 'delete' &&
+                        !window.confirm(`Excluir ${selected} transação(ões) selecionada(s)?`)) {
+                    event.preventDefault();
+                }
+            });
+
+            this.updateCounter();
+        }
+
+        getSelectedCount() {
+            return this.checkboxes.filter(checkbox => checkbox.checked).length;
+        }
+
+        /**
+         * Show how many transactions are selected
+         */
+        updateCounter() {
+            if (this.counter) {
+                this.counter.textContent = this.getSelectedCount();
+            }
+        }
+    }
+
     /**
      * Initialize on DOM ready
      */
@@ -409,6 +474,9 @@
 
         // Initialize filter form handlers
         new TransactionFilter();
+
+        // Initialize the bulk actions of the transaction list
+        new BulkActions();
     }
 
     // Run on DOM ready
@@ -422,6 +490,7 @@
     window.FinanpyTransactions = {
         TransactionForm,
         TransactionFilter,
+        BulkActions,
         Utils
     };
 
@@ -1,6 +1,41 @@
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
+from django.template.response import TemplateResponse
 
-from .models import Transaction
+from accounts.models import Account
+from categories.models import Category
+
+from .models import ArchivedTransaction, RecurringTransaction, Transaction
+from .search import search_transactions
+from .services import bulk_delete_transactions, bulk_update_transactions
+from .validators import validate_account
+
+
+class TransactionMoveForm(forms.Form):
+    """
+    Destination of the admin's move action, restricted to the owner of the transactions.
+    """
+
+    account = forms.ModelChoiceField(queryset=Account.objects.none(), required=False, label='Conta')
+    category = forms.ModelChoiceField(queryset=Category.objects.none(), required=False, label='Categoria')
+
+    def __init__(self, *args, **kwargs):
+        self.user = kwargs.pop('user')
+        super().__init__(*args, **kwargs)
+        self.fields['account'].queryset = Account.objects.filter(user=self.user).order_by('name')
+        self.fields['category'].queryset = Category.objects.filter(user=self.user).order_by('category_type', 'name')
+
+    def clean_account(self):
+        account = self.cleaned_data.get('account')
+        if account:
+            validate_account(account, self.user)
+        return account
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if not cleaned_data.get('account') and not cleaned_data.get('category'):
+            raise forms.ValidationError('Selecione a conta e/ou a categoria de destino.')
+        return cleaned_data
 
 
 @admin.register(Transaction)
@@ -13,6 +48,7 @@ class TransactionAdmin(admin.ModelAdmin):
     date_hierarchy = 'transaction_date'
     readonly_fields = ['created_at', 'updated_at']
     ordering = ['-transaction_date', '-created_at']
+    actions = ['move_selected']
 
     fieldsets = (
         ('Informações Básicas', {
@@ -26,3 +62,73 @@ class TransactionAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
     )
+
+    def get_search_results(self, request, queryset, search_term):
+        """Search the description through the full-text index instead of LIKE."""
+        return search_transactions(queryset, search_term), False
+
+    def delete_queryset(self, request, queryset):
+        """Delete the selected transactions with one statement and one balance update per account."""
+        bulk_delete_transactions(queryset)
+
+    @admin.action(description='Mover transações selecionadas para outra conta/categoria')
+    def move_selected(self, request, queryset):
+        """
+        Move the selected transactions of one user to another account and/or category.
+        Moving to a category of the other type changes their type.
+        """
+        user_ids = list(queryset.order_by().values_list('user_id', flat=True).distinct()[:2])
+        if len(user_ids) != 1:
+            self.message_user(request, 'Selecione transações de um único usuário.', messages.ERROR)
+            return None
+
+        user = queryset.first().user
+        form = TransactionMoveForm(request.POST if 'apply' in request.POST else None, user=user)
+        if form.is_valid():
+            updated = bulk_update_transactions(
+                queryset,
+                account=form.cleaned_data['account'],
+                category=form.cleaned_data['category'],
+            )
+            self.message_user(request, f'{updated} transação(ões) atualizada(s).', messages.SUCCESS)
+            return None
+
+        return TemplateResponse(request, 'admin/transactions/transaction/move_selected.html', {
+            **self.admin_site.each_context(request),
+            'title': 'Mover transações',
+            'opts': self.model._meta,
+            'form': form,
+            'queryset': queryset,
+            'action_checkbox_name': admin.helpers.ACTION_CHECKBOX_NAME,
+        })
+
+
+@admin.register(RecurringTransaction)
+class RecurringTransactionAdmin(admin.ModelAdmin):
+    """Admin interface for RecurringTransaction model."""
+
+    list_display = ['description', 'amount', 'transaction_type', 'frequency', 'interval', 'next_run', 'is_active', 'user']
+    list_filter = ['frequency', 'transaction_type', 'is_active']
+    search_fields = ['description']
+    readonly_fields = ['created_at', 'updated_at']
+    ordering = ['next_run', 'description']
+
+
+@admin.register(ArchivedTransaction)
+class ArchivedTransactionAdmin(admin.ModelAdmin):
+    """Read-only admin interface for ArchivedTransaction model."""
+
+    list_display = ['description', 'amount', 'transaction_type', 'category', 'account', 'transaction_date', 'user']
+    list_filter = ['transaction_type', 'user']
+    search_fields = ['description']
+    date_hierarchy = 'transaction_date'
+    ordering = ['-transaction_date', '-created_at']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
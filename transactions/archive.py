@@ -0,0 +1,241 @@
+"""
+Archive tier for old transactions.
+
+Transactions dated before the archive cutoff (the first day of the month
+TRANSACTION_ARCHIVE_MONTHS months ago) are moved from the live table into
+ArchivedTransaction by archive_transactions(), so the live table and its
+indexes only carry recent history. Rows are moved with INSERT ... SELECT
+and DELETE statements, without the write-path signals: account balances,
+the monthly rollups and the category counters keep counting archived rows,
+so dashboard totals over whole months stay exact.
+
+Reads go through to the archive only when they reach dates before the
+cutoff: the dashboard sums partial months older than the cutoff from both
+tables, and the transaction list combines both tables (CombinedQuerySet)
+when its date filters start before it.
+"""
+
+import heapq
+from datetime import date
+from itertools import islice
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+
+from core.cache import bump_user_data_version_on_commit
+
+from .models import ArchivedTransaction, Transaction
+
+
+# Rows moved per statement (and per database transaction)
+ARCHIVE_BATCH_SIZE = 500
+
+# Columns copied between the live and the archive tables
+MOVED_COLUMNS = [field.column for field in ArchivedTransaction._meta.concrete_fields]
+
+
+def get_archive_cutoff(today=None):
+    """
+    Return the first date kept in the live table, or None when the archive is disabled.
+    """
+    months = settings.TRANSACTION_ARCHIVE_MONTHS
+    if not months:
+        return None
+    today = today or date.today()
+    index = today.year * 12 + today.month - 1 - months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def reaches_archive(date_from=None, date_to=None):
+    """
+    Return whether a date filter reaches the archive.
+
+    An unfiltered list only shows live transactions; a filter reaches the
+    archive when its range starts before the cutoff (or has no start).
+    """
+    cutoff = get_archive_cutoff()
+    if cutoff is None or (date_from is None and date_to is None):
+        return False
+    return date_from is None or date_from < cutoff
+
+
+def _move_rows(source, target, condition, user_ids=None, batch_size=ARCHIVE_BATCH_SIZE):
+    """
+    Move the rows of source matching condition into target, batch by batch.
+
+    Each batch locks its rows, copies them with INSERT ... SELECT and deletes
+    them in one database transaction.
+
+    Returns:
+        int: Number of rows moved
+    """
+    queryset = source.objects.filter(condition)
+    if user_ids is not None:
+        queryset = queryset.filter(user_id__in=list(user_ids))
+
+    columns = ', '.join(connection.ops.quote_name(column) for column in MOVED_COLUMNS)
+    source_table = connection.ops.quote_name(source._meta.db_table)
+    target_table = connection.ops.quote_name(target._meta.db_table)
+
+    moved = 0
+    while True:
+        with transaction.atomic():
+            rows = list(
+                queryset.select_for_update().order_by('pk').values_list('pk', 'user_id')[:batch_size]
+            )
+            if not rows:
+                break
+
+            ids = [pk for pk, _ in rows]
+            placeholders = ', '.join(['%s'] * len(ids))
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'INSERT INTO {target_table} ({columns}) '
+                    f'SELECT {columns} FROM {source_table} WHERE id IN ({placeholders})',
+                    ids,
+                )
+                cursor.execute(f'DELETE FROM {source_table} WHERE id IN ({placeholders})', ids)
+
+            bump_user_data_version_on_commit(*{user_id for _, user_id in rows})
+        moved += len(rows)
+
+    return moved
+
+
+def archive_transactions(cutoff, user_ids=None, batch_size=ARCHIVE_BATCH_SIZE):
+    """
+    Move the transactions dated before cutoff into the archive.
+
+    Args:
+        cutoff: First date kept in the live table
+        user_ids: Optional iterable of user IDs (default: every user)
+        batch_size: Rows moved per database transaction
+
+    Returns:
+        int: Number of transactions archived
+    """
+    return _move_rows(Transaction, ArchivedTransaction, Q(transaction_date__lt=cutoff), user_ids, batch_size)
+
+
+def restore_transactions(cutoff=None, user_ids=None, batch_size=ARCHIVE_BATCH_SIZE):
+    """
+    Move archived transactions dated on or after cutoff back into the live table.
+    With cutoff None (archive disabled), every archived transaction is restored.
+
+    Returns:
+        int: Number of transactions restored
+    """
+    condition = Q(transaction_date__gte=cutoff) if cutoff is not None else Q()
+    return _move_rows(ArchivedTransaction, Transaction, condition, user_ids, batch_size)
+
+
+class CombinedQuerySet:
+    """
+    Read-only view over live and archived transaction querysets.
+
+    Supports the subset of the QuerySet API used by the transaction list,
+    its paginators, totals and export: filter(), order_by(), values(),
+    values_list(), slicing, count(), aggregate() (additive aggregates only)
+    and iteration. Each queryset is read in the common order and the rows
+    are merged, so a page only reads page-size rows from each table.
+    """
+
+    model = Transaction
+    ordered = True
+
+    def __init__(self, *querysets, ordering=None, fields=None, bounds=(0, None)):
+        self.querysets = querysets
+        self.ordering = tuple(ordering or Transaction._meta.ordering)
+        self.fields = fields
+        self.bounds = bounds
+        self._result_cache = None
+
+    def _chain(self, method, *args, **kwargs):
+        return CombinedQuerySet(
+            *(getattr(queryset, method)(*args, **kwargs) for queryset in self.querysets),
+            ordering=self.ordering,
+            fields=self.fields,
+            bounds=self.bounds,
+        )
+
+    def filter(self, *args, **kwargs):
+        return self._chain('filter', *args, **kwargs)
+
+    def order_by(self, *field_names):
+        combined = self._chain('order_by', *field_names)
+        if field_names:
+            combined.ordering = field_names
+        return combined
+
+    def values(self, *fields):
+        combined = self._chain('values', *fields)
+        combined.fields = fields
+        return combined
+
+    def values_list(self, *fields, **kwargs):
+        combined = self._chain('values_list', *fields, **kwargs)
+        combined.fields = fields
+        return combined
+
+    def __getitem__(self, item):
+        if not isinstance(item, slice) or item.step is not None:
+            raise TypeError('CombinedQuerySet only supports slices without step')
+
+        # Bounds are positions in the merged rows of the unsliced querysets
+        offset, limit = self.bounds
+        start = offset + (item.start or 0)
+        stop = offset + item.stop if item.stop is not None else limit
+        if limit is not None:
+            stop = min(stop, limit)
+
+        return CombinedQuerySet(
+            *(queryset[:stop] if stop is not None else queryset for queryset in self.querysets),
+            ordering=self.ordering,
+            fields=self.fields,
+            bounds=(start, stop),
+        )
+
+    def _key(self, row):
+        names = [name.lstrip('-') for name in self.ordering]
+        if isinstance(row, dict):
+            return tuple(row[name] for name in names if name in row)
+        if isinstance(row, tuple):
+            return tuple(row[self.fields.index(name)] for name in names if name in self.fields)
+        return tuple(getattr(row, 'pk' if name == 'id' else name) for name in names)
+
+    def _merge(self, iterables):
+        descending = {name.startswith('-') for name in self.ordering}
+        if len(descending) > 1:
+            raise ValueError('CombinedQuerySet needs every ordering field in the same direction')
+        merged = heapq.merge(*iterables, key=self._key, reverse=descending == {True})
+        return islice(merged, self.bounds[0], self.bounds[1])
+
+    def iterator(self, chunk_size=None):
+        return self._merge(queryset.iterator(chunk_size=chunk_size) for queryset in self.querysets)
+
+    def __iter__(self):
+        if self._result_cache is None:
+            self._result_cache = list(self._merge(self.querysets))
+        return iter(self._result_cache)
+
+    def __len__(self):
+        return len(list(iter(self)))
+
+    def __bool__(self):
+        return bool(len(self))
+
+    def count(self):
+        total = sum(queryset.count() for queryset in self.querysets)
+        start, stop = self.bounds
+        if stop is not None:
+            total = min(total, stop)
+        return max(total - start, 0)
+
+    def aggregate(self, **aggregates):
+        totals = dict.fromkeys(aggregates)
+        for queryset in self.querysets:
+            for name, value in queryset.aggregate(**aggregates).items():
+                if value is not None:
+                    totals[name] = value if totals[name] is None else totals[name] + value
+        return totals
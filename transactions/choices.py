@@ -0,0 +1,115 @@
+"""
+Per-request choices for the transaction forms.
+
+UserChoices reads the accounts and categories offered to a user from the
+per-user reference data cache and keeps them for the rest of the request.
+The forms use CachedModelChoiceField, which renders its options and
+validates submitted values from those lists instead of querying its
+queryset.
+"""
+
+from django import forms
+from django.core.exceptions import ValidationError
+from django.forms.models import ModelChoiceIterator
+from django.utils.functional import cached_property
+
+from core.reference import get_reference_data
+
+
+class UserChoices:
+    """
+    Active accounts and categories of a user, read once from the cached
+    reference data (see core.reference).
+    """
+
+    def __init__(self, user):
+        self.user = user
+
+    @cached_property
+    def reference(self):
+        return get_reference_data(self.user.pk)
+
+    @cached_property
+    def accounts(self):
+        return [account for account in self.reference.accounts if account.is_active]
+
+    @cached_property
+    def categories(self):
+        return self.reference.categories
+
+    @cached_property
+    def category_choices_with_type(self):
+        """
+        Return (pk, name, category_type) tuples, used for the data-type option attributes.
+        """
+        return [(category.pk, category.name, category.category_type) for category in self.categories]
+
+
+def get_user_choices(request):
+    """
+    Return the UserChoices of the request's user, created once per request.
+    """
+    if not hasattr(request, '_user_choices'):
+        request._user_choices = UserChoices(request.user)
+    return request._user_choices
+
+
+class CachedModelChoiceIterator(ModelChoiceIterator):
+    """
+    Iterate over the field's preloaded objects, when set, instead of its queryset.
+    """
+
+    def __iter__(self):
+        if self.field.objects is None:
+            yield from super().__iter__()
+            return
+        if self.field.empty_label is not None:
+            yield ('', self.field.empty_label)
+        for obj in self.field.objects:
+            yield self.choice(obj)
+
+    def __len__(self):
+        if self.field.objects is None:
+            return super().__len__()
+        return len(self.field.objects) + (1 if self.field.empty_label is not None else 0)
+
+    def __bool__(self):
+        if self.field.objects is None:
+            return super().__bool__()
+        return self.field.empty_label is not None or bool(self.field.objects)
+
+
+class CachedModelChoiceField(forms.ModelChoiceField):
+    """
+    ModelChoiceField whose options come from a list set with set_objects().
+    Until a list is set, it behaves like a regular ModelChoiceField.
+    """
+
+    iterator = CachedModelChoiceIterator
+
+    def __init__(self, *args, **kwargs):
+        self.objects = None
+        super().__init__(*args, **kwargs)
+
+    def set_objects(self, objects):
+        """
+        Use the given objects as the field's options, without querying its queryset.
+        """
+        self.objects = objects
+        self._objects_by_pk = {str(obj.pk): obj for obj in objects}
+        # Hand the widget a fresh iterator over the objects
+        self.widget.choices = self.choices
+
+    def to_python(self, value):
+        if self.objects is None:
+            return super().to_python(value)
+        if value in self.empty_values:
+            return None
+        try:
+            return self._objects_by_pk[str(getattr(value, 'pk', value))]
+        except KeyError:
+            raise ValidationError(
+                self.error_messages['invalid_choice'],
+                code='invalid_choice',
+                params={'value': value},
+            )
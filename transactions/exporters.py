@@ -0,0 +1,221 @@
+"""
+Transaction exporters for the transactions app.
+
+Turn a transaction queryset into a stream of CSV or XLSX bytes. Rows are
+read with values_list().iterator(), so neither the queryset results nor
+the generated file are ever held in memory as a whole.
+"""
+
+import csv
+import re
+import zipfile
+from datetime import date
+from xml.sax.saxutils import escape
+
+from .models import Transaction
+
+
+# Supported export formats
+CSV = 'csv'
+XLSX = 'xlsx'
+
+EXPORT_CONTENT_TYPES = {
+    CSV: 'text/csv; charset=utf-8',
+    XLSX: 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+# Number of rows fetched from the database per round-trip
+EXPORT_CHUNK_SIZE = 2000
+
+EXPORT_HEADER = ['Data', 'Descrição', 'Tipo', 'Categoria', 'Conta', 'Valor']
+
+EXPORT_FIELDS = [
+    'transaction_date',
+    'description',
+    'transaction_type',
+    'category__name',
+    'account__name',
+    'amount',
+]
+
+TRANSACTION_TYPE_LABELS = dict(Transaction.TRANSACTION_TYPE_CHOICES)
+
+
+def iter_export_rows(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yield export rows (tuples matching EXPORT_HEADER) from a transaction queryset.
+    """
+    rows = queryset.values_list(*EXPORT_FIELDS).iterator(chunk_size=chunk_size)
+    for transaction_date, description, transaction_type, category, account, amount in rows:
+        yield (
+            transaction_date,
+            description,
+            TRANSACTION_TYPE_LABELS.get(transaction_type, transaction_type),
+            category,
+            account,
+            amount,
+        )
+
+
+class _Echo:
+    """
+    File-like object that returns what is written instead of buffering it.
+    """
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(rows):
+    """
+    Yield a CSV file, one encoded line at a time.
+    Starts with a UTF-8 BOM so spreadsheet applications detect the encoding.
+    """
+    writer = csv.writer(_Echo())
+    yield '\ufeff'.encode('utf-8')
+    yield writer.writerow(EXPORT_HEADER).encode('utf-8')
+    for row in rows:
+        yield writer.writerow(row).encode('utf-8')
+
+
+class _ChunkBuffer:
+    """
+    Write-only, non-seekable file object that collects bytes until drained.
+    Lets zipfile produce an archive that is streamed out piece by piece.
+    """
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+XLSX_STATIC_PARTS = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '<Override PartName="/xl/styles.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/workbook.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Transações" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        '<Relationship Id="rId2" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+        'Target="styles.xml"/>'
+        '</Relationships>'
+    ),
+    # Style 1 formats dates (dd/mm/yyyy), style 2 formats amounts with two decimals
+    'xl/styles.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+        '<numFmts count="1"><numFmt numFmtId="164" formatCode="dd/mm/yyyy"/></numFmts>'
+        '<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+        '<fills count="1"><fill><patternFill patternType="none"/></fill></fills>'
+        '<borders count="1"><border/></borders>'
+        '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+        '<cellXfs count="3">'
+        '<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+        '<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+        '<xf numFmtId="4" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+        '</cellXfs>'
+        '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+        '</styleSheet>'
+    ),
+}
+
+# Control characters XML 1.0 forbids even when escaped; removed from text cells
+XML_INVALID_CHARACTERS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+# Day zero of the spreadsheet date system (accounts for the 1900 leap year bug)
+XLSX_EPOCH = date(1899, 12, 30)
+
+
+def _xlsx_cell(value):
+    """
+    Render a single worksheet cell for a Python value.
+    """
+    if value is None:
+        return '<c/>'
+    if isinstance(value, date):
+        return f'<c s="1"><v>{(value - XLSX_EPOCH).days}</v></c>'
+    if isinstance(value, (int, float)) or hasattr(value, 'quantize'):
+        return f'<c s="2"><v>{value}</v></c>'
+    text = XML_INVALID_CHARACTERS.sub('', str(value))
+    return f'<c t="inlineStr"><is><t>{escape(text)}</t></is></c>'
+
+
+def _xlsx_row(values):
+    return '<row>' + ''.join(_xlsx_cell(value) for value in values) + '</row>'
+
+
+def iter_xlsx(rows, flush_every=500):
+    """
+    Yield an XLSX workbook with a single sheet, as a stream of zip archive chunks.
+
+    Uses inline strings so no shared string table has to be kept in memory,
+    and drains the compressed output every flush_every rows.
+    """
+    buffer = _ChunkBuffer()
+
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, content in XLSX_STATIC_PARTS.items():
+            archive.writestr(name, content)
+        yield buffer.drain()
+
+        with archive.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                b'<sheetData>'
+            )
+            sheet.write(_xlsx_row(EXPORT_HEADER).encode('utf-8'))
+
+            for count, row in enumerate(rows, start=1):
+                sheet.write(_xlsx_row(row).encode('utf-8'))
+                if count % flush_every == 0:
+                    yield buffer.drain()
+
+            sheet.write(b'</sheetData></worksheet>')
+
+    yield buffer.drain()
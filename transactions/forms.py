@@ -1,6 +1,7 @@
-from decimal import Decimal
 from django import forms
-from .models import Transaction
+from .choices import CachedModelChoiceField, UserChoices
+from .models import RecurringTransaction, Transaction
+from .validators import validate_account, validate_amount, validate_category
 from accounts.models import Account
 from categories.models import Category
 
@@ -10,11 +11,16 @@ class TransactionForm(forms.ModelForm):
     Form for creating and editing transactions.
     Filters accounts and categories by user, includes custom styling with TailwindCSS,
     and Portuguese labels. Adds data attributes to categories for JavaScript filtering by type.
+    New transactions get an optional 'repeat' field to create a recurring rule.
     """
 
     class Meta:
         model = Transaction
         fields = ['description', 'amount', 'transaction_date', 'transaction_type', 'category', 'account']
+        field_classes = {
+            'category': CachedModelChoiceField,
+            'account': CachedModelChoiceField,
+        }
         labels = {
             'description': 'Descrição',
             'amount': 'Valor',
@@ -87,34 +93,61 @@ class TransactionForm(forms.ModelForm):
 
     def __init__(self, *args, **kwargs):
         """
-        Initialize the form with user parameter.
+        Initialize the form with user and optional choices parameters.
         Filters accounts and categories by the logged-in user.
         Adds data attributes to category options for JavaScript filtering by type.
+
+        The accounts and categories are read from choices (a UserChoices shared
+        by the request), so rendering and validation issue no further queries.
         """
         self.user = kwargs.pop('user', None)
+        choices = kwargs.pop('choices', None)
         super().__init__(*args, **kwargs)
 
         if self.user:
+            choices = choices or UserChoices(self.user)
+
             # Filter accounts: only active accounts belonging to the user
             self.fields['account'].queryset = Account.objects.filter(
                 user=self.user,
                 is_active=True
             ).order_by('name')
+            self.fields['account'].set_objects(choices.accounts)
 
             # Filter categories: only categories belonging to the user
             # JavaScript in the template will filter by type dynamically
             self.fields['category'].queryset = Category.objects.filter(
                 user=self.user
             ).order_by('category_type', 'name')
+            self.fields['category'].set_objects(choices.categories)
 
             # Add data-type attribute to each category option for JavaScript filtering
             # This allows the template JavaScript to show/hide categories based on transaction_type
-            category_choices = []
-            for category in self.fields['category'].queryset:
-                category_choices.append((category.pk, category.name, category.category_type))
+            self.category_choices_with_type = choices.category_choices_with_type
+
+        # New transactions can be repeated by a recurring rule
+        if self.instance.pk is None:
+            self.fields['repeat'] = forms.ChoiceField(
+                required=False,
+                label='Repetir',
+                choices=[('', 'Não repetir')] + RecurringTransaction.FREQUENCY_CHOICES,
+                help_text='As próximas ocorrências serão criadas automaticamente',
+                widget=forms.Select(attrs={
+                    'class': 'w-full px-4 py-3 bg-gray-700 border border-gray-600 rounded-lg text-gray-100 focus:outline-none focus:ring-2 focus:ring-purple-600 focus:border-transparent transition duration-200',
+                })
+            )
 
-            # Store choices with data attributes
-            self._category_choices_with_type = category_choices
+    def _get_validation_exclusions(self):
+        """
+        Skip the model's foreign key checks for account and category.
+        The fields only accept objects loaded with the user's choices, so the
+        existence query run by the model validation would repeat that lookup.
+        """
+        exclude = super()._get_validation_exclusions()
+        for field in ('account', 'category'):
+            if self.fields[field].objects is not None:
+                exclude.add(field)
+        return exclude
 
     def clean_description(self):
         """
@@ -131,18 +164,7 @@ class TransactionForm(forms.ModelForm):
         Custom validation for amount field.
         Ensures the amount is positive (greater than 0).
         """
-        amount = self.cleaned_data.get('amount')
-
-        if amount is None:
-            raise forms.ValidationError('O valor é obrigatório')
-
-        if amount <= Decimal('0'):
-            raise forms.ValidationError(
-                'O valor deve ser maior que zero. '
-                'Informe apenas valores positivos.'
-            )
-
-        return amount
+        return validate_amount(self.cleaned_data.get('amount'))
 
     def clean_category(self):
         """
@@ -153,17 +175,7 @@ class TransactionForm(forms.ModelForm):
         transaction_type = self.cleaned_data.get('transaction_type')
 
         if category and self.user:
-            # Verify the category belongs to the user
-            if category.user != self.user:
-                raise forms.ValidationError('Selecione uma categoria válida')
-
-            # Verify the category type matches the transaction type
-            if transaction_type and category.category_type != transaction_type:
-                type_label = 'receita' if transaction_type == Transaction.INCOME else 'despesa'
-                raise forms.ValidationError(
-                    f'A categoria selecionada não é do tipo {type_label}. '
-                    f'Selecione uma categoria compatível.'
-                )
+            validate_category(category, self.user, transaction_type)
 
         return category
 
@@ -175,16 +187,7 @@ class TransactionForm(forms.ModelForm):
         account = self.cleaned_data.get('account')
 
         if account and self.user:
-            # Verify the account belongs to the user
-            if account.user != self.user:
-                raise forms.ValidationError('Selecione uma conta válida')
-
-            # Verify the account is active
-            if not account.is_active:
-                raise forms.ValidationError(
-                    'A conta selecionada está inativa. '
-                    'Selecione uma conta ativa.'
-                )
+            validate_account(account, self.user)
 
         return account
 
@@ -219,6 +222,17 @@ class TransactionFilterForm(forms.Form):
         (Transaction.EXPENSE, 'Despesa'),
     ]
 
+    q = forms.CharField(
+        required=False,
+        label='Buscar',
+        max_length=100,
+        widget=forms.TextInput(attrs={
+            'type': 'search',
+            'class': 'w-full px-4 py-3 bg-gray-700 border border-gray-600 rounded-lg text-gray-100 placeholder-gray-400 focus:outline-none focus:ring-2 focus:ring-purple-600 focus:border-transparent transition duration-200',
+            'placeholder': 'Buscar na descrição',
+        })
+    )
+
     date_from = forms.DateField(
         required=False,
         label='Data inicial',
@@ -246,7 +260,7 @@ class TransactionFilterForm(forms.Form):
         })
     )
 
-    category = forms.ModelChoiceField(
+    category = CachedModelChoiceField(
         required=False,
         label='Categoria',
         queryset=Category.objects.none(),  # Will be set in __init__ based on user
@@ -256,7 +270,7 @@ class TransactionFilterForm(forms.Form):
         })
     )
 
-    account = forms.ModelChoiceField(
+    account = CachedModelChoiceField(
         required=False,
         label='Conta',
         queryset=Account.objects.none(),  # Will be set in __init__ based on user
@@ -268,23 +282,29 @@ class TransactionFilterForm(forms.Form):
 
     def __init__(self, *args, **kwargs):
         """
-        Initialize the form with user parameter.
-        Filters accounts and categories by the logged-in user.
+        Initialize the form with user and optional choices parameters.
+        Filters accounts and categories by the logged-in user, reading them
+        from choices like TransactionForm.
         """
         self.user = kwargs.pop('user', None)
+        choices = kwargs.pop('choices', None)
         super().__init__(*args, **kwargs)
 
         if self.user:
+            choices = choices or UserChoices(self.user)
+
             # Filter accounts: only active accounts belonging to the user
             self.fields['account'].queryset = Account.objects.filter(
                 user=self.user,
                 is_active=True
             ).order_by('name')
+            self.fields['account'].set_objects(choices.accounts)
 
             # Filter categories: all categories belonging to the user
             self.fields['category'].queryset = Category.objects.filter(
                 user=self.user
             ).order_by('category_type', 'name')
+            self.fields['category'].set_objects(choices.categories)
 
     def clean(self):
         """
@@ -300,3 +320,120 @@ class TransactionFilterForm(forms.Form):
             )
 
         return cleaned_data
+
+
+class TransactionBulkActionForm(forms.Form):
+    """
+    Form for the bulk actions of the transaction list.
+    Deletes the selected transactions or moves them to another account or
+    category. Moving to a category of the other type changes their type.
+    """
+
+    DELETE = 'delete'
+    MOVE_ACCOUNT = 'move_account'
+    MOVE_CATEGORY = 'move_category'
+
+    ACTION_CHOICES = [
+        (DELETE, 'Excluir selecionadas'),
+        (MOVE_ACCOUNT, 'Mover para a conta'),
+        (MOVE_CATEGORY, 'Mover para a categoria (define o tipo)'),
+    ]
+
+    action = forms.ChoiceField(
+        label='Ação',
+        choices=ACTION_CHOICES,
+        error_messages={
+            'required': 'Selecione uma ação',
+            'invalid_choice': 'Selecione uma ação válida',
+        },
+        widget=forms.Select(attrs={
+            'class': 'px-4 py-2 bg-gray-700 border border-gray-600 rounded-lg text-gray-100 text-sm focus:outline-none focus:ring-2 focus:ring-purple-600 focus:border-transparent transition duration-200',
+        })
+    )
+
+    transactions = forms.ModelMultipleChoiceField(
+        queryset=Transaction.objects.none(),  # Will be set in __init__ based on user
+        error_messages={
+            'required': 'Selecione ao menos uma transação',
+            'invalid_choice': 'Selecione transações válidas',
+            'invalid_pk_value': 'Selecione transações válidas',
+        },
+        widget=forms.MultipleHiddenInput
+    )
+
+    account = CachedModelChoiceField(
+        required=False,
+        label='Conta',
+        queryset=Account.objects.none(),  # Will be set in __init__ based on user
+        empty_label='Conta de destino',
+        widget=forms.Select(attrs={
+            'class': 'px-4 py-2 bg-gray-700 border border-gray-600 rounded-lg text-gray-100 text-sm focus:outline-none focus:ring-2 focus:ring-purple-600 focus:border-transparent transition duration-200',
+        })
+    )
+
+    category = CachedModelChoiceField(
+        required=False,
+        label='Categoria',
+        queryset=Category.objects.none(),  # Will be set in __init__ based on user
+        empty_label='Categoria de destino',
+        widget=forms.Select(attrs={
+            'class': 'px-4 py-2 bg-gray-700 border border-gray-600 rounded-lg text-gray-100 text-sm focus:outline-none focus:ring-2 focus:ring-purple-600 focus:border-transparent transition duration-200',
+        })
+    )
+
+    def __init__(self, *args, **kwargs):
+        """
+        Initialize the form with user and optional choices parameters.
+        Only the user's transactions can be selected; accounts and categories
+        are read from choices like TransactionForm.
+        """
+        self.user = kwargs.pop('user', None)
+        choices = kwargs.pop('choices', None)
+        super().__init__(*args, **kwargs)
+
+        if self.user:
+            choices = choices or UserChoices(self.user)
+
+            self.fields['transactions'].queryset = Transaction.objects.filter(user=self.user)
+
+            # Filter accounts: only active accounts belonging to the user
+            self.fields['account'].queryset = Account.objects.filter(
+                user=self.user,
+                is_active=True
+            ).order_by('name')
+            self.fields['account'].set_objects(choices.accounts)
+
+            # Filter categories: all categories belonging to the user
+            self.fields['category'].queryset = Category.objects.filter(
+                user=self.user
+            ).order_by('category_type', 'name')
+            self.fields['category'].set_objects(choices.categories)
+
+    def clean(self):
+        """
+        Require the destination of the move actions and validate it like TransactionForm.
+        """
+        cleaned_data = super().clean()
+        action = cleaned_data.get('action')
+        account = cleaned_data.get('account')
+        category = cleaned_data.get('category')
+
+        if action == self.MOVE_ACCOUNT:
+            if not account:
+                self.add_error('account', 'Selecione a conta de destino')
+            elif self.user:
+                try:
+                    validate_account(account, self.user)
+                except forms.ValidationError as error:
+                    self.add_error('account', error)
+
+        if action == self.MOVE_CATEGORY:
+            if not category:
+                self.add_error('category', 'Selecione a categoria de destino')
+            elif self.user:
+                try:
+                    validate_category(category, self.user)
+                except forms.ValidationError as error:
+                    self.add_error('category', error)
+
+        return cleaned_data
@@ -0,0 +1,390 @@
+"""
+Bank statement importers for the transactions app.
+
+Streams CSV and OFX statements through a generator pipeline:
+parse -> normalize -> map -> dedupe -> write. Every stage consumes its
+input lazily, so memory use is bounded by the batch size no matter how
+large the statement file is.
+"""
+
+import csv
+import re
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.utils import timezone
+
+from categories.models import Category
+
+from .archive import reaches_archive
+from .models import ArchivedTransaction, Transaction
+from .services import INGESTION_BATCH_SIZE, ImportErrors, build_transaction, bulk_insert_transactions
+
+
+# Supported statement formats
+CSV = 'csv'
+OFX = 'ofx'
+
+STATEMENT_FORMAT_CHOICES = [
+    (CSV, 'CSV'),
+    (OFX, 'OFX'),
+]
+
+# Default text encodings (OFX 1.x files default to Windows-1252)
+DEFAULT_ENCODINGS = {
+    CSV: 'utf-8-sig',
+    OFX: 'cp1252',
+}
+
+# Accepted CSV header names for each normalized field
+CSV_COLUMN_ALIASES = {
+    'transaction_date': ['transaction_date', 'date', 'data', 'data lançamento', 'data lancamento'],
+    'description': ['description', 'descrição', 'descricao', 'histórico', 'historico', 'memo'],
+    'amount': ['amount', 'valor', 'value'],
+    'transaction_type': ['transaction_type', 'type', 'tipo'],
+    'category': ['category', 'categoria'],
+}
+
+# Accepted values for an explicit transaction type column
+TRANSACTION_TYPE_ALIASES = {
+    'income': Transaction.INCOME,
+    'receita': Transaction.INCOME,
+    'credit': Transaction.INCOME,
+    'crédito': Transaction.INCOME,
+    'credito': Transaction.INCOME,
+    'c': Transaction.INCOME,
+    'expense': Transaction.EXPENSE,
+    'despesa': Transaction.EXPENSE,
+    'debit': Transaction.EXPENSE,
+    'débito': Transaction.EXPENSE,
+    'debito': Transaction.EXPENSE,
+    'd': Transaction.EXPENSE,
+}
+
+DATE_FORMATS = ['%Y-%m-%d', '%d/%m/%Y', '%d/%m/%y', '%d-%m-%Y', '%Y%m%d']
+
+# Size of the chunks read from OFX files (they may have no line breaks at all)
+OFX_READ_CHUNK_SIZE = 64 * 1024
+
+# Longest text kept from a single OFX token; longer values are truncated
+OFX_MAX_TOKEN_SIZE = 64 * 1024
+
+
+OFX_TOKEN_RE = re.compile(r'<(/?)([A-Za-z0-9.]+)>([^<]*)')
+
+# OFX transaction tags mapped to normalized field names
+OFX_FIELDS = {
+    'DTPOSTED': 'transaction_date',
+    'TRNAMT': 'amount',
+    'NAME': 'name',
+    'MEMO': 'memo',
+}
+
+
+def detect_format(filename):
+    """
+    Guess the statement format from the file name extension.
+
+    Returns:
+        str: OFX for .ofx/.qfx files, CSV otherwise
+    """
+    if filename.lower().endswith(('.ofx', '.qfx')):
+        return OFX
+    return CSV
+
+
+def parse_csv(stream):
+    """
+    Parse a CSV statement into raw records.
+
+    The delimiter (comma, semicolon or tab) is detected from the header row
+    and header names are matched against CSV_COLUMN_ALIASES.
+
+    Args:
+        stream: Text file object or any iterable of lines
+
+    Yields:
+        tuple: (row_number, record) where record maps normalized field names to raw strings
+    """
+    lines = iter(stream)
+    header_line = next(lines, '')
+    delimiter = max([',', ';', '\t'], key=header_line.count)
+
+    header = next(csv.reader([header_line], delimiter=delimiter), [])
+    columns = {}
+    for index, name in enumerate(header):
+        name = name.strip().lower()
+        for field, aliases in CSV_COLUMN_ALIASES.items():
+            if name in aliases and field not in columns:
+                columns[field] = index
+
+    for row_number, row in enumerate(csv.reader(lines, delimiter=delimiter), start=1):
+        if not any(cell.strip() for cell in row):
+            continue
+        yield row_number, {
+            field: row[index] if index < len(row) else ''
+            for field, index in columns.items()
+        }
+
+
+def _read_ofx_tokens(stream):
+    """
+    Yield (closing, tag, value) tokens from an OFX file read in fixed-size chunks.
+    Works for both SGML (OFX 1.x) and XML (OFX 2.x) files, with or without line breaks.
+    Text outside tags and values longer than OFX_MAX_TOKEN_SIZE are cut, so the
+    buffer stays bounded.
+    """
+    buffer = ''
+    for chunk in iter(lambda: stream.read(OFX_READ_CHUNK_SIZE), ''):
+        buffer += chunk
+        # Only tokenize up to the last '<': the rest may be an incomplete token
+        cut = buffer.rfind('<')
+        if cut <= 0:
+            # No token ends in the buffer: keep at most the start of the pending one
+            if len(buffer) > OFX_MAX_TOKEN_SIZE:
+                buffer = buffer[:OFX_MAX_TOKEN_SIZE] if cut == 0 else ''
+            continue
+        for match in OFX_TOKEN_RE.finditer(buffer, 0, cut):
+            yield match.group(1) == '/', match.group(2).upper(), match.group(3).strip()
+        buffer = buffer[cut:]
+
+    for match in OFX_TOKEN_RE.finditer(buffer):
+        yield match.group(1) == '/', match.group(2).upper(), match.group(3).strip()
+
+
+def parse_ofx(stream):
+    """
+    Parse an OFX statement into raw records, one per <STMTTRN> block.
+
+    Args:
+        stream: Text file object
+
+    Yields:
+        tuple: (row_number, record) where record maps normalized field names to raw strings
+    """
+    record = None
+    row_number = 0
+
+    for closing, tag, value in _read_ofx_tokens(stream):
+        if tag == 'STMTTRN':
+            if not closing:
+                record = {}
+                continue
+            if record is not None:
+                row_number += 1
+                name = record.pop('name', '')
+                memo = record.pop('memo', '')
+                record['description'] = name or memo
+                yield row_number, record
+            record = None
+        elif record is not None and not closing and tag in OFX_FIELDS:
+            record[OFX_FIELDS[tag]] = value
+
+
+def parse_amount(value):
+    """
+    Parse a signed amount written as 1234.56, 1.234,56, 1,234.56 or R$ -12,50.
+
+    Raises:
+        ValidationError: If the value is not a valid number
+    """
+    cleaned = re.sub(r'[^0-9,.\-+]', '', value or '')
+    if ',' in cleaned and '.' in cleaned:
+        # The last separator is the decimal one
+        thousands = '.' if cleaned.rfind(',') > cleaned.rfind('.') else ','
+        cleaned = cleaned.replace(thousands, '')
+    cleaned = cleaned.replace(',', '.')
+
+    try:
+        return Decimal(cleaned)
+    except InvalidOperation:
+        raise ValidationError('Digite um valor numérico válido')
+
+
+def parse_date(value):
+    """
+    Parse a date written in one of DATE_FORMATS or as an OFX timestamp.
+
+    Raises:
+        ValidationError: If the value is not a valid date
+    """
+    value = (value or '').strip()
+    # OFX timestamps look like 20240131120000[-3:BRT]; only the date part matters
+    if re.match(r'^\d{8}', value) and not re.match(r'^\d{8}$', value):
+        value = value[:8]
+
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, date_format).date()
+        except ValueError:
+            continue
+
+    raise ValidationError('Digite uma data válida')
+
+
+def normalize_records(records, errors):
+    """
+    Normalize raw records: parse dates and amounts and resolve the transaction type.
+
+    Without an explicit type column, negative amounts are expenses and
+    positive amounts are income. Invalid records are reported in errors.
+
+    Yields:
+        tuple: (row_number, record) with transaction_date, amount (positive),
+               transaction_type, description and optional category name
+    """
+    for row_number, record in records:
+        try:
+            amount = parse_amount(record.get('amount'))
+            raw_type = (record.get('transaction_type') or '').strip().lower()
+
+            if raw_type:
+                transaction_type = TRANSACTION_TYPE_ALIASES.get(raw_type)
+                if transaction_type is None:
+                    raise ValidationError('Selecione um tipo de transação válido')
+            else:
+                transaction_type = Transaction.EXPENSE if amount < 0 else Transaction.INCOME
+
+            yield row_number, {
+                'transaction_date': parse_date(record.get('transaction_date')),
+                'description': ' '.join((record.get('description') or '').split()),
+                'amount': abs(amount),
+                'transaction_type': transaction_type,
+                'category': (record.get('category') or '').strip(),
+            }
+        except ValidationError as error:
+            errors.append((row_number, ' '.join(error.messages)))
+
+
+def map_records(user, records, account, errors, default_categories=None):
+    """
+    Map normalized records to validated, unsaved Transaction instances.
+
+    Categories are resolved by name (case-insensitive, same type) and fall
+    back to default_categories[transaction_type]. Validation reuses the
+    TransactionForm rules through build_transaction.
+
+    Args:
+        user: The User importing the statement
+        records: Normalized records from normalize_records
+        account: The Account the statement belongs to
+        errors: ImportErrors collecting (row_number, message) for invalid records
+        default_categories: Optional mapping of transaction_type -> Category
+
+    Yields:
+        Transaction: Unsaved transaction instance
+    """
+    categories = {category.pk: category for category in Category.objects.filter(user=user)}
+    categories_by_name = {
+        (category.name.lower(), category.category_type): category
+        for category in categories.values()
+    }
+    default_categories = default_categories or {}
+    accounts = {account.pk: account}
+
+    for row_number, record in records:
+        transaction_type = record['transaction_type']
+        category = categories_by_name.get(
+            (record['category'].lower(), transaction_type),
+            default_categories.get(transaction_type),
+        )
+
+        try:
+            yield build_transaction(
+                user,
+                {**record, 'account': account.pk, 'category': category},
+                accounts,
+                categories,
+            )
+        except ValidationError as error:
+            errors.append((row_number, ' '.join(error.messages)))
+
+
+def _batched(iterable, batch_size):
+    """
+    Yield lists of up to batch_size items from an iterable.
+    """
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def _dedupe_key(transaction_date, amount, transaction_type, description):
+    return (transaction_date, Decimal(amount).quantize(Decimal('0.01')), transaction_type, description)
+
+
+def drop_duplicates(batches, account, imported_since):
+    """
+    Remove transactions that already existed in the account before the import.
+
+    A transaction is a duplicate when one with the same date, amount, type
+    and description was created before imported_since. Each batch costs one
+    query restricted to the batch's dates and descriptions (and one more on
+    the archive when its dates reach back before the archive cutoff), so
+    re-importing an overlapping statement is idempotent and memory stays
+    bounded.
+
+    Yields:
+        tuple: (batch, fresh) - the incoming batch and its non-duplicate transactions
+    """
+    for batch in batches:
+        dates = {item.transaction_date for item in batch}
+        models = [Transaction]
+        if reaches_archive(min(dates), max(dates)):
+            models.append(ArchivedTransaction)
+
+        existing = set()
+        for model in models:
+            existing.update(
+                _dedupe_key(*values)
+                for values in model.objects.filter(
+                    account=account,
+                    created_at__lt=imported_since,
+                    transaction_date__in=dates,
+                    description__in={item.description for item in batch},
+                ).values_list('transaction_date', 'amount', 'transaction_type', 'description')
+            )
+
+        fresh = [
+            item for item in batch
+            if _dedupe_key(item.transaction_date, item.amount, item.transaction_type, item.description) not in existing
+        ]
+        yield batch, fresh
+
+
+def import_statement(user, stream, account, statement_format=CSV, default_categories=None,
+                     batch_size=INGESTION_BATCH_SIZE):
+    """
+    Import a bank statement into an account.
+
+    Args:
+        user: The User importing the statement
+        stream: Text file object with the statement contents
+        account: The Account the statement belongs to
+        statement_format: CSV or OFX
+        default_categories: Optional mapping of transaction_type -> Category used
+                            when a record has no matching category
+        batch_size: Number of transactions deduplicated and inserted per batch
+
+    Returns:
+        tuple: (created_count, duplicate_count, errors) - errors is an ImportErrors
+    """
+    errors = ImportErrors()
+    imported_since = timezone.now()
+
+    parse = parse_ofx if statement_format == OFX else parse_csv
+    records = normalize_records(parse(stream), errors)
+    transactions = map_records(user, records, account, errors, default_categories)
+
+    created_count = 0
+    duplicate_count = 0
+    for batch, fresh in drop_duplicates(_batched(transactions, batch_size), account, imported_since):
+        duplicate_count += len(batch) - len(fresh)
+        created_count += bulk_insert_transactions(fresh)
+
+    return created_count, duplicate_count, errors
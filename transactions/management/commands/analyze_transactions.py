@@ -0,0 +1,21 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from transactions.search import analyze_transactions
+
+
+class Command(BaseCommand):
+    help = (
+        'Refreshes the query planner statistics of the transactions table, which the '
+        'description search and the period filters rely on. Run it after large imports '
+        'and schedule it weekly.'
+    )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        analyze_transactions(connection)
+        elapsed = time.monotonic() - started
+
+        self.stdout.write(self.style.SUCCESS(f'Planner statistics refreshed in {elapsed:.2f}s'))
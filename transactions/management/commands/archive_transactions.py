@@ -0,0 +1,54 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from transactions.archive import (
+    ARCHIVE_BATCH_SIZE,
+    archive_transactions,
+    get_archive_cutoff,
+    restore_transactions,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Moves the transactions older than TRANSACTION_ARCHIVE_MONTHS months into the '
+        'archive table, and archived transactions newer than that back into the live '
+        'table (all of them when the archive is disabled). Schedule it monthly.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user_id',
+            type=int,
+            help='Archive transactions of a specific user ID. If not provided, archives for all users.'
+        )
+        parser.add_argument(
+            '--batch_size',
+            type=int,
+            default=ARCHIVE_BATCH_SIZE,
+            help=f'Number of rows moved per database transaction (default: {ARCHIVE_BATCH_SIZE}).'
+        )
+
+    def handle(self, *args, **options):
+        user_id = options.get('user_id')
+        user_ids = [user_id] if user_id else None
+        batch_size = options['batch_size']
+
+        cutoff = get_archive_cutoff()
+        if cutoff is None:
+            self.stdout.write(self.style.WARNING('Archive disabled: restoring every archived transaction'))
+        else:
+            self.stdout.write(f'Archiving transactions dated before {cutoff.isoformat()}')
+
+        started = time.monotonic()
+        archived = archive_transactions(cutoff, user_ids, batch_size) if cutoff is not None else 0
+        restored = restore_transactions(cutoff, user_ids, batch_size)
+        elapsed = time.monotonic() - started
+
+        self.stdout.write('\n' + '=' * 60)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'TOTAL: {archived} transactions archived, {restored} restored in {elapsed:.1f}s'
+            )
+        )
@@ -0,0 +1,223 @@
+import json
+import random
+import statistics
+import threading
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, close_old_connections, connection
+from django.db.models import Q, Sum
+
+from accounts.models import Account
+from categories.models import Category
+from core.benchmarks import delete_benchmark_users, generate_benchmark_data
+from transactions.models import Transaction
+
+
+class Command(BaseCommand):
+    help = (
+        'Load benchmark for the configured database profile (see DB_ENGINE in settings). '
+        'Runs concurrent workers mixing transaction writes and list reads, each operation '
+        'followed by the end-of-request connection handling, and reports throughput, '
+        'latency percentiles and failed operations. Run it once per profile and pass '
+        'the first run to --compare to see both setups side by side.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=8,
+            help='Number of concurrent workers, each with its own user and account (default: 8).'
+        )
+        parser.add_argument(
+            '--operations',
+            type=int,
+            default=200,
+            help='Number of operations run by each worker (default: 200).'
+        )
+        parser.add_argument(
+            '--write_ratio',
+            type=float,
+            default=0.5,
+            help='Fraction of operations that create a transaction (default: 0.5).'
+        )
+        parser.add_argument(
+            '--output',
+            help='Write the results as JSON to this file.'
+        )
+        parser.add_argument(
+            '--compare',
+            help='JSON results of a previous run (from --output) to compare against.'
+        )
+
+    def handle(self, *args, **options):
+        profile = self.describe_profile()
+        self.stdout.write(f'Database profile: {profile["label"]}')
+
+        users = generate_benchmark_data(options['workers'], 0, max_accounts=1)
+        self.stdout.write(
+            f'Running {options["workers"]} workers x {options["operations"]} operations '
+            f'({options["write_ratio"]:.0%} writes)'
+        )
+
+        results = []
+        threads = [
+            threading.Thread(
+                target=self.run_worker,
+                args=(user, options['operations'], options['write_ratio'], results),
+            )
+            for user in users
+        ]
+
+        started = time.monotonic()
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            elapsed = time.monotonic() - started
+            delete_benchmark_users(users)
+
+        report = self.build_report(profile, results, elapsed)
+
+        self.stdout.write('\n' + '=' * 60)
+        self.print_report(report)
+
+        if options['compare']:
+            with open(options['compare'], encoding='utf-8') as compare_file:
+                self.print_comparison(json.load(compare_file), report)
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output_file:
+                json.dump(report, output_file, indent=2)
+            self.stdout.write(f'\nResults written to {options["output"]}')
+
+    def describe_profile(self):
+        """
+        Summarize the settings that matter for concurrency.
+        """
+        database = settings.DATABASES['default']
+        vendor = connection.vendor
+        details = [vendor, f'CONN_MAX_AGE={database.get("CONN_MAX_AGE", 0)}']
+
+        if vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute('PRAGMA journal_mode')
+                details.append(f'journal_mode={cursor.fetchone()[0]}')
+                cursor.execute('PRAGMA busy_timeout')
+                details.append(f'busy_timeout={cursor.fetchone()[0]}')
+        elif database.get('OPTIONS', {}).get('pool'):
+            details.append('pool=on')
+
+        return {'vendor': vendor, 'label': ', '.join(details)}
+
+    def run_worker(self, user, operations, write_ratio, results):
+        """
+        Run one worker's operations, recording (kind, seconds, failed) for each.
+        """
+        account = Account.objects.get(user=user)
+        categories = {category.category_type: category for category in Category.objects.filter(user=user)}
+        today = date.today()
+        samples = []
+
+        try:
+            for _ in range(operations):
+                kind = 'write' if random.random() < write_ratio else 'read'
+                started = time.perf_counter()
+                failed = False
+                try:
+                    if kind == 'write':
+                        transaction_type = random.choice([Transaction.INCOME, Transaction.EXPENSE])
+                        Transaction.objects.create(
+                            user=user,
+                            account=account,
+                            category=categories[transaction_type],
+                            transaction_type=transaction_type,
+                            amount=Decimal(random.randint(100, 100000)) / 100,
+                            transaction_date=today - timedelta(days=random.randint(0, 365)),
+                            description='Benchmark',
+                        )
+                    else:
+                        queryset = Transaction.objects.filter(user=user)
+                        list(queryset.select_related('account', 'category')[:20])
+                        queryset.aggregate(
+                            income=Sum('amount', filter=Q(transaction_type=Transaction.INCOME)),
+                            expense=Sum('amount', filter=Q(transaction_type=Transaction.EXPENSE)),
+                        )
+                except DatabaseError:
+                    failed = True
+                samples.append((kind, time.perf_counter() - started, failed))
+                # Same connection handling as the end of a request
+                close_old_connections()
+        finally:
+            connection.close()
+            results.extend(samples)
+
+    def build_report(self, profile, results, elapsed):
+        """
+        Aggregate the worker samples into throughput and latency figures (milliseconds).
+        """
+        report = {
+            'profile': profile['label'],
+            'operations': len(results),
+            'failed': sum(1 for _, _, failed in results if failed),
+            'elapsed_seconds': round(elapsed, 3),
+            'throughput': round(len(results) / elapsed, 1) if elapsed else 0,
+        }
+
+        for kind in ('write', 'read'):
+            latencies = sorted(seconds * 1000 for sample_kind, seconds, _ in results if sample_kind == kind)
+            if not latencies:
+                continue
+            report[kind] = {
+                'count': len(latencies),
+                'p50_ms': round(statistics.median(latencies), 2),
+                'p95_ms': round(latencies[int(len(latencies) * 0.95) - 1], 2),
+                'max_ms': round(latencies[-1], 2),
+            }
+
+        return report
+
+    def print_report(self, report):
+        self.stdout.write(f'Profile: {report["profile"]}')
+        for kind in ('write', 'read'):
+            if kind in report:
+                stats = report[kind]
+                self.stdout.write(
+                    f'  {kind:5}: {stats["count"]} ops, p50 {stats["p50_ms"]} ms, '
+                    f'p95 {stats["p95_ms"]} ms, max {stats["max_ms"]} ms'
+                )
+
+        style = self.style.ERROR if report['failed'] else self.style.SUCCESS
+        self.stdout.write(
+            style(
+                f'TOTAL: {report["operations"]} operations in {report["elapsed_seconds"]}s '
+                f'({report["throughput"]} ops/s), {report["failed"]} failed'
+            )
+        )
+
+    def print_comparison(self, baseline, report):
+        self.stdout.write('\n' + '=' * 60)
+        self.stdout.write(f'Baseline: {baseline["profile"]}')
+        self.stdout.write(f'Current:  {report["profile"]}')
+
+        rows = [('throughput (ops/s)', baseline.get('throughput'), report.get('throughput'))]
+        for kind in ('write', 'read'):
+            for metric in ('p50_ms', 'p95_ms'):
+                rows.append((
+                    f'{kind} {metric}',
+                    baseline.get(kind, {}).get(metric),
+                    report.get(kind, {}).get(metric),
+                ))
+        rows.append(('failed', baseline.get('failed'), report.get('failed')))
+
+        for label, before, after in rows:
+            if before is None or after is None:
+                continue
+            change = f'{(after - before) / before:+.0%}' if before else 'n/a'
+            self.stdout.write(f'  {label:20} {before:>10} -> {after:>10} ({change})')
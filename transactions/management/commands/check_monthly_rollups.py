@@ -0,0 +1,73 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from transactions.partitions import PartitioningError, check_no_detached_years
+from transactions.rollups import ROLLUP_KEY_FIELDS, find_rollup_mismatches, rebuild_rollups
+
+
+# Maximum number of mismatching rollup keys listed in the command output
+MAX_REPORTED_MISMATCHES = 50
+
+
+class Command(BaseCommand):
+    help = 'Checks the monthly category rollups against the raw transactions'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user_id',
+            type=int,
+            help='Check rollups for a specific user ID. If not provided, checks all users.'
+        )
+        parser.add_argument(
+            '--fix',
+            action='store_true',
+            help='Rebuild the rollups of every user with mismatches.'
+        )
+
+    def handle(self, *args, **options):
+        # Rollups still count the transactions of detached years
+        if options['fix']:
+            try:
+                check_no_detached_years(connection)
+            except PartitioningError as error:
+                raise CommandError(str(error))
+
+        user_id = options.get('user_id')
+        user_ids = [user_id] if user_id else None
+
+        mismatch_count = 0
+        affected_users = set()
+
+        for key, expected, stored in find_rollup_mismatches(user_ids):
+            mismatch_count += 1
+            affected_users.add(key[0])
+
+            if mismatch_count <= MAX_REPORTED_MISMATCHES:
+                description = ', '.join(f'{field}={value}' for field, value in zip(ROLLUP_KEY_FIELDS, key))
+                self.stdout.write(
+                    self.style.WARNING(
+                        f'  {description}: expected R$ {expected[0]} ({expected[1]} transactions), '
+                        f'stored R$ {stored[0]} ({stored[1]} transactions)'
+                    )
+                )
+
+        if mismatch_count > MAX_REPORTED_MISMATCHES:
+            self.stdout.write(
+                self.style.WARNING(f'  ... and {mismatch_count - MAX_REPORTED_MISMATCHES} more mismatches')
+            )
+
+        self.stdout.write('\n' + '=' * 60)
+
+        if not mismatch_count:
+            self.stdout.write(self.style.SUCCESS('Rollups are consistent with the transactions'))
+            return
+
+        self.stdout.write(
+            self.style.ERROR(f'TOTAL: {mismatch_count} mismatches for {len(affected_users)} users')
+        )
+
+        if options['fix']:
+            created = rebuild_rollups(sorted(affected_users))
+            self.stdout.write(
+                self.style.SUCCESS(f'Rebuilt rollups for {len(affected_users)} users ({created} rows written)')
+            )
@@ -0,0 +1,145 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.contrib.auth import get_user_model
+
+from accounts.models import Account
+from categories.models import Category
+from transactions.importers import (
+    DEFAULT_ENCODINGS,
+    STATEMENT_FORMAT_CHOICES,
+    detect_format,
+    import_statement,
+)
+from transactions.models import Transaction
+from transactions.services import INGESTION_BATCH_SIZE
+
+
+User = get_user_model()
+
+# Maximum number of invalid rows listed in the command output
+MAX_REPORTED_ERRORS = 50
+
+
+class Command(BaseCommand):
+    help = (
+        'Imports a CSV or OFX bank statement into one of the user\'s accounts. '
+        'The file is streamed, so memory use does not depend on its size. '
+        'Transactions that already exist in the account are skipped.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'file',
+            help='Path to the statement file (.csv, .ofx or .qfx).'
+        )
+        parser.add_argument(
+            '--user_id',
+            type=int,
+            required=True,
+            help='ID of the user who owns the account.'
+        )
+        parser.add_argument(
+            '--account_id',
+            type=int,
+            required=True,
+            help='ID of the account the statement belongs to.'
+        )
+        parser.add_argument(
+            '--format',
+            choices=[value for value, _ in STATEMENT_FORMAT_CHOICES],
+            help='Statement format. Detected from the file extension if not provided.'
+        )
+        parser.add_argument(
+            '--encoding',
+            help='Text encoding of the file (default: utf-8-sig for CSV, cp1252 for OFX).'
+        )
+        parser.add_argument(
+            '--income_category_id',
+            type=int,
+            help='Category used for income rows without a matching category name.'
+        )
+        parser.add_argument(
+            '--expense_category_id',
+            type=int,
+            help='Category used for expense rows without a matching category name.'
+        )
+        parser.add_argument(
+            '--batch_size',
+            type=int,
+            default=INGESTION_BATCH_SIZE,
+            help=f'Number of rows inserted per batch (default: {INGESTION_BATCH_SIZE}).'
+        )
+
+    def handle(self, *args, **options):
+        user_id = options['user_id']
+        account_id = options['account_id']
+
+        try:
+            user = User.objects.get(pk=user_id)
+        except User.DoesNotExist:
+            self.stdout.write(
+                self.style.ERROR(f'User with ID {user_id} does not exist')
+            )
+            return
+
+        try:
+            account = Account.objects.get(pk=account_id, user=user)
+        except Account.DoesNotExist:
+            self.stdout.write(
+                self.style.ERROR(f'Account with ID {account_id} does not exist for {user.email}')
+            )
+            return
+
+        default_categories = {}
+        for transaction_type, option in [
+            (Transaction.INCOME, 'income_category_id'),
+            (Transaction.EXPENSE, 'expense_category_id'),
+        ]:
+            if options[option]:
+                try:
+                    default_categories[transaction_type] = Category.objects.get(
+                        pk=options[option],
+                        user=user,
+                        category_type=transaction_type,
+                    )
+                except Category.DoesNotExist:
+                    self.stdout.write(
+                        self.style.ERROR(f'Category with ID {options[option]} is not a valid {transaction_type} category')
+                    )
+                    return
+
+        statement_format = options['format'] or detect_format(options['file'])
+        encoding = options['encoding'] or DEFAULT_ENCODINGS[statement_format]
+
+        self.stdout.write(f'Importing {statement_format.upper()} statement into account: {account.name}')
+        started = time.monotonic()
+
+        with open(options['file'], newline='', encoding=encoding, errors='replace') as statement_file:
+            created_count, duplicate_count, errors = import_statement(
+                user,
+                statement_file,
+                account,
+                statement_format=statement_format,
+                default_categories=default_categories,
+                batch_size=options['batch_size'],
+            )
+
+        elapsed = time.monotonic() - started
+
+        for row_number, message in errors.sample[:MAX_REPORTED_ERRORS]:
+            self.stdout.write(
+                self.style.WARNING(f'  Row {row_number}: {message}')
+            )
+        if len(errors) > MAX_REPORTED_ERRORS:
+            self.stdout.write(
+                self.style.WARNING(f'  ... and {len(errors) - MAX_REPORTED_ERRORS} more invalid rows')
+            )
+
+        self.stdout.write('\n' + '=' * 60)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'TOTAL: {created_count} transactions created, {duplicate_count} duplicates skipped, '
+                f'{len(errors)} invalid rows in {elapsed:.1f}s'
+            )
+        )
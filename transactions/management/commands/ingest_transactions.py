@@ -0,0 +1,80 @@
+import csv
+import time
+
+from django.core.management.base import BaseCommand
+from django.contrib.auth import get_user_model
+
+from transactions.services import INGESTION_BATCH_SIZE, bulk_create_transactions
+
+
+User = get_user_model()
+
+# Maximum number of invalid rows listed in the command output
+MAX_REPORTED_ERRORS = 50
+
+
+class Command(BaseCommand):
+    help = (
+        'Bulk loads transactions for a user from a CSV file with the columns '
+        'description, amount, transaction_date, transaction_type, category and account. '
+        'Account balances are updated with one aggregated delta per account and batch.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'file',
+            help='Path to the CSV file (UTF-8, with header row). Dates in YYYY-MM-DD, category and account as IDs.'
+        )
+        parser.add_argument(
+            '--user_id',
+            type=int,
+            required=True,
+            help='ID of the user who owns the transactions.'
+        )
+        parser.add_argument(
+            '--batch_size',
+            type=int,
+            default=INGESTION_BATCH_SIZE,
+            help=f'Number of rows inserted per batch (default: {INGESTION_BATCH_SIZE}).'
+        )
+
+    def handle(self, *args, **options):
+        user_id = options['user_id']
+
+        try:
+            user = User.objects.get(pk=user_id)
+        except User.DoesNotExist:
+            self.stdout.write(
+                self.style.ERROR(f'User with ID {user_id} does not exist')
+            )
+            return
+
+        self.stdout.write(f'Importing transactions for user: {user.email}')
+        started = time.monotonic()
+
+        # The CSV reader is consumed lazily, so memory stays bounded by the batch size
+        with open(options['file'], newline='', encoding='utf-8') as csv_file:
+            created_count, errors = bulk_create_transactions(
+                user,
+                csv.DictReader(csv_file),
+                batch_size=options['batch_size'],
+            )
+
+        elapsed = time.monotonic() - started
+
+        for row_number, message in errors.sample[:MAX_REPORTED_ERRORS]:
+            self.stdout.write(
+                self.style.WARNING(f'  Row {row_number}: {message}')
+            )
+        if len(errors) > MAX_REPORTED_ERRORS:
+            self.stdout.write(
+                self.style.WARNING(f'  ... and {len(errors) - MAX_REPORTED_ERRORS} more invalid rows')
+            )
+
+        self.stdout.write('\n' + '=' * 60)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'TOTAL: {created_count} transactions created, {len(errors)} rows skipped '
+                f'in {elapsed:.1f}s'
+            )
+        )
@@ -0,0 +1,87 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from core.cache import bump_user_data_version
+from transactions.partitions import (
+    PartitioningError,
+    attach_year,
+    create_year_partitions,
+    detach_year,
+    get_affected_user_ids,
+    get_year_partitions,
+    is_partitioned,
+    partition_transactions,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Partitions the transactions table by year (PostgreSQL only). The first run '
+        'converts the table in place; later runs create the partitions of the coming '
+        'years, so schedule it yearly. --detach YEAR sets a closed year aside as a '
+        'standalone table and --attach YEAR brings it back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--years_ahead',
+            type=int,
+            default=1,
+            help='Number of future years to create partitions for (default: 1).'
+        )
+        parser.add_argument(
+            '--detach',
+            type=int,
+            metavar='YEAR',
+            help='Detach the partition of a closed year.'
+        )
+        parser.add_argument(
+            '--attach',
+            type=int,
+            metavar='YEAR',
+            help='Attach a previously detached year back.'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            if options['detach']:
+                self.detach(options['detach'])
+            elif options['attach']:
+                self.attach(options['attach'])
+            elif not is_partitioned(connection):
+                copied = partition_transactions(connection, options['years_ahead'])
+                self.stdout.write(
+                    self.style.SUCCESS(f'Converted the transactions table to yearly partitions ({copied} rows)')
+                )
+            else:
+                created = create_year_partitions(connection, options['years_ahead'])
+                if created:
+                    self.stdout.write(
+                        self.style.SUCCESS(f'Created partitions for {", ".join(map(str, created))}')
+                    )
+        except PartitioningError as error:
+            raise CommandError(str(error))
+
+        attached, detached = get_year_partitions(connection)
+        self.stdout.write('\n' + '=' * 60)
+        self.stdout.write(f'Attached years: {", ".join(map(str, attached)) or "-"}')
+        self.stdout.write(f'Detached years: {", ".join(map(str, detached)) or "-"}')
+
+    def detach(self, year):
+        if not is_partitioned(connection):
+            raise CommandError('The transactions table is not partitioned; run this command without --detach first')
+        detach_year(connection, year)
+        self.invalidate(year)
+        self.stdout.write(self.style.SUCCESS(f'Detached {year}'))
+
+    def attach(self, year):
+        attach_year(connection, year)
+        self.invalidate(year)
+        self.stdout.write(self.style.SUCCESS(f'Attached {year}'))
+
+    def invalidate(self, year):
+        """
+        Drop the cached dashboard data of the users with transactions in the year.
+        """
+        for user_id in get_affected_user_ids(connection, year):
+            bump_user_data_version(user_id)
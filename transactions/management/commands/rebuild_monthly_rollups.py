@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from transactions.partitions import PartitioningError, check_no_detached_years
+from transactions.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the monthly category rollups from the raw transactions'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user_id',
+            type=int,
+            help='Rebuild rollups for a specific user ID. If not provided, rebuilds for all users.'
+        )
+
+    def handle(self, *args, **options):
+        # Rollups still count the transactions of detached years
+        try:
+            check_no_detached_years(connection)
+        except PartitioningError as error:
+            raise CommandError(str(error))
+
+        user_id = options.get('user_id')
+        user_ids = [user_id] if user_id else None
+
+        if user_id:
+            self.stdout.write(f'Rebuilding rollups for user ID: {user_id}')
+        else:
+            self.stdout.write('Rebuilding rollups for all users')
+
+        started = time.monotonic()
+        created = rebuild_rollups(user_ids)
+        elapsed = time.monotonic() - started
+
+        self.stdout.write(
+            self.style.SUCCESS(f'TOTAL: {created} rollup rows written in {elapsed:.1f}s')
+        )
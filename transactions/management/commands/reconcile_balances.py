@@ -0,0 +1,119 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+
+from transactions.partitions import PartitioningError, check_no_detached_years
+from transactions.services import find_balance_mismatches, fix_balance_mismatches, get_user_id_shards
+
+
+# Maximum number of mismatching accounts listed in the command output
+MAX_REPORTED_MISMATCHES = 50
+
+
+def _init_worker():
+    """
+    Prepare a pool process: set up Django when the process was spawned
+    instead of forked. Database connections are opened fresh by each process.
+    """
+    django.setup()
+
+
+class Command(BaseCommand):
+    help = (
+        'Recomputes every account balance as initial_balance + income - expense and '
+        'compares it with Account.current_balance. The accounts are sharded by user-ID '
+        'range across a process pool, with one grouped aggregate per shard.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user_id',
+            type=int,
+            help='Reconcile the accounts of a specific user ID. If not provided, reconciles all users.'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Number of worker processes (default: number of CPUs). 1 runs in this process.'
+        )
+        parser.add_argument(
+            '--shards',
+            type=int,
+            help='Number of user-ID ranges to split the work into (default: 4 per worker).'
+        )
+        parser.add_argument(
+            '--fix',
+            action='store_true',
+            help='Correct the balances that drifted.'
+        )
+
+    def handle(self, *args, **options):
+        # Balances still count the transactions of detached years
+        try:
+            check_no_detached_years(connection)
+        except PartitioningError as error:
+            raise CommandError(str(error))
+
+        user_id = options.get('user_id')
+        workers = max(options['workers'], 1)
+        started = time.monotonic()
+
+        if user_id:
+            shards = [(user_id, user_id)]
+        else:
+            shards = get_user_id_shards(options['shards'] or workers * 4)
+
+        self.stdout.write(f'Reconciling {len(shards)} user-ID ranges with {workers} workers')
+
+        checked_count = 0
+        mismatches = []
+
+        if workers == 1 or len(shards) == 1:
+            results = (find_balance_mismatches(*shard) for shard in shards)
+            for shard_checked, shard_mismatches in results:
+                checked_count += shard_checked
+                mismatches += shard_mismatches
+        else:
+            # Forked processes must not share the parent's database connections
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+                for shard_checked, shard_mismatches in pool.map(find_balance_mismatches, *zip(*shards)):
+                    checked_count += shard_checked
+                    mismatches += shard_mismatches
+
+        for account_id, account_user_id, stored, expected in mismatches[:MAX_REPORTED_MISMATCHES]:
+            self.stdout.write(
+                self.style.WARNING(
+                    f'  Account {account_id} (user {account_user_id}): '
+                    f'stored R$ {stored}, expected R$ {expected} (drift R$ {stored - expected})'
+                )
+            )
+        if len(mismatches) > MAX_REPORTED_MISMATCHES:
+            self.stdout.write(
+                self.style.WARNING(f'  ... and {len(mismatches) - MAX_REPORTED_MISMATCHES} more mismatches')
+            )
+
+        elapsed = time.monotonic() - started
+
+        self.stdout.write('\n' + '=' * 60)
+
+        if not mismatches:
+            self.stdout.write(
+                self.style.SUCCESS(f'All {checked_count} account balances are consistent ({elapsed:.1f}s)')
+            )
+            return
+
+        self.stdout.write(
+            self.style.ERROR(
+                f'TOTAL: {len(mismatches)} of {checked_count} accounts have drifted ({elapsed:.1f}s)'
+            )
+        )
+
+        if options['fix']:
+            updated = fix_balance_mismatches(mismatches)
+            self.stdout.write(self.style.SUCCESS(f'Corrected {updated} account balances'))
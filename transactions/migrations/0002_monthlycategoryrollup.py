@@ -0,0 +1,119 @@
+# Generated by Django 6.0.1 on 2026-10-18 03:07
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
+
+
+def populate_rollups(apps, schema_editor):
+    """Build the monthly rollups for transactions created before this migration."""
+    Transaction = apps.get_model("transactions", "Transaction")
+    MonthlyCategoryRollup = apps.get_model("transactions", "MonthlyCategoryRollup")
+
+    rows = (
+        Transaction.objects.annotate(
+            year=ExtractYear("transaction_date"),
+            month=ExtractMonth("transaction_date"),
+        )
+        .values(
+            "user_id", "account_id", "category_id", "year", "month", "transaction_type"
+        )
+        .annotate(total=Sum("amount"), transaction_count=Count("id"))
+        .order_by()
+    )
+    MonthlyCategoryRollup.objects.bulk_create(
+        (MonthlyCategoryRollup(**row) for row in rows.iterator()), batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0001_initial"),
+        ("categories", "0001_initial"),
+        ("transactions", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MonthlyCategoryRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("year", models.PositiveSmallIntegerField(verbose_name="Ano")),
+                ("month", models.PositiveSmallIntegerField(verbose_name="Mês")),
+                (
+                    "transaction_type",
+                    models.CharField(
+                        choices=[("income", "Receita"), ("expense", "Despesa")],
+                        max_length=10,
+                        verbose_name="Tipo",
+                    ),
+                ),
+                (
+                    "total",
+                    models.DecimalField(
+                        decimal_places=2, default=0, max_digits=14, verbose_name="Total"
+                    ),
+                ),
+                (
+                    "transaction_count",
+                    models.IntegerField(
+                        default=0, verbose_name="Quantidade de transações"
+                    ),
+                ),
+                (
+                    "account",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="monthly_rollups",
+                        to="accounts.account",
+                        verbose_name="Conta",
+                    ),
+                ),
+                (
+                    "category",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="monthly_rollups",
+                        to="categories.category",
+                        verbose_name="Categoria",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="monthly_rollups",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Usuário",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Resumo mensal por categoria",
+                "verbose_name_plural": "Resumos mensais por categoria",
+                "ordering": ["-year", "-month"],
+                "indexes": [
+                    models.Index(
+                        fields=["user", "year", "month"],
+                        name="transaction_user_id_37754e_idx",
+                    )
+                ],
+                "unique_together": {
+                    ("user", "account", "category", "year", "month", "transaction_type")
+                },
+            },
+        ),
+        migrations.RunPython(populate_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 6.0.1 on 2026-10-18 03:10
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0001_initial"),
+        ("categories", "0001_initial"),
+        ("transactions", "0002_monthlycategoryrollup"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(
+                fields=["user", "-transaction_date", "-created_at", "-id"],
+                name="transaction_user_id_be0d98_idx",
+            ),
+        ),
+    ]
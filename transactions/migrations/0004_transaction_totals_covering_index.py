@@ -0,0 +1,28 @@
+# Generated by Django 6.0.1 on 2026-10-18 03:11
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0001_initial"),
+        ("categories", "0001_initial"),
+        ("transactions", "0003_transaction_keyset_index"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="transaction",
+            name="transaction_user_id_e55ebe_idx",
+        ),
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(
+                fields=["user", "transaction_date", "transaction_type", "amount"],
+                name="transaction_user_id_19ece9_idx",
+            ),
+        ),
+    ]
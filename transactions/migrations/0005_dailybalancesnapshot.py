@@ -0,0 +1,53 @@
+# Generated by Django 6.0.1 on 2026-10-18 03:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0001_initial"),
+        ("transactions", "0004_transaction_totals_covering_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailyBalanceSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField(verbose_name="Data")),
+                (
+                    "net_total",
+                    models.DecimalField(
+                        decimal_places=2,
+                        max_digits=14,
+                        verbose_name="Variação acumulada",
+                    ),
+                ),
+                (
+                    "account",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="balance_snapshots",
+                        to="accounts.account",
+                        verbose_name="Conta",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Saldo diário",
+                "verbose_name_plural": "Saldos diários",
+                "ordering": ["date"],
+                "unique_together": {("account", "date")},
+            },
+        ),
+    ]
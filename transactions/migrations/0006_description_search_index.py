@@ -0,0 +1,75 @@
+# Generated by Django 6.0.1 on 2026-10-18 03:30
+
+from django.db import migrations
+
+# The SQL is frozen here rather than imported from transactions.search, so
+# later changes to that module cannot change what this migration does.
+
+SQLITE_CREATE = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS transactions_transaction_fts USING fts5("
+    "description, content='transactions_transaction', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    "CREATE TRIGGER IF NOT EXISTS transactions_transaction_fts_ai "
+    "AFTER INSERT ON transactions_transaction BEGIN "
+    "INSERT INTO transactions_transaction_fts(rowid, description) VALUES (new.id, new.description); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS transactions_transaction_fts_ad "
+    "AFTER DELETE ON transactions_transaction BEGIN "
+    "INSERT INTO transactions_transaction_fts(transactions_transaction_fts, rowid, description) "
+    "VALUES ('delete', old.id, old.description); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS transactions_transaction_fts_au "
+    "AFTER UPDATE OF description ON transactions_transaction BEGIN "
+    "INSERT INTO transactions_transaction_fts(transactions_transaction_fts, rowid, description) "
+    "VALUES ('delete', old.id, old.description); "
+    "INSERT INTO transactions_transaction_fts(rowid, description) VALUES (new.id, new.description); "
+    "END",
+    "INSERT INTO transactions_transaction_fts(transactions_transaction_fts) VALUES ('rebuild')",
+    # Without statistics SQLite walks the user's date index and probes every
+    # row against the search results instead of reading only the matches
+    "PRAGMA analysis_limit=400",
+    "ANALYZE transactions_transaction",
+]
+
+SQLITE_DROP = [
+    "DROP TRIGGER IF EXISTS transactions_transaction_fts_ai",
+    "DROP TRIGGER IF EXISTS transactions_transaction_fts_ad",
+    "DROP TRIGGER IF EXISTS transactions_transaction_fts_au",
+    "DROP TABLE IF EXISTS transactions_transaction_fts",
+]
+
+POSTGRESQL_CREATE = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS transactions_description_trgm ON transactions_transaction "
+    "USING gin (UPPER(description::text) gin_trgm_ops)",
+    "ANALYZE transactions_transaction",
+]
+
+POSTGRESQL_DROP = [
+    "DROP INDEX IF EXISTS transactions_description_trgm",
+]
+
+
+def run_vendor_sql(statements):
+    """Return a RunPython function executing the statements of the database vendor."""
+
+    def run(apps, schema_editor):
+        for sql in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(sql, params=None)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("transactions", "0005_dailybalancesnapshot"),
+    ]
+
+    operations = [
+        # Index the descriptions with FTS5 (SQLite) or pg_trgm (PostgreSQL)
+        migrations.RunPython(
+            run_vendor_sql({"sqlite": SQLITE_CREATE, "postgresql": POSTGRESQL_CREATE}),
+            run_vendor_sql({"sqlite": SQLITE_DROP, "postgresql": POSTGRESQL_DROP}),
+        ),
+    ]
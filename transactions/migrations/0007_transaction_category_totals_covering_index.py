@@ -0,0 +1,34 @@
+# Generated by Django 6.0.1 on 2026-10-18 03:36
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0002_account_name_index"),
+        ("categories", "0003_category_type_name_index"),
+        ("transactions", "0006_description_search_index"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="transaction",
+            name="transaction_user_id_19ece9_idx",
+        ),
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(
+                fields=[
+                    "user",
+                    "transaction_date",
+                    "transaction_type",
+                    "category",
+                    "amount",
+                ],
+                name="transaction_user_id_10ea74_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,86 @@
+# Generated by Django 6.0.1 on 2026-10-18 05:12
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0002_account_name_index"),
+        ("categories", "0003_category_type_name_index"),
+        ("transactions", "0007_transaction_category_totals_covering_index"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedTransaction",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                (
+                    "description",
+                    models.CharField(max_length=255, verbose_name="Descrição"),
+                ),
+                (
+                    "amount",
+                    models.DecimalField(
+                        decimal_places=2, max_digits=12, verbose_name="Valor"
+                    ),
+                ),
+                (
+                    "transaction_date",
+                    models.DateField(verbose_name="Data da Transação"),
+                ),
+                (
+                    "transaction_type",
+                    models.CharField(
+                        choices=[("income", "Receita"), ("expense", "Despesa")],
+                        max_length=10,
+                        verbose_name="Tipo",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(verbose_name="Criado em")),
+                ("updated_at", models.DateTimeField(verbose_name="Atualizado em")),
+                (
+                    "account",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="archived_transactions",
+                        to="accounts.account",
+                        verbose_name="Conta",
+                    ),
+                ),
+                (
+                    "category",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="archived_transactions",
+                        to="categories.category",
+                        verbose_name="Categoria",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="archived_transactions",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Usuário",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Transação arquivada",
+                "verbose_name_plural": "Transações arquivadas",
+                "ordering": ["-transaction_date", "-created_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["user", "-transaction_date", "-created_at", "-id"],
+                        name="transaction_user_id_b6ab53_idx",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,126 @@
+# Generated by Django 6.0.1 on 2026-10-18 06:04
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0002_account_name_index"),
+        ("categories", "0003_category_type_name_index"),
+        ("transactions", "0008_archivedtransaction"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RecurringTransaction",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "description",
+                    models.CharField(max_length=255, verbose_name="Descrição"),
+                ),
+                (
+                    "amount",
+                    models.DecimalField(
+                        decimal_places=2, max_digits=12, verbose_name="Valor"
+                    ),
+                ),
+                (
+                    "transaction_type",
+                    models.CharField(
+                        choices=[("income", "Receita"), ("expense", "Despesa")],
+                        max_length=10,
+                        verbose_name="Tipo",
+                    ),
+                ),
+                (
+                    "frequency",
+                    models.CharField(
+                        choices=[
+                            ("weekly", "Semanal"),
+                            ("monthly", "Mensal"),
+                            ("yearly", "Anual"),
+                        ],
+                        default="monthly",
+                        max_length=10,
+                        verbose_name="Frequência",
+                    ),
+                ),
+                (
+                    "interval",
+                    models.PositiveSmallIntegerField(
+                        default=1, verbose_name="Intervalo"
+                    ),
+                ),
+                ("start_date", models.DateField(verbose_name="Data inicial")),
+                (
+                    "end_date",
+                    models.DateField(blank=True, null=True, verbose_name="Data final"),
+                ),
+                ("next_run", models.DateField(verbose_name="Próxima ocorrência")),
+                ("is_active", models.BooleanField(default=True, verbose_name="Ativa")),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Criado em"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="Atualizado em"),
+                ),
+                (
+                    "account",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="recurring_transactions",
+                        to="accounts.account",
+                        verbose_name="Conta",
+                    ),
+                ),
+                (
+                    "category",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="recurring_transactions",
+                        to="categories.category",
+                        verbose_name="Categoria",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="recurring_transactions",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Usuário",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Transação recorrente",
+                "verbose_name_plural": "Transações recorrentes",
+                "ordering": ["next_run", "description"],
+                "indexes": [
+                    models.Index(
+                        fields=["is_active", "next_run"],
+                        name="transaction_is_acti_1bfae9_idx",
+                    ),
+                    models.Index(
+                        fields=["user", "next_run"],
+                        name="transaction_user_id_338f77_idx",
+                    ),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 6.0.1 on 2026-10-18 07:20
+
+import django.core.validators
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0002_account_name_index"),
+        ("categories", "0003_category_type_name_index"),
+        ("transactions", "0009_recurringtransaction"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="recurringtransaction",
+            name="interval",
+            field=models.PositiveSmallIntegerField(
+                default=1,
+                validators=[django.core.validators.MinValueValidator(1)],
+                verbose_name="Intervalo",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="recurringtransaction",
+            constraint=models.CheckConstraint(
+                condition=models.Q(("interval__gte", 1)),
+                name="recurring_interval_positive",
+            ),
+        ),
+    ]
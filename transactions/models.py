@@ -1,4 +1,8 @@
+import calendar
+from datetime import date, timedelta
+
 from django.conf import settings
+from django.core.validators import MinValueValidator
 from django.db import models
 
 
@@ -66,11 +70,344 @@ class Transaction(models.Model):
         verbose_name = 'Transação'
         verbose_name_plural = 'Transações'
         indexes = [
-            models.Index(fields=['user', 'transaction_date']),
+            # Covers the list totals and the dashboard's per-category sums over
+            # partial months (index-only scans), and date range lookups
+            models.Index(fields=['user', 'transaction_date', 'transaction_type', 'category', 'amount']),
             models.Index(fields=['user', 'transaction_type']),
             models.Index(fields=['account', 'transaction_date']),
             models.Index(fields=['category', 'transaction_date']),
+            # Keyset pagination of the transaction list
+            models.Index(fields=['user', '-transaction_date', '-created_at', '-id']),
+        ]
+
+    # Fields whose persisted values drive the balance and rollup updates
+    TRACKED_FIELDS = ('user_id', 'account_id', 'category_id', 'transaction_type', 'amount', 'transaction_date')
+
+    # Live transactions can be edited; see ArchivedTransaction
+    is_archived = False
+
+    def __str__(self):
+        return f'{self.description} - R$ {self.amount} ({self.get_transaction_type_display()})'
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Remember the persisted state of loaded instances.
+        Lets the write-path signals compute deltas without re-reading the row.
+        """
+        instance = super().from_db(db, field_names, values)
+        instance._remember_tracked_state()
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        """
+        Reload field values and the remembered state.
+        A partial reload forgets the state, since other tracked fields may hold unsaved edits.
+        """
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+        if fields is None:
+            self._remember_tracked_state()
+        else:
+            self._persisted_state = None
+
+    def get_tracked_state(self):
+        """
+        Return a dict with the TRACKED_FIELDS values of this transaction.
+        Amount and date are coerced to Decimal and date, even if assigned as strings.
+        """
+        state = {field: getattr(self, field) for field in self.TRACKED_FIELDS}
+        state['amount'] = self._meta.get_field('amount').to_python(state['amount'])
+        state['transaction_date'] = self._meta.get_field('transaction_date').to_python(state['transaction_date'])
+        return state
+
+    def _remember_tracked_state(self):
+        """
+        Store the current tracked state as the persisted one.
+        Skipped when any tracked field is deferred, so the signals fall back to a query.
+        """
+        if self.get_deferred_fields().intersection(self.TRACKED_FIELDS):
+            self._persisted_state = None
+        else:
+            self._persisted_state = self.get_tracked_state()
+
+
+class ArchivedTransaction(models.Model):
+    """
+    Transaction older than the archive horizon, moved out of the live table.
+    Keeps the id and every field of the original row; rows are moved by
+    transactions.archive without touching balances, rollups or category
+    counters, which still count them. Only indexed by user and date.
+    """
+
+    id = models.BigIntegerField(
+        primary_key=True
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='archived_transactions',
+        verbose_name='Usuário'
+    )
+    account = models.ForeignKey(
+        'accounts.Account',
+        on_delete=models.CASCADE,
+        related_name='archived_transactions',
+        verbose_name='Conta'
+    )
+    category = models.ForeignKey(
+        'categories.Category',
+        on_delete=models.PROTECT,
+        related_name='archived_transactions',
+        verbose_name='Categoria'
+    )
+    description = models.CharField(
+        max_length=255,
+        verbose_name='Descrição'
+    )
+    amount = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        verbose_name='Valor'
+    )
+    transaction_date = models.DateField(
+        verbose_name='Data da Transação'
+    )
+    transaction_type = models.CharField(
+        max_length=10,
+        choices=Transaction.TRANSACTION_TYPE_CHOICES,
+        verbose_name='Tipo'
+    )
+    created_at = models.DateTimeField(
+        verbose_name='Criado em'
+    )
+    updated_at = models.DateTimeField(
+        verbose_name='Atualizado em'
+    )
+
+    is_archived = True
+
+    class Meta:
+        ordering = ['-transaction_date', '-created_at']
+        verbose_name = 'Transação arquivada'
+        verbose_name_plural = 'Transações arquivadas'
+        indexes = [
+            models.Index(fields=['user', '-transaction_date', '-created_at', '-id']),
         ]
 
     def __str__(self):
         return f'{self.description} - R$ {self.amount} ({self.get_transaction_type_display()})'
+
+
+class RecurringTransaction(models.Model):
+    """
+    Rule for a transaction that repeats (salary, rent, subscriptions).
+    Every occurrence due up to today is created as a Transaction by the
+    materialize_recurring_transactions command (see transactions.recurring),
+    which then moves next_run to the following occurrence.
+    """
+
+    # Frequency choices
+    WEEKLY = 'weekly'
+    MONTHLY = 'monthly'
+    YEARLY = 'yearly'
+
+    FREQUENCY_CHOICES = [
+        (WEEKLY, 'Semanal'),
+        (MONTHLY, 'Mensal'),
+        (YEARLY, 'Anual'),
+    ]
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='recurring_transactions',
+        verbose_name='Usuário'
+    )
+    account = models.ForeignKey(
+        'accounts.Account',
+        on_delete=models.CASCADE,
+        related_name='recurring_transactions',
+        verbose_name='Conta'
+    )
+    category = models.ForeignKey(
+        'categories.Category',
+        on_delete=models.PROTECT,
+        related_name='recurring_transactions',
+        verbose_name='Categoria'
+    )
+    description = models.CharField(
+        max_length=255,
+        verbose_name='Descrição'
+    )
+    amount = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        verbose_name='Valor'
+    )
+    transaction_type = models.CharField(
+        max_length=10,
+        choices=Transaction.TRANSACTION_TYPE_CHOICES,
+        verbose_name='Tipo'
+    )
+    frequency = models.CharField(
+        max_length=10,
+        choices=FREQUENCY_CHOICES,
+        default=MONTHLY,
+        verbose_name='Frequência'
+    )
+    interval = models.PositiveSmallIntegerField(
+        default=1,
+        validators=[MinValueValidator(1)],
+        verbose_name='Intervalo'
+    )
+    start_date = models.DateField(
+        verbose_name='Data inicial'
+    )
+    end_date = models.DateField(
+        null=True,
+        blank=True,
+        verbose_name='Data final'
+    )
+    next_run = models.DateField(
+        verbose_name='Próxima ocorrência'
+    )
+    is_active = models.BooleanField(
+        default=True,
+        verbose_name='Ativa'
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Criado em'
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Atualizado em'
+    )
+
+    class Meta:
+        ordering = ['next_run', 'description']
+        verbose_name = 'Transação recorrente'
+        verbose_name_plural = 'Transações recorrentes'
+        indexes = [
+            # Due rules are read by next_run, for all users at once
+            models.Index(fields=['is_active', 'next_run']),
+            models.Index(fields=['user', 'next_run']),
+        ]
+        constraints = [
+            # A zero interval would never move next_run forward
+            models.CheckConstraint(
+                condition=models.Q(interval__gte=1),
+                name='recurring_interval_positive',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.description} - R$ {self.amount} ({self.get_frequency_display()})'
+
+    def get_next_date(self, current):
+        """
+        Return the occurrence following current.
+        Monthly and yearly rules keep the day of start_date, moved to the
+        last day of shorter months (a rule starting on the 31st runs on
+        the 30th in April and on the 31st again in May).
+        """
+        if self.frequency == self.WEEKLY:
+            return current + timedelta(weeks=self.interval)
+
+        months = self.interval if self.frequency == self.MONTHLY else 12 * self.interval
+        year, month = divmod(current.year * 12 + current.month - 1 + months, 12)
+        day = min(self.start_date.day, calendar.monthrange(year, month + 1)[1])
+        return date(year, month + 1, day)
+
+
+class MonthlyCategoryRollup(models.Model):
+    """
+    Materialized monthly totals per user, account, category and transaction type.
+    Kept up to date incrementally by the transaction write path so period
+    reports can read full months without scanning raw transactions.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='monthly_rollups',
+        verbose_name='Usuário'
+    )
+    account = models.ForeignKey(
+        'accounts.Account',
+        on_delete=models.CASCADE,
+        related_name='monthly_rollups',
+        verbose_name='Conta'
+    )
+    category = models.ForeignKey(
+        'categories.Category',
+        on_delete=models.CASCADE,
+        related_name='monthly_rollups',
+        verbose_name='Categoria'
+    )
+    year = models.PositiveSmallIntegerField(
+        verbose_name='Ano'
+    )
+    month = models.PositiveSmallIntegerField(
+        verbose_name='Mês'
+    )
+    transaction_type = models.CharField(
+        max_length=10,
+        choices=Transaction.TRANSACTION_TYPE_CHOICES,
+        verbose_name='Tipo'
+    )
+    total = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0,
+        verbose_name='Total'
+    )
+    transaction_count = models.IntegerField(
+        default=0,
+        verbose_name='Quantidade de transações'
+    )
+
+    class Meta:
+        ordering = ['-year', '-month']
+        verbose_name = 'Resumo mensal por categoria'
+        verbose_name_plural = 'Resumos mensais por categoria'
+        unique_together = ['user', 'account', 'category', 'year', 'month', 'transaction_type']
+        indexes = [
+            models.Index(fields=['user', 'year', 'month']),
+        ]
+
+    def __str__(self):
+        return f'{self.month:02d}/{self.year} - R$ {self.total} ({self.get_transaction_type_display()})'
+
+
+class DailyBalanceSnapshot(models.Model):
+    """
+    Net change of an account's balance since it was opened, through the end of a day.
+    Rows exist for days with transactions and for the last day read; a write dated
+    D deletes the account's snapshots from D forward, and reads extend the series
+    again from the last remaining snapshot (see transactions.snapshots).
+    """
+
+    account = models.ForeignKey(
+        'accounts.Account',
+        on_delete=models.CASCADE,
+        related_name='balance_snapshots',
+        verbose_name='Conta'
+    )
+    date = models.DateField(
+        verbose_name='Data'
+    )
+    net_total = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        verbose_name='Variação acumulada'
+    )
+
+    class Meta:
+        ordering = ['date']
+        verbose_name = 'Saldo diário'
+        verbose_name_plural = 'Saldos diários'
+        unique_together = ['account', 'date']
+
+    def __str__(self):
+        return f'{self.account} - {self.date.strftime("%d/%m/%Y")}'
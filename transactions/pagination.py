@@ -0,0 +1,206 @@
+"""
+Keyset (cursor) pagination for the transactions app.
+
+Pages are addressed by opaque cursors holding the sort key
+(transaction_date, created_at, id) of the row next to them, so fetching
+any page is a single index range read of page_size + 1 rows, no matter
+how deep it is. Totals are counted up to a cap instead of over the whole
+filtered set.
+"""
+
+import base64
+import binascii
+import json
+from datetime import date, datetime
+
+from django.db.models import Q
+
+
+# Sort order used by keyset pagination: Transaction.Meta.ordering plus id as tie-breaker
+KEYSET_ORDERING = ('-transaction_date', '-created_at', '-id')
+
+# Counts above this value are reported as "more than COUNT_CAP"
+COUNT_CAP = 1000
+
+# Cursor direction markers
+FORWARD = 'f'
+BACKWARD = 'b'
+
+
+def encode_cursor(key, direction):
+    """
+    Encode a sort key and direction into an opaque, URL-safe cursor.
+
+    Args:
+        key: (transaction_date, created_at, id) tuple, or None for the end of the list
+        direction: FORWARD (rows after key) or BACKWARD (rows before key)
+    """
+    payload = {'d': direction}
+    if key is not None:
+        transaction_date, created_at, pk = key
+        payload.update({'t': transaction_date.isoformat(), 'c': created_at.isoformat(), 'i': pk})
+    raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Returns:
+        tuple: (key, direction), or (None, FORWARD) for a missing or invalid cursor
+    """
+    if not cursor:
+        return None, FORWARD
+
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        direction = payload['d']
+        if direction not in (FORWARD, BACKWARD):
+            raise ValueError(direction)
+        if 'i' not in payload:
+            return None, direction
+        key = (
+            date.fromisoformat(payload['t']),
+            datetime.fromisoformat(payload['c']),
+            int(payload['i']),
+        )
+    except (binascii.Error, UnicodeDecodeError, ValueError, KeyError, TypeError):
+        return None, FORWARD
+
+    return key, direction
+
+
+def _get_key(transaction):
+    return (transaction.transaction_date, transaction.created_at, transaction.pk)
+
+
+def _after(key):
+    """
+    Filter for rows that come after key in KEYSET_ORDERING (descending) order.
+    The redundant bound on transaction_date lets the database seek the date
+    index directly and prune yearly partitions (see transactions.partitions).
+    """
+    transaction_date, created_at, pk = key
+    return Q(transaction_date__lte=transaction_date) & (
+        Q(transaction_date__lt=transaction_date)
+        | Q(transaction_date=transaction_date, created_at__lt=created_at)
+        | Q(transaction_date=transaction_date, created_at=created_at, pk__lt=pk)
+    )
+
+
+def _before(key):
+    """
+    Filter for rows that come before key in KEYSET_ORDERING (descending) order.
+    """
+    transaction_date, created_at, pk = key
+    return Q(transaction_date__gte=transaction_date) & (
+        Q(transaction_date__gt=transaction_date)
+        | Q(transaction_date=transaction_date, created_at__gt=created_at)
+        | Q(transaction_date=transaction_date, created_at=created_at, pk__gt=pk)
+    )
+
+
+class KeysetPage:
+    """
+    A page of transactions returned by KeysetPaginator.
+    """
+
+    def __init__(self, object_list, has_next, has_previous, paginator):
+        self.object_list = object_list
+        self._has_next = has_next
+        self._has_previous = has_previous
+        self.paginator = paginator
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self):
+        if not self._has_next:
+            return None
+        return encode_cursor(_get_key(self.object_list[-1]), FORWARD)
+
+    @property
+    def previous_cursor(self):
+        if not self._has_previous:
+            return None
+        return encode_cursor(_get_key(self.object_list[0]), BACKWARD)
+
+    @property
+    def last_cursor(self):
+        return encode_cursor(None, BACKWARD)
+
+
+class KeysetPaginator:
+    """
+    Paginate a transaction queryset by (transaction_date, created_at, id).
+
+    Exposes a capped count (count, count_is_capped) instead of an exact
+    COUNT(*) over the whole filtered set.
+    """
+
+    def __init__(self, queryset, per_page, count_cap=COUNT_CAP):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.count_cap = count_cap
+        self._count = None
+
+    def _get_capped_count(self):
+        if self._count is None:
+            # COUNT over a LIMITed subquery: reads at most count_cap + 1 index entries
+            self._count = self.queryset.order_by().values('pk')[:self.count_cap + 1].count()
+        return self._count
+
+    @property
+    def count(self):
+        return min(self._get_capped_count(), self.count_cap)
+
+    @property
+    def count_is_capped(self):
+        return self._get_capped_count() > self.count_cap
+
+    def get_page(self, cursor=None):
+        """
+        Return the KeysetPage addressed by cursor (the first page if cursor is empty or invalid).
+        """
+        key, direction = decode_cursor(cursor)
+
+        if direction == FORWARD:
+            queryset = self.queryset.order_by(*KEYSET_ORDERING)
+            if key is not None:
+                queryset = queryset.filter(_after(key))
+            rows = list(queryset[:self.per_page + 1])
+            has_next = len(rows) > self.per_page
+            has_previous = key is not None
+            rows = rows[:self.per_page]
+        else:
+            reverse_ordering = [field.lstrip('-') for field in KEYSET_ORDERING]
+            queryset = self.queryset.order_by(*reverse_ordering)
+            if key is not None:
+                queryset = queryset.filter(_before(key))
+            rows = list(queryset[:self.per_page + 1])
+            has_previous = len(rows) > self.per_page
+            has_next = True
+            rows = rows[:self.per_page][::-1]
+            if key is None:
+                # Last page requested directly
+                has_next = False
+            elif not has_previous:
+                # Reached the start of the list: serve a full first page instead
+                return self.get_page(None)
+
+        return KeysetPage(rows, has_next, has_previous, self)
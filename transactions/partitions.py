@@ -0,0 +1,264 @@
+"""
+Optional yearly partitioning of the transactions table (PostgreSQL only).
+
+partition_transactions() converts transactions_transaction in place into a
+table partitioned by RANGE (transaction_date), with one partition per
+calendar year plus a default partition for dates outside them. The ORM is
+unaware of the change: queries filtering on transaction_date are pruned to
+the matching partitions by PostgreSQL, and updates that change the date
+move the row between partitions.
+
+A closed year can then be set aside with detach_year(), which removes its
+partition from the table without touching its rows, and brought back with
+attach_year(). Detached years leave the list, the exports and the
+partial-month sums of the dashboard, while account balances and the
+monthly rollups keep counting them.
+"""
+
+import re
+from datetime import date
+
+from django.db import transaction
+
+from .models import Transaction
+
+
+TABLE = Transaction._meta.db_table
+YEAR_PARTITION = TABLE + '_y{year}'
+DEFAULT_PARTITION = TABLE + '_default'
+
+YEAR_PARTITION_PATTERN = re.compile(rf'^{TABLE}_y(\d{{4}})$')
+
+
+class PartitioningError(Exception):
+    """Raised when the database cannot be partitioned or a partition is missing."""
+
+
+def _check_vendor(connection):
+    if connection.vendor != 'postgresql':
+        raise PartitioningError(
+            f'Yearly partitioning requires PostgreSQL (current database: {connection.vendor})'
+        )
+
+
+def _year_bounds(year):
+    return date(year, 1, 1).isoformat(), date(year + 1, 1, 1).isoformat()
+
+
+def is_partitioned(connection):
+    """
+    Return whether the transactions table is partitioned.
+    """
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1 FROM pg_partitioned_table WHERE partrelid = %s::regclass', [TABLE])
+        return cursor.fetchone() is not None
+
+
+def get_year_partitions(connection):
+    """
+    Return the yearly partitions of the transactions table.
+
+    Returns:
+        tuple: (attached, detached) sorted lists of years
+    """
+    if connection.vendor != 'postgresql':
+        return [], []
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT c.relname, i.inhparent IS NOT NULL
+            FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace AND n.nspname = current_schema()
+            LEFT JOIN pg_inherits i ON i.inhrelid = c.oid
+            WHERE c.relkind IN ('r', 'p') AND c.relname LIKE %s
+            """,
+            [TABLE + '_y%'],
+        )
+        rows = cursor.fetchall()
+
+    attached, detached = [], []
+    for name, is_attached in rows:
+        match = YEAR_PARTITION_PATTERN.match(name)
+        if match:
+            (attached if is_attached else detached).append(int(match.group(1)))
+    return sorted(attached), sorted(detached)
+
+
+def check_no_detached_years(connection):
+    """
+    Raise PartitioningError while any year is detached.
+
+    Balances, rollups and category counters keep counting the rows of
+    detached years, so recomputing them from the table would drop those
+    rows. Commands rebuilding or correcting them call this first.
+    """
+    _, detached = get_year_partitions(connection)
+    if detached:
+        raise PartitioningError(
+            f'Transactions of {", ".join(map(str, detached))} are detached; '
+            'attach them with partition_transactions --attach first'
+        )
+
+
+def partition_transactions(connection, years_ahead=1):
+    """
+    Convert the transactions table into a table partitioned by year.
+
+    The rows are copied into a new partitioned table with one partition per
+    year from the oldest transaction through years_ahead years from now,
+    and the indexes, foreign keys and identity sequence are recreated on
+    it. Runs in one transaction holding an exclusive lock on the table.
+    The primary key becomes (id, transaction_date), as PostgreSQL requires
+    the partition key in unique constraints; ids stay unique through the
+    identity sequence.
+
+    Returns:
+        int: Number of rows copied
+    """
+    _check_vendor(connection)
+    if is_partitioned(connection):
+        raise PartitioningError(f'{TABLE} is already partitioned')
+
+    old_table = TABLE + '_unpartitioned'
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        cursor.execute(f'LOCK TABLE {TABLE} IN ACCESS EXCLUSIVE MODE')
+
+        # Index and foreign key definitions, replayed on the new table
+        cursor.execute(
+            'SELECT pg_get_indexdef(indexrelid) FROM pg_index WHERE indrelid = %s::regclass AND NOT indisprimary',
+            [TABLE],
+        )
+        index_definitions = [row[0] for row in cursor.fetchall()]
+        cursor.execute(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = %s::regclass AND contype = 'f'",
+            [TABLE],
+        )
+        foreign_keys = cursor.fetchall()
+        cursor.execute(f'SELECT MIN(transaction_date) FROM {TABLE}')
+        oldest = cursor.fetchone()[0]
+
+        cursor.execute(f'ALTER TABLE {TABLE} RENAME TO {old_table}')
+        cursor.execute(
+            f'CREATE TABLE {TABLE} (LIKE {old_table} INCLUDING DEFAULTS INCLUDING IDENTITY '
+            'INCLUDING CONSTRAINTS) PARTITION BY RANGE (transaction_date)'
+        )
+        cursor.execute(f'CREATE TABLE {DEFAULT_PARTITION} PARTITION OF {TABLE} DEFAULT')
+        current_year = date.today().year
+        for year in range(min(oldest.year if oldest else current_year, current_year), current_year + years_ahead + 1):
+            _create_partition(cursor, year)
+
+        cursor.execute(f'INSERT INTO {TABLE} SELECT * FROM {old_table}')
+        copied = cursor.rowcount
+        cursor.execute(f'DROP TABLE {old_table}')
+
+        cursor.execute(f'ALTER TABLE {TABLE} ADD CONSTRAINT {TABLE}_pkey PRIMARY KEY (id, transaction_date)')
+        for definition in index_definitions:
+            cursor.execute(definition)
+        for name, definition in foreign_keys:
+            cursor.execute(f'ALTER TABLE {TABLE} ADD CONSTRAINT {name} {definition}')
+        cursor.execute(
+            f"SELECT setval(pg_get_serial_sequence(%s, 'id'), COALESCE(MAX(id), 1), MAX(id) IS NOT NULL) FROM {TABLE}",
+            [TABLE],
+        )
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'ANALYZE {TABLE}')
+    return copied
+
+
+def _create_partition(cursor, year):
+    start, end = _year_bounds(year)
+    cursor.execute(
+        f'CREATE TABLE {YEAR_PARTITION.format(year=year)} PARTITION OF {TABLE} '
+        f"FOR VALUES FROM ('{start}') TO ('{end}')"
+    )
+
+
+def create_year_partitions(connection, years_ahead=1):
+    """
+    Create the missing yearly partitions through years_ahead years from now.
+
+    Rows of those years already stored in the default partition are moved
+    into the new partition before it is attached.
+
+    Returns:
+        list: Years whose partition was created
+    """
+    _check_vendor(connection)
+    attached, detached = get_year_partitions(connection)
+    current_year = date.today().year
+    first_year = attached[-1] + 1 if attached else current_year
+    missing = [
+        year for year in range(first_year, current_year + years_ahead + 1)
+        if year not in detached
+    ]
+
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        for year in missing:
+            name = YEAR_PARTITION.format(year=year)
+            start, end = _year_bounds(year)
+            cursor.execute(f'CREATE TABLE {name} (LIKE {TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)')
+            cursor.execute(
+                f'WITH moved AS (DELETE FROM {DEFAULT_PARTITION} '
+                'WHERE transaction_date >= %s AND transaction_date < %s RETURNING *) '
+                f'INSERT INTO {name} SELECT * FROM moved',
+                [start, end],
+            )
+            cursor.execute(f"ALTER TABLE {TABLE} ATTACH PARTITION {name} FOR VALUES FROM ('{start}') TO ('{end}')")
+    return missing
+
+
+def detach_year(connection, year):
+    """
+    Detach the partition of a year, keeping its rows in a standalone table.
+
+    The detached table loses its foreign keys, so deleting a user or an
+    account is not blocked by archived rows; attach_year() validates them
+    again.
+    """
+    _check_vendor(connection)
+    attached, _ = get_year_partitions(connection)
+    if year not in attached:
+        raise PartitioningError(f'No attached partition for {year}')
+    if year >= date.today().year:
+        raise PartitioningError(f'{year} is not closed yet')
+
+    name = YEAR_PARTITION.format(year=year)
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        cursor.execute(f'ALTER TABLE {TABLE} DETACH PARTITION {name}')
+        cursor.execute(
+            "SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'f'",
+            [name],
+        )
+        for (constraint,) in cursor.fetchall():
+            cursor.execute(f'ALTER TABLE {name} DROP CONSTRAINT {constraint}')
+
+
+def attach_year(connection, year):
+    """
+    Attach a previously detached year back to the transactions table.
+    """
+    _check_vendor(connection)
+    _, detached = get_year_partitions(connection)
+    if year not in detached:
+        raise PartitioningError(f'No detached partition for {year}')
+
+    start, end = _year_bounds(year)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'ALTER TABLE {TABLE} ATTACH PARTITION {YEAR_PARTITION.format(year=year)} '
+            f"FOR VALUES FROM ('{start}') TO ('{end}')"
+        )
+
+
+def get_affected_user_ids(connection, year):
+    """
+    Return the ids of the users with transactions in the partition of a year.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT DISTINCT user_id FROM {YEAR_PARTITION.format(year=year)}')
+        return [row[0] for row in cursor.fetchall()]
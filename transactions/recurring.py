@@ -0,0 +1,145 @@
+"""
+Materialization of recurring transactions.
+
+materialize_due_transactions() reads the active rules whose next_run is
+due, for all users at once, in batches ordered by next_run (an index range
+read, so the work grows with the number of due rules, not of users). Each
+batch creates every due occurrence with one bulk insert, applying the
+balance, rollup and category changes once per account, key and category
+(see services.bulk_insert_transactions), and moves next_run past the run
+date in the same atomic block. A rerun, or a concurrent run, finds no rule
+due and creates nothing.
+"""
+
+from datetime import date
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import RecurringTransaction, Transaction
+from .services import bulk_insert_transactions
+
+
+# Number of rules materialized per atomic block
+RECURRING_BATCH_SIZE = 500
+
+
+def get_due_occurrences(rule, through):
+    """
+    Return the occurrence dates of a rule due up to through, and its next run after them.
+
+    Raises:
+        ValueError: If the rule's next date does not advance (interval below 1)
+
+    Returns:
+        tuple: (list of dates, next run date)
+    """
+    occurrences = []
+    current = rule.next_run
+    while current <= through and (rule.end_date is None or current <= rule.end_date):
+        occurrences.append(current)
+        next_date = rule.get_next_date(current)
+        if next_date <= current:
+            raise ValueError(f'Recurring transaction {rule.pk} does not advance from {current}')
+        current = next_date
+    return occurrences, current
+
+
+def build_occurrence(rule, transaction_date):
+    """
+    Build the unsaved Transaction of one occurrence of a rule.
+    """
+    return Transaction(
+        user_id=rule.user_id,
+        account_id=rule.account_id,
+        category_id=rule.category_id,
+        description=rule.description,
+        amount=rule.amount,
+        transaction_type=rule.transaction_type,
+        transaction_date=transaction_date,
+    )
+
+
+def create_rule_from_transaction(item, frequency, interval=1):
+    """
+    Create the recurring rule repeating a saved transaction.
+    The transaction is the first occurrence, so the rule starts on its date
+    and next_run is the occurrence after it.
+
+    Returns:
+        RecurringTransaction: The created rule
+    """
+    rule = RecurringTransaction(
+        user_id=item.user_id,
+        account_id=item.account_id,
+        category_id=item.category_id,
+        description=item.description,
+        amount=item.amount,
+        transaction_type=item.transaction_type,
+        frequency=frequency,
+        interval=interval,
+        start_date=item.transaction_date,
+    )
+    rule.next_run = rule.get_next_date(item.transaction_date)
+    rule.save()
+    return rule
+
+
+def get_due_rules(through, user_ids=None):
+    """
+    Return the active rules with an occurrence due up to through, oldest first.
+    Rules of inactive accounts wait until the account is active again.
+    """
+    rules = RecurringTransaction.objects.filter(
+        is_active=True,
+        next_run__lte=through,
+        account__is_active=True,
+    )
+    if user_ids is not None:
+        rules = rules.filter(user_id__in=list(user_ids))
+    return rules.order_by('next_run', 'pk')
+
+
+def materialize_due_transactions(through=None, user_ids=None, batch_size=RECURRING_BATCH_SIZE):
+    """
+    Create the transactions of every occurrence due up to through (default: today).
+
+    Each batch locks its rules (skipping rules locked by a concurrent run),
+    inserts their occurrences and advances them in one database transaction.
+    Rules past their end date are deactivated.
+
+    Args:
+        through: Last date to materialize
+        user_ids: Optional iterable of user IDs (default: every user)
+        batch_size: Rules materialized per database transaction
+
+    Returns:
+        tuple: (rules_processed, transactions_created)
+    """
+    through = through or date.today()
+    rules_processed = 0
+    transactions_created = 0
+
+    while True:
+        with transaction.atomic():
+            rules = list(
+                get_due_rules(through, user_ids).select_for_update(skip_locked=True, of=('self',))[:batch_size]
+            )
+            if not rules:
+                break
+
+            now = timezone.now()
+            occurrences = []
+            for rule in rules:
+                dates, rule.next_run = get_due_occurrences(rule, through)
+                occurrences += [build_occurrence(rule, transaction_date) for transaction_date in dates]
+                if rule.end_date is not None and rule.next_run > rule.end_date:
+                    rule.is_active = False
+                rule.updated_at = now
+
+            transactions_created += bulk_insert_transactions(occurrences)
+            RecurringTransaction.objects.bulk_update(rules, ['next_run', 'is_active', 'updated_at'])
+
+        rules_processed += len(rules)
+
+    return rules_processed, transactions_created
@@ -0,0 +1,354 @@
+"""
+Monthly rollups for the transactions app.
+
+Maintains MonthlyCategoryRollup incrementally from the transaction write
+path and answers period reports from full months of rollups plus raw
+transactions for the partial months at the edges of the period.
+"""
+
+import asyncio
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
+
+from .archive import get_archive_cutoff
+from .models import ArchivedTransaction, MonthlyCategoryRollup, Transaction
+
+
+# Fields identifying a rollup row, in the order used by rollup keys
+ROLLUP_KEY_FIELDS = ('user_id', 'account_id', 'category_id', 'year', 'month', 'transaction_type')
+
+CENT = Decimal('0.01')
+
+# Number of users whose rollups are rebuilt or checked per round
+ROLLUP_USER_BATCH_SIZE = 500
+
+
+def get_rollup_key(state):
+    """
+    Return the rollup key tuple for a transaction state (see Transaction.get_tracked_state).
+    """
+    transaction_date = state['transaction_date']
+    return (
+        state['user_id'],
+        state['account_id'],
+        state['category_id'],
+        transaction_date.year,
+        transaction_date.month,
+        state['transaction_type'],
+    )
+
+
+def _add_delta(deltas, key, amount, count):
+    total, transaction_count = deltas.get(key, (Decimal('0.00'), 0))
+    deltas[key] = (total + amount, transaction_count + count)
+
+
+def get_rollup_deltas(old_state=None, new_state=None):
+    """
+    Compute the rollup changes for creating, updating or deleting a transaction.
+
+    Returns:
+        dict: Mapping of rollup key -> (amount delta, count delta)
+    """
+    deltas = {}
+
+    if old_state is not None:
+        _add_delta(deltas, get_rollup_key(old_state), -old_state['amount'], -1)
+
+    if new_state is not None:
+        _add_delta(deltas, get_rollup_key(new_state), new_state['amount'], 1)
+
+    return {key: delta for key, delta in deltas.items() if any(delta)}
+
+
+def get_transactions_rollup_deltas(transactions):
+    """
+    Aggregate the rollup changes for many new transactions.
+
+    Returns:
+        dict: Mapping of rollup key -> (amount delta, count delta)
+    """
+    deltas = {}
+    for item in transactions:
+        _add_delta(deltas, get_rollup_key(item.get_tracked_state()), item.amount, 1)
+    return deltas
+
+
+def apply_rollup_deltas(deltas):
+    """
+    Apply rollup deltas with an atomic F() increment per rollup key.
+
+    Missing rows are created (with one INSERT ... ON CONFLICT DO NOTHING for
+    the whole batch) only for keys gaining transactions. Keys that only lose
+    transactions are never created, so a cascading account or category
+    delete cannot resurrect the rollup rows it is removing.
+
+    Args:
+        deltas: Mapping of rollup key -> (amount delta, count delta)
+    """
+    deltas = {key: delta for key, delta in deltas.items() if any(delta)}
+    if not deltas:
+        return
+
+    with transaction.atomic():
+        MonthlyCategoryRollup.objects.bulk_create(
+            [
+                MonthlyCategoryRollup(**dict(zip(ROLLUP_KEY_FIELDS, key)))
+                for key, (_, count) in deltas.items()
+                if count > 0
+            ],
+            ignore_conflicts=True
+        )
+
+        for key, (amount, count) in deltas.items():
+            MonthlyCategoryRollup.objects.filter(**dict(zip(ROLLUP_KEY_FIELDS, key))).update(
+                total=F('total') + amount,
+                transaction_count=F('transaction_count') + count,
+            )
+
+
+def _aggregate_transactions(user_ids):
+    """
+    Group the users' transactions by rollup key, straight from the raw rows.
+    Archived transactions still count towards the rollups, so both tables are
+    read and their groups added together.
+    """
+    rows = {}
+    for model in (Transaction, ArchivedTransaction):
+        grouped = model.objects.filter(
+            user_id__in=user_ids
+        ).annotate(
+            year=ExtractYear('transaction_date'),
+            month=ExtractMonth('transaction_date')
+        ).values(
+            *ROLLUP_KEY_FIELDS
+        ).annotate(
+            total=Sum('amount'),
+            transaction_count=Count('id')
+        ).order_by()
+
+        for row in grouped:
+            key = tuple(row[field] for field in ROLLUP_KEY_FIELDS)
+            if key in rows:
+                rows[key]['total'] += row['total']
+                rows[key]['transaction_count'] += row['transaction_count']
+            else:
+                rows[key] = row
+
+    return list(rows.values())
+
+
+def _iter_user_batches(user_ids=None):
+    """
+    Yield lists of user IDs, batch by batch, for users owning transactions or rollups.
+    """
+    if user_ids is None:
+        user_ids = sorted(
+            set(Transaction.objects.values_list('user_id', flat=True).distinct())
+            | set(ArchivedTransaction.objects.values_list('user_id', flat=True).distinct())
+            | set(MonthlyCategoryRollup.objects.values_list('user_id', flat=True).distinct())
+        )
+    else:
+        user_ids = list(user_ids)
+
+    for start in range(0, len(user_ids), ROLLUP_USER_BATCH_SIZE):
+        yield user_ids[start:start + ROLLUP_USER_BATCH_SIZE]
+
+
+def rebuild_rollups(user_ids=None):
+    """
+    Recompute the monthly rollups from the raw transactions.
+
+    Each batch of users is rebuilt in its own atomic block: their rollup rows
+    are deleted and re-inserted from one grouped aggregate.
+
+    Args:
+        user_ids: Optional iterable of user IDs (default: every user with data)
+
+    Returns:
+        int: Number of rollup rows written
+    """
+    created = 0
+
+    for batch in _iter_user_batches(user_ids):
+        with transaction.atomic():
+            MonthlyCategoryRollup.objects.filter(user_id__in=batch).delete()
+            rollups = MonthlyCategoryRollup.objects.bulk_create(
+                MonthlyCategoryRollup(**row) for row in _aggregate_transactions(batch)
+            )
+            created += len(rollups)
+
+    return created
+
+
+def find_rollup_mismatches(user_ids=None):
+    """
+    Compare the stored rollups with the raw transactions.
+
+    Args:
+        user_ids: Optional iterable of user IDs (default: every user with data)
+
+    Yields:
+        tuple: (key, expected, stored) where key is a rollup key tuple and
+               expected/stored are (total, transaction_count) tuples
+    """
+    empty = (Decimal('0.00'), 0)
+
+    for batch in _iter_user_batches(user_ids):
+        # SQLite returns unquantized sums, so totals are compared in cents
+        expected = {
+            tuple(row[field] for field in ROLLUP_KEY_FIELDS): (
+                row['total'].quantize(CENT), row['transaction_count']
+            )
+            for row in _aggregate_transactions(batch)
+        }
+        stored = {
+            tuple(row[field] for field in ROLLUP_KEY_FIELDS): (
+                row['total'].quantize(CENT), row['transaction_count']
+            )
+            for row in MonthlyCategoryRollup.objects.filter(
+                user_id__in=batch
+            ).values(*ROLLUP_KEY_FIELDS, 'total', 'transaction_count')
+        }
+
+        for key in sorted(expected.keys() | stored.keys(), key=str):
+            expected_value = expected.get(key, empty)
+            stored_value = stored.get(key, empty)
+            if expected_value != stored_value:
+                yield key, expected_value, stored_value
+
+
+def get_full_month_span(date_from, date_to):
+    """
+    Return the (first_day, last_day) range of whole calendar months inside
+    [date_from, date_to], or None when the period covers no whole month.
+    """
+    if date_from.day == 1:
+        first_day = date_from
+    else:
+        first_day = (date_from.replace(day=1) + timedelta(days=32)).replace(day=1)
+
+    if (date_to + timedelta(days=1)).day == 1:
+        last_day = date_to
+    else:
+        last_day = date_to.replace(day=1) - timedelta(days=1)
+
+    if first_day > last_day:
+        return None
+    return first_day, last_day
+
+
+def get_category_totals_querysets(user, date_from, date_to):
+    """
+    Build the grouped querysets answering a category totals report for a period.
+
+    Whole months are read from MonthlyCategoryRollup; only the partial
+    months at the edges of the period scan raw transactions (and archived
+    ones, for partial months before the archive cutoff). Each source
+    is read with conditional aggregation (one Sum per transaction type).
+    The querysets are independent and can be evaluated concurrently.
+
+    Returns:
+        list: Querysets of dicts with category__id, category__name, category__color, income and expense
+    """
+    values = ('category__id', 'category__name', 'category__color')
+    full_months = get_full_month_span(date_from, date_to)
+    raw_ranges = []
+    querysets = []
+
+    if full_months is None:
+        raw_ranges.append((date_from, date_to))
+    else:
+        first_day, last_day = full_months
+        if date_from < first_day:
+            raw_ranges.append((date_from, first_day - timedelta(days=1)))
+        if last_day < date_to:
+            raw_ranges.append((last_day + timedelta(days=1), date_to))
+
+        querysets.append(MonthlyCategoryRollup.objects.filter(
+            Q(year__gt=first_day.year) | Q(year=first_day.year, month__gte=first_day.month),
+            Q(year__lt=last_day.year) | Q(year=last_day.year, month__lte=last_day.month),
+            user=user,
+        ).values(
+            *values
+        ).annotate(
+            income=Sum('total', filter=Q(transaction_type=Transaction.INCOME)),
+            expense=Sum('total', filter=Q(transaction_type=Transaction.EXPENSE))
+        ).order_by())
+
+    if raw_ranges:
+        raw_filter = Q()
+        for range_from, range_to in raw_ranges:
+            raw_filter |= Q(transaction_date__gte=range_from, transaction_date__lte=range_to)
+
+        # Partial months older than the archive cutoff are also read from the archive
+        cutoff = get_archive_cutoff()
+        models = [Transaction]
+        if cutoff is not None and any(range_from < cutoff for range_from, _ in raw_ranges):
+            models.append(ArchivedTransaction)
+
+        for model in models:
+            querysets.append(model.objects.filter(
+                raw_filter,
+                user=user,
+            ).values(
+                *values
+            ).annotate(
+                income=Sum('amount', filter=Q(transaction_type=Transaction.INCOME)),
+                expense=Sum('amount', filter=Q(transaction_type=Transaction.EXPENSE))
+            ).order_by())
+
+    return querysets
+
+
+def merge_category_totals(rows):
+    """
+    Merge rows from get_category_totals_querysets into one total per category.
+    """
+    totals = {}
+    for row in rows:
+        current = totals.setdefault(row['category__id'], {
+            'category__id': row['category__id'],
+            'category__name': row['category__name'],
+            'category__color': row['category__color'],
+            'income': Decimal('0.00'),
+            'expense': Decimal('0.00'),
+        })
+        current['income'] += row['income'] or Decimal('0.00')
+        current['expense'] += row['expense'] or Decimal('0.00')
+
+    return list(totals.values())
+
+
+def get_category_totals(user, date_from, date_to):
+    """
+    Return income and expense totals per category for a period,
+    read from the querysets of get_category_totals_querysets.
+
+    Returns:
+        list: Dicts with category__id, category__name, category__color, income and expense
+    """
+    rows = []
+    for queryset in get_category_totals_querysets(user, date_from, date_to):
+        rows += queryset
+
+    return merge_category_totals(rows)
+
+
+async def aget_category_totals(user, date_from, date_to):
+    """
+    Async version of get_category_totals: the rollup and raw transaction
+    queries are awaited concurrently.
+    """
+    async def fetch(queryset):
+        return [row async for row in queryset]
+
+    results = await asyncio.gather(*(
+        fetch(queryset) for queryset in get_category_totals_querysets(user, date_from, date_to)
+    ))
+
+    return merge_category_totals(row for rows in results for row in rows)
@@ -0,0 +1,190 @@
+"""
+Indexed search over transaction descriptions.
+
+On SQLite the descriptions are indexed by an FTS5 table kept in sync with
+transactions_transaction by triggers, so every write path (ORM saves,
+bulk_create, raw deletes) updates the index in the same statement. On
+PostgreSQL a pg_trgm GIN index on UPPER(description) serves the
+case-insensitive LIKE that Django emits for icontains. Other backends fall
+back to unindexed icontains.
+
+search_transactions() only adds a filter, so it composes with the other
+filters of the transaction list and with keyset pagination.
+"""
+
+import re
+
+from django.db import connections
+from django.db.models.expressions import RawSQL
+
+from .models import Transaction
+
+
+FTS_TABLE = 'transactions_transaction_fts'
+TRIGRAM_INDEX = 'transactions_description_trgm'
+
+# Searches use at most this many terms; the rest of the query is ignored
+MAX_SEARCH_TERMS = 8
+
+SQLITE_TRIGGERS = {
+    f'{FTS_TABLE}_ai': (
+        'AFTER INSERT ON transactions_transaction BEGIN '
+        f'INSERT INTO {FTS_TABLE}(rowid, description) VALUES (new.id, new.description); '
+        'END'
+    ),
+    f'{FTS_TABLE}_ad': (
+        'AFTER DELETE ON transactions_transaction BEGIN '
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, description) VALUES ('delete', old.id, old.description); "
+        'END'
+    ),
+    f'{FTS_TABLE}_au': (
+        'AFTER UPDATE OF description ON transactions_transaction BEGIN '
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, description) VALUES ('delete', old.id, old.description); "
+        f'INSERT INTO {FTS_TABLE}(rowid, description) VALUES (new.id, new.description); '
+        'END'
+    ),
+}
+
+# Rows sampled per index when refreshing the SQLite planner statistics
+ANALYSIS_LIMIT = 400
+
+# Databases (by alias and name) known to have the FTS5 index
+_fts_databases = set()
+
+
+def get_search_terms(query):
+    """
+    Split a search query into words, ignoring punctuation.
+
+    Returns:
+        list: Up to MAX_SEARCH_TERMS words
+    """
+    return re.findall(r'\w+', query or '')[:MAX_SEARCH_TERMS]
+
+
+def has_fts_index(connection):
+    """
+    Return whether the database of the connection has the FTS5 index.
+    """
+    key = (connection.alias, connection.settings_dict['NAME'])
+    if key not in _fts_databases:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE])
+            if cursor.fetchone() is None:
+                return False
+        _fts_databases.add(key)
+    return True
+
+
+def analyze_transactions(connection):
+    """
+    Refresh the planner statistics of transactions_transaction.
+
+    On SQLite the ANALYZE is sampled (ANALYSIS_LIMIT rows per index, a few
+    milliseconds). Without statistics SQLite walks the user's date index and
+    probes every row against the search results, instead of reading only the
+    matching rows.
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute(f'PRAGMA analysis_limit={ANALYSIS_LIMIT}')
+        cursor.execute(f'ANALYZE {Transaction._meta.db_table}')
+
+
+def search_transactions(queryset, query):
+    """
+    Filter a transaction queryset to descriptions matching every word of query.
+
+    On SQLite each word matches as a prefix, ignoring case and accents
+    ("merc" finds "Mercado"); elsewhere each word must appear in the
+    description, ignoring case. Archived transactions are not indexed and
+    always use the latter.
+
+    Args:
+        queryset: Transaction queryset to filter
+        query: Text typed by the user
+
+    Returns:
+        QuerySet: The filtered queryset (unchanged when query has no words)
+    """
+    terms = get_search_terms(query)
+    if not terms:
+        return queryset
+
+    connection = connections[queryset.db]
+    if queryset.model is Transaction and connection.vendor == 'sqlite' and has_fts_index(connection):
+        match = ' '.join(f'"{term}"*' for term in terms)
+        return queryset.filter(
+            pk__in=RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [match])
+        )
+
+    for term in terms:
+        queryset = queryset.filter(description__icontains=term)
+    return queryset
+
+
+def install_search_index(connection):
+    """
+    Create the description search index for the connection's database.
+    On SQLite the FTS5 table and its triggers are created and the index is
+    built from the existing rows. Does nothing on other backends.
+    """
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+            cursor.execute(
+                f'CREATE INDEX IF NOT EXISTS {TRIGRAM_INDEX} ON transactions_transaction '
+                'USING gin (UPPER(description::text) gin_trgm_ops)'
+            )
+    elif connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5('
+                "description, content='transactions_transaction', content_rowid='id', "
+                "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+            )
+            for name, body in SQLITE_TRIGGERS.items():
+                cursor.execute(f'CREATE TRIGGER IF NOT EXISTS {name} {body}')
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def repair_search_index(connection):
+    """
+    Recreate the SQLite triggers if a migration dropped them.
+
+    SQLite migrations that alter transactions_transaction rebuild the table,
+    which drops its triggers and leaves the FTS5 index behind. When the index
+    exists but a trigger is missing, the triggers are recreated and the index
+    is rebuilt from the table.
+
+    Returns:
+        bool: True if the index was repaired
+    """
+    if connection.vendor != 'sqlite':
+        return False
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE name = %s OR (type = 'trigger' AND tbl_name = %s)",
+            [FTS_TABLE, Transaction._meta.db_table],
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+
+    if FTS_TABLE not in existing or existing.issuperset(SQLITE_TRIGGERS):
+        return False
+    install_search_index(connection)
+    return True
+
+
+def remove_search_index(connection):
+    """
+    Drop the description search index created by install_search_index().
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(f'DROP INDEX IF EXISTS {TRIGRAM_INDEX}')
+        elif connection.vendor == 'sqlite':
+            for name in SQLITE_TRIGGERS:
+                cursor.execute(f'DROP TRIGGER IF EXISTS {name}')
+            cursor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+    _fts_databases.clear()
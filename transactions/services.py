@@ -0,0 +1,709 @@
+"""
+Services for the transactions app.
+
+Applies the balance impact of transactions to Account.current_balance using
+set-based UPDATE statements instead of read-modify-write cycles, ingests,
+deletes and moves transactions in bulk while keeping account balances
+correct, and reconciles stored balances with the transactions.
+"""
+
+from decimal import Decimal
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.db import connections, transaction
+from django.db.models import (
+    Case, Count, DecimalField, F, IntegerField, Max, Min, OuterRef, Q, Subquery, Sum, Value, When,
+)
+from django.db.models.functions import Coalesce, ExtractMonth, ExtractYear
+from django.utils import timezone
+
+from accounts.models import Account
+from categories.models import Category
+from core.cache import bump_user_data_version_on_commit
+
+from .models import ArchivedTransaction, Transaction
+from .rollups import CENT, ROLLUP_KEY_FIELDS, apply_rollup_deltas, get_rollup_deltas, get_transactions_rollup_deltas
+from .snapshots import (
+    get_snapshot_invalidations,
+    get_transactions_snapshot_invalidations,
+    invalidate_snapshots,
+)
+from .validators import validate_account, validate_amount, validate_category
+
+
+# Maximum number of accounts updated by a single UPDATE ... CASE statement
+BALANCE_UPDATE_BATCH_SIZE = 500
+
+# Number of rows validated, inserted and applied to balances per atomic block
+INGESTION_BATCH_SIZE = 5000
+
+# Maximum number of transactions removed by a single DELETE statement
+DELETE_BATCH_SIZE = 500
+
+# Number of invalid rows kept (with their messages) by ImportErrors; the rest are only counted
+MAX_ERROR_SAMPLE = 50
+
+
+class ImportErrors:
+    """
+    Invalid rows of an import: the first MAX_ERROR_SAMPLE (row_number, message)
+    pairs and the count of all of them, so memory stays flat however many
+    rows are invalid. len() returns the total count.
+    """
+
+    def __init__(self, sample_size=None):
+        self.sample_size = MAX_ERROR_SAMPLE if sample_size is None else sample_size
+        self.sample = []
+        self.count = 0
+
+    def append(self, error):
+        self.count += 1
+        if len(self.sample) < self.sample_size:
+            self.sample.append(error)
+
+    def __len__(self):
+        return self.count
+
+
+def signed_amount(transaction_type, amount):
+    """
+    Return the signed impact of a transaction on its account balance.
+
+    Income increases the balance, expense decreases it.
+
+    Args:
+        transaction_type: Transaction.INCOME or Transaction.EXPENSE
+        amount: The (positive) transaction amount
+
+    Returns:
+        Decimal: amount for income, -amount for expense
+    """
+    if transaction_type == Transaction.INCOME:
+        return amount
+    return -amount
+
+
+def get_balance_deltas(old_state=None, new_state=None):
+    """
+    Compute the per-account balance deltas for a transaction change.
+
+    Each state is a dict as returned by Transaction.get_tracked_state(),
+    or None when the transaction did not exist before (create) or does not
+    exist after (delete).
+
+    Args:
+        old_state: The persisted state before the change
+        new_state: The state after the change
+
+    Returns:
+        dict: Mapping of account_id -> Decimal delta (zero deltas omitted)
+    """
+    deltas = {}
+
+    if old_state is not None:
+        account_id = old_state['account_id']
+        deltas[account_id] = deltas.get(account_id, Decimal('0.00')) - signed_amount(
+            old_state['transaction_type'], old_state['amount']
+        )
+
+    if new_state is not None:
+        account_id = new_state['account_id']
+        deltas[account_id] = deltas.get(account_id, Decimal('0.00')) + signed_amount(
+            new_state['transaction_type'], new_state['amount']
+        )
+
+    return {account_id: delta for account_id, delta in deltas.items() if delta}
+
+
+def apply_balance_deltas(deltas):
+    """
+    Apply per-account balance deltas with a single UPDATE per batch of accounts.
+
+    Runs UPDATE accounts_account SET current_balance = current_balance + CASE ...
+    so the database does the arithmetic atomically and no account row has to
+    be read or locked by the application first.
+
+    Args:
+        deltas: Mapping of account_id -> Decimal delta
+
+    Returns:
+        int: Number of account rows updated
+    """
+    deltas = {account_id: delta for account_id, delta in deltas.items() if delta}
+    if not deltas:
+        return 0
+
+    now = timezone.now()
+    updated = 0
+    account_ids = list(deltas)
+
+    for start in range(0, len(account_ids), BALANCE_UPDATE_BATCH_SIZE):
+        batch = account_ids[start:start + BALANCE_UPDATE_BATCH_SIZE]
+
+        if len(batch) == 1:
+            delta_expression = Value(deltas[batch[0]], output_field=DecimalField(max_digits=12, decimal_places=2))
+        else:
+            delta_expression = Case(
+                *[When(pk=account_id, then=Value(deltas[account_id])) for account_id in batch],
+                output_field=DecimalField(max_digits=12, decimal_places=2),
+            )
+
+        updated += Account.objects.filter(pk__in=batch).update(
+            current_balance=F('current_balance') + delta_expression,
+            updated_at=now,
+        )
+
+    return updated
+
+
+def get_category_deltas(rollup_deltas):
+    """
+    Sum rollup deltas per category for the Category usage counters.
+
+    Returns:
+        dict: Mapping of category_id -> (amount delta, count delta)
+    """
+    deltas = {}
+    for key, (amount, count) in rollup_deltas.items():
+        category_id = key[2]
+        total, transaction_count = deltas.get(category_id, (Decimal('0.00'), 0))
+        deltas[category_id] = (total + amount, transaction_count + count)
+
+    return {category_id: delta for category_id, delta in deltas.items() if any(delta)}
+
+
+def apply_category_deltas(deltas):
+    """
+    Apply per-category usage deltas with a single UPDATE per batch of categories.
+
+    Increments Category.transaction_count and Category.transaction_total with
+    F() expressions, the same way apply_balance_deltas updates balances.
+
+    Args:
+        deltas: Mapping of category_id -> (amount delta, count delta)
+
+    Returns:
+        int: Number of category rows updated
+    """
+    deltas = {category_id: delta for category_id, delta in deltas.items() if any(delta)}
+    if not deltas:
+        return 0
+
+    updated = 0
+    category_ids = list(deltas)
+
+    for start in range(0, len(category_ids), BALANCE_UPDATE_BATCH_SIZE):
+        batch = category_ids[start:start + BALANCE_UPDATE_BATCH_SIZE]
+
+        if len(batch) == 1:
+            amount, count = deltas[batch[0]]
+            amount_expression = Value(amount, output_field=DecimalField(max_digits=14, decimal_places=2))
+            count_expression = Value(count, output_field=IntegerField())
+        else:
+            amount_expression = Case(
+                *[When(pk=category_id, then=Value(deltas[category_id][0])) for category_id in batch],
+                output_field=DecimalField(max_digits=14, decimal_places=2),
+            )
+            count_expression = Case(
+                *[When(pk=category_id, then=Value(deltas[category_id][1])) for category_id in batch],
+                output_field=IntegerField(),
+            )
+
+        updated += Category.objects.filter(pk__in=batch).update(
+            transaction_total=F('transaction_total') + amount_expression,
+            transaction_count=F('transaction_count') + count_expression,
+        )
+
+    return updated
+
+
+def apply_transaction_change(old_state=None, new_state=None):
+    """
+    Apply the impact of creating, updating or deleting a transaction.
+
+    Covers amount, type and account changes in one balance statement: the
+    old impact is reverted and the new one applied as a single net delta.
+    The monthly rollups and category counters are updated and the balance
+    snapshots from the affected dates forward invalidated in the same atomic
+    block, and the user's cached fragments are invalidated once it commits.
+
+    Args:
+        old_state: The persisted state before the change (None on create)
+        new_state: The state after the change (None on delete)
+    """
+    with transaction.atomic():
+        apply_balance_deltas(get_balance_deltas(old_state, new_state))
+        rollup_deltas = get_rollup_deltas(old_state, new_state)
+        apply_rollup_deltas(rollup_deltas)
+        apply_category_deltas(get_category_deltas(rollup_deltas))
+        invalidate_snapshots(get_snapshot_invalidations(old_state, new_state))
+        bump_user_data_version_on_commit(
+            *[state['user_id'] for state in (old_state, new_state) if state is not None]
+        )
+
+
+def get_transactions_balance_deltas(transactions):
+    """
+    Aggregate the balance impact of many transactions into one delta per account.
+
+    Args:
+        transactions: Iterable of Transaction instances
+
+    Returns:
+        dict: Mapping of account_id -> Decimal delta (zero deltas omitted)
+    """
+    deltas = {}
+    for item in transactions:
+        deltas[item.account_id] = deltas.get(item.account_id, Decimal('0.00')) + signed_amount(
+            item.transaction_type, item.amount
+        )
+    return {account_id: delta for account_id, delta in deltas.items() if delta}
+
+
+def bulk_insert_transactions(transactions):
+    """
+    Insert already validated transactions and update their account balances.
+
+    bulk_create() skips the post_save signals, so the balance impact of the
+    whole batch is aggregated per account and applied with a single UPDATE,
+    and the monthly rollups with one increment per rollup key (category
+    counters with one per category), inside the same atomic block as the
+    INSERT. Balance snapshots from the earliest new date of each account
+    forward are invalidated.
+
+    Args:
+        transactions: List of unsaved, validated Transaction instances
+
+    Returns:
+        int: Number of transactions inserted
+    """
+    if not transactions:
+        return 0
+
+    with transaction.atomic():
+        Transaction.objects.bulk_create(transactions)
+        apply_balance_deltas(get_transactions_balance_deltas(transactions))
+        rollup_deltas = get_transactions_rollup_deltas(transactions)
+        apply_rollup_deltas(rollup_deltas)
+        apply_category_deltas(get_category_deltas(rollup_deltas))
+        invalidate_snapshots(get_transactions_snapshot_invalidations(transactions))
+        bump_user_data_version_on_commit(*{item.user_id for item in transactions})
+
+    return len(transactions)
+
+
+def _lock_transaction_ids(queryset):
+    """
+    Lock the rows of a transaction queryset and return their primary keys.
+    """
+    return list(queryset.select_for_update().order_by('pk').values_list('pk', flat=True))
+
+
+def delete_transaction_rows(ids, using='default'):
+    """
+    Delete transactions by primary key with plain DELETE statements.
+
+    The ORM's delete() sends post_delete per row, which would revert each
+    transaction's impact a second time after the caller reverted them in
+    bulk. The caller is responsible for balances, rollups, category
+    counters and snapshots; the SQLite search triggers still run.
+
+    Returns:
+        int: Number of rows deleted
+    """
+    table = connections[using].ops.quote_name(Transaction._meta.db_table)
+    deleted = 0
+    with connections[using].cursor() as cursor:
+        for start in range(0, len(ids), DELETE_BATCH_SIZE):
+            batch = ids[start:start + DELETE_BATCH_SIZE]
+            placeholders = ', '.join(['%s'] * len(batch))
+            cursor.execute(f'DELETE FROM {table} WHERE id IN ({placeholders})', batch)
+            deleted += cursor.rowcount
+    return deleted
+
+
+def _group_transactions(ids):
+    """
+    Group transactions by rollup key with their total, count and earliest date.
+    One grouped aggregate carries everything needed to revert or move their impact.
+    """
+    return list(Transaction.objects.filter(
+        pk__in=ids
+    ).annotate(
+        year=ExtractYear('transaction_date'),
+        month=ExtractMonth('transaction_date')
+    ).values(
+        *ROLLUP_KEY_FIELDS
+    ).annotate(
+        total=Sum('amount'),
+        transaction_count=Count('id'),
+        first_date=Min('transaction_date'),
+    ).order_by())
+
+
+def _apply_group_changes(groups, changes=None):
+    """
+    Apply the impact of deleting (changes None) or updating grouped transactions.
+
+    Every group's impact is reverted and, on update, applied again with the
+    changed account, category and type. Balance, rollup and category deltas
+    are summed first, so each affected row is updated once.
+
+    Args:
+        groups: Rows returned by _group_transactions
+        changes: Mapping of changed rollup key field -> new value
+    """
+    balance_deltas = {}
+    rollup_deltas = {}
+    invalidations = {}
+    moves_balance = changes is None or bool({'account_id', 'transaction_type'} & set(changes))
+
+    for row in groups:
+        states = [(row, -1)]
+        if changes is not None:
+            states.append((dict(row, **changes), 1))
+
+        for state, sign in states:
+            account_id = state['account_id']
+            balance_deltas[account_id] = balance_deltas.get(account_id, Decimal('0.00')) + sign * signed_amount(
+                state['transaction_type'], state['total']
+            )
+            key = tuple(state[field] for field in ROLLUP_KEY_FIELDS)
+            amount, count = rollup_deltas.get(key, (Decimal('0.00'), 0))
+            rollup_deltas[key] = (amount + sign * state['total'], count + sign * state['transaction_count'])
+
+            if moves_balance and (account_id not in invalidations or state['first_date'] < invalidations[account_id]):
+                invalidations[account_id] = state['first_date']
+
+    apply_balance_deltas(balance_deltas)
+    apply_rollup_deltas(rollup_deltas)
+    apply_category_deltas(get_category_deltas(rollup_deltas))
+    invalidate_snapshots(invalidations)
+    bump_user_data_version_on_commit(*{row['user_id'] for row in groups})
+
+
+def bulk_delete_transactions(queryset):
+    """
+    Delete the transactions of a queryset with set-based DELETE statements.
+
+    The rows are locked and grouped first; their impact on balances,
+    rollups and category counters is reverted with one update per affected
+    row, inside the same atomic block. The post_delete signals are skipped.
+
+    Args:
+        queryset: Transaction queryset (already restricted to the user's rows)
+
+    Returns:
+        int: Number of transactions deleted
+    """
+    with transaction.atomic():
+        ids = _lock_transaction_ids(queryset)
+        if not ids:
+            return 0
+
+        groups = _group_transactions(ids)
+        deleted = delete_transaction_rows(ids, queryset.db)
+        _apply_group_changes(groups)
+
+    return deleted
+
+
+def bulk_update_transactions(queryset, account=None, category=None):
+    """
+    Move the transactions of a queryset to another account and/or category
+    with one UPDATE statement.
+
+    Categories are typed, so moving to a category also sets the transaction
+    type to the category's type (this is how the type of many transactions
+    is changed). Balances, rollups and category counters are updated like
+    in bulk_delete_transactions. The save signals are skipped.
+
+    Args:
+        queryset: Transaction queryset (already restricted to the user's rows)
+        account: Validated destination account, or None to keep each account
+        category: Validated destination category, or None to keep each category
+
+    Returns:
+        int: Number of transactions updated
+    """
+    changes = {}
+    if account is not None:
+        changes['account_id'] = account.pk
+    if category is not None:
+        changes['category_id'] = category.pk
+        changes['transaction_type'] = category.category_type
+    if not changes:
+        return 0
+
+    with transaction.atomic():
+        ids = _lock_transaction_ids(queryset)
+        if not ids:
+            return 0
+
+        groups = _group_transactions(ids)
+        updated = Transaction.objects.filter(pk__in=ids).update(updated_at=timezone.now(), **changes)
+        _apply_group_changes(groups, changes)
+
+    return updated
+
+
+def get_user_id_shards(shard_count):
+    """
+    Split the user IDs owning accounts into contiguous, roughly equal ranges.
+
+    Returns:
+        list: (first_user_id, last_user_id) tuples, inclusive
+    """
+    bounds = Account.objects.aggregate(first=Min('user_id'), last=Max('user_id'))
+    if bounds['first'] is None:
+        return []
+
+    span = bounds['last'] - bounds['first'] + 1
+    size = -(-span // max(shard_count, 1))
+    return [
+        (start, min(start + size - 1, bounds['last']))
+        for start in range(bounds['first'], bounds['last'] + 1, size)
+    ]
+
+
+def _archived_aggregate(link, aggregate, **filters):
+    """
+    Correlated subquery computing an aggregate over the archived transactions
+    whose link field points to the outer row (None when there are none).
+    """
+    return Subquery(
+        ArchivedTransaction.objects.filter(
+            **{link: OuterRef('pk')}, **filters
+        ).values(link).annotate(value=aggregate).values('value')
+    )
+
+
+def find_balance_mismatches(first_user_id, last_user_id):
+    """
+    Recompute the balance of every account of a user-ID range from its transactions.
+
+    The expected balance, initial_balance + sum(income) - sum(expense), comes
+    from one grouped aggregate over the range (archived transactions included)
+    and is compared in cents with the stored current_balance, read by the
+    same query.
+
+    Args:
+        first_user_id: First user ID of the range (inclusive)
+        last_user_id: Last user ID of the range (inclusive)
+
+    Returns:
+        tuple: (checked_count, mismatches) where mismatches is a list of
+               (account_id, user_id, stored, expected) tuples
+    """
+    zero = Value(Decimal('0.00'), output_field=DecimalField(max_digits=14, decimal_places=2))
+    accounts = Account.objects.filter(
+        user_id__gte=first_user_id,
+        user_id__lte=last_user_id,
+    ).values_list(
+        'pk', 'user_id', 'current_balance', 'initial_balance'
+    ).annotate(
+        income=Coalesce(Sum('transactions__amount', filter=Q(transactions__transaction_type=Transaction.INCOME)), zero),
+        expense=Coalesce(Sum('transactions__amount', filter=Q(transactions__transaction_type=Transaction.EXPENSE)), zero),
+        archived_income=Coalesce(
+            _archived_aggregate('account', Sum('amount'), transaction_type=Transaction.INCOME), zero
+        ),
+        archived_expense=Coalesce(
+            _archived_aggregate('account', Sum('amount'), transaction_type=Transaction.EXPENSE), zero
+        ),
+    ).order_by()
+
+    checked_count = 0
+    mismatches = []
+    for account_id, user_id, stored, initial, income, expense, archived_income, archived_expense in accounts:
+        checked_count += 1
+        # SQLite returns unquantized sums, so balances are compared in cents
+        expected = (initial + income - expense + archived_income - archived_expense).quantize(CENT)
+        if expected != stored.quantize(CENT):
+            mismatches.append((account_id, user_id, stored, expected))
+
+    return checked_count, mismatches
+
+
+def fix_balance_mismatches(mismatches):
+    """
+    Correct the balances reported by find_balance_mismatches.
+
+    The drift is applied as a delta through apply_balance_deltas rather than
+    overwriting current_balance, so transactions written since the check
+    are not lost.
+
+    Returns:
+        int: Number of account rows updated
+    """
+    with transaction.atomic():
+        updated = apply_balance_deltas({
+            account_id: expected - stored
+            for account_id, _, stored, expected in mismatches
+        })
+        bump_user_data_version_on_commit(*{user_id for _, user_id, _, _ in mismatches})
+
+    return updated
+
+
+def find_category_counter_mismatches(user_ids=None):
+    """
+    Recompute the usage counters of categories from their transactions.
+
+    The expected values come from one grouped aggregate over the categories
+    (optionally restricted to some users, archived transactions included) and
+    are compared with the stored counters read by the same query.
+
+    Args:
+        user_ids: Optional iterable of user IDs (default: every user)
+
+    Returns:
+        list: (category_id, user_id, stored, expected) tuples where stored and
+              expected are (transaction_total, transaction_count) tuples
+    """
+    categories = Category.objects.all()
+    if user_ids is not None:
+        categories = categories.filter(user_id__in=list(user_ids))
+
+    zero = Value(Decimal('0.00'), output_field=DecimalField(max_digits=14, decimal_places=2))
+    categories = categories.values_list(
+        'pk', 'user_id', 'transaction_total', 'transaction_count'
+    ).annotate(
+        expected_total=Coalesce(Sum('transactions__amount'), zero),
+        expected_count=Count('transactions'),
+        archived_total=Coalesce(_archived_aggregate('category', Sum('amount')), zero),
+        archived_count=Coalesce(_archived_aggregate('category', Count('id')), 0),
+    ).order_by('pk')
+
+    mismatches = []
+    for (
+        category_id, user_id, stored_total, stored_count,
+        expected_total, expected_count, archived_total, archived_count,
+    ) in categories:
+        # SQLite returns unquantized sums, so totals are compared in cents
+        stored = (stored_total.quantize(CENT), stored_count)
+        expected = ((expected_total + archived_total).quantize(CENT), expected_count + archived_count)
+        if stored != expected:
+            mismatches.append((category_id, user_id, stored, expected))
+
+    return mismatches
+
+
+def fix_category_counter_mismatches(mismatches):
+    """
+    Correct the counters reported by find_category_counter_mismatches.
+
+    Like fix_balance_mismatches, the drift is applied as a delta so
+    transactions written since the check are not lost.
+
+    Returns:
+        int: Number of category rows updated
+    """
+    with transaction.atomic():
+        updated = apply_category_deltas({
+            category_id: (expected[0] - stored[0], expected[1] - stored[1])
+            for category_id, _, stored, expected in mismatches
+        })
+        bump_user_data_version_on_commit(*{user_id for _, user_id, _, _ in mismatches})
+
+    return updated
+
+
+def _lookup_owned(objects_by_pk, value):
+    """
+    Return the prefetched object for a primary key value, or None.
+    Accepts model instances, integers and numeric strings.
+    """
+    if isinstance(value, (Account, Category)):
+        value = value.pk
+
+    try:
+        return objects_by_pk.get(int(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def build_transaction(user, row, accounts, categories):
+    """
+    Validate a raw row and build an unsaved Transaction for the user.
+
+    Applies the model field rules (lengths, digits, dates, choices) and the
+    same ownership, type and amount rules as TransactionForm, using the
+    prefetched accounts and categories instead of one query per row.
+
+    Args:
+        user: The User the transaction belongs to
+        row: Mapping with description, amount, transaction_date,
+             transaction_type, category and account (ids or instances)
+        accounts: Mapping of account pk -> Account for the user
+        categories: Mapping of category pk -> Category for the user
+
+    Returns:
+        Transaction: Unsaved transaction instance
+
+    Raises:
+        ValidationError: If any field of the row is invalid
+    """
+    values = {
+        'description': (row.get('description') or '').strip(),
+        'amount': row.get('amount'),
+        'transaction_date': row.get('transaction_date'),
+        'transaction_type': row.get('transaction_type'),
+    }
+    for name, value in values.items():
+        values[name] = Transaction._meta.get_field(name).clean(value, None)
+
+    validate_amount(values['amount'])
+
+    account = _lookup_owned(accounts, row.get('account'))
+    if account is None:
+        raise ValidationError('Selecione uma conta válida')
+    validate_account(account, user)
+
+    category = _lookup_owned(categories, row.get('category'))
+    if category is None:
+        raise ValidationError('Selecione uma categoria válida')
+    validate_category(category, user, values['transaction_type'])
+
+    return Transaction(user=user, account=account, category=category, **values)
+
+
+def bulk_create_transactions(user, rows, batch_size=INGESTION_BATCH_SIZE):
+    """
+    Validate and insert a stream of transaction rows for a user.
+
+    The user's accounts and categories are prefetched once. Rows are then
+    consumed in batches: each batch is validated in memory, inserted with
+    bulk_create and applied to the balances with one delta per account.
+    Invalid rows are skipped, counted and the first MAX_ERROR_SAMPLE reported.
+
+    Args:
+        user: The User the transactions belong to
+        rows: Iterable of row mappings (see build_transaction)
+        batch_size: Number of rows per atomic batch
+
+    Returns:
+        tuple: (created_count, errors) - errors is an ImportErrors of (row_number, message)
+    """
+    accounts = {account.pk: account for account in Account.objects.filter(user=user)}
+    categories = {category.pk: category for category in Category.objects.filter(user=user)}
+
+    created_count = 0
+    errors = ImportErrors()
+    numbered_rows = enumerate(rows, start=1)
+
+    while True:
+        batch = list(islice(numbered_rows, batch_size))
+        if not batch:
+            break
+
+        transactions = []
+        for row_number, row in batch:
+            try:
+                transactions.append(build_transaction(user, row, accounts, categories))
+            except ValidationError as error:
+                errors.append((row_number, ' '.join(error.messages)))
+
+        created_count += bulk_insert_transactions(transactions)
+
+    return created_count, errors
@@ -1,65 +1,52 @@
 """
 Signals for the transactions app.
 
-Automatically updates Account balance when transactions are created, updated, or deleted.
+Automatically updates Account balance and the monthly rollups when transactions
+are created, updated, or deleted. Changes are applied by transactions.services
+as set-based UPDATE statements. Also keeps the SQLite description search
+triggers in place after migrations.
 """
 
-from decimal import Decimal
-from django.db import transaction
-from django.db.models.signals import post_save, post_delete, pre_save
+from django.db import connections
+from django.db.models.signals import post_migrate, post_save, post_delete, pre_save
 from django.dispatch import receiver
 
 from .models import Transaction
+from .search import repair_search_index
+from .services import apply_transaction_change
 
 
 @receiver(pre_save, sender=Transaction)
-def revert_old_transaction_balance(sender, instance, **kwargs):
+def remember_old_transaction_state(sender, instance, **kwargs):
     """
-    Revert the balance impact of the old transaction before saving changes.
+    Make sure the persisted state is known before saving changes.
 
-    This runs before saving an edited transaction to remove the old value's
-    impact from the account balance. The new value will be applied by post_save.
+    Instances loaded from the database already carry their persisted state
+    (see Transaction.from_db), so this only queries the row for instances
+    built by hand with an existing primary key or with deferred fields.
 
     Args:
         sender: The model class (Transaction)
         instance: The Transaction instance being saved
         **kwargs: Additional keyword arguments
     """
-    # Only process if this is an update (instance already exists in database)
-    if instance.pk:
-        try:
-            # Get the old transaction data from database
-            old_transaction = Transaction.objects.get(pk=instance.pk)
-            old_account = old_transaction.account
-            old_amount = old_transaction.amount
-            old_type = old_transaction.transaction_type
-
-            # Revert the old transaction's impact on the old account
-            with transaction.atomic():
-                # Lock the account row for update to prevent race conditions
-                old_account = old_account.__class__.objects.select_for_update().get(pk=old_account.pk)
-
-                if old_type == Transaction.INCOME:
-                    # If it was income, subtract it from balance
-                    old_account.current_balance -= old_amount
-                else:  # EXPENSE
-                    # If it was expense, add it back to balance
-                    old_account.current_balance += old_amount
-
-                old_account.save(update_fields=['current_balance', 'updated_at'])
-
-        except Transaction.DoesNotExist:
-            # This shouldn't happen, but handle gracefully
-            pass
+    if not instance.pk:
+        instance._persisted_state = None
+        return
+
+    if getattr(instance, '_persisted_state', None) is None:
+        instance._persisted_state = Transaction.objects.filter(
+            pk=instance.pk
+        ).values(*Transaction.TRACKED_FIELDS).first()
 
 
 @receiver(post_save, sender=Transaction)
 def update_account_balance_on_save(sender, instance, created, **kwargs):
     """
-    Update account balance when a transaction is created or updated.
+    Update account balance and monthly rollups when a transaction is created or updated.
 
-    For income transactions: increases the account balance
-    For expense transactions: decreases the account balance
+    Reverts the old impact and applies the new one as a single net delta,
+    covering amount, type and account changes in one UPDATE statement.
 
     Args:
         sender: The model class (Transaction)
@@ -67,27 +54,19 @@ def update_account_balance_on_save(sender, instance, created, **kwargs):
         created: Boolean indicating if this is a new Transaction
         **kwargs: Additional keyword arguments
     """
-    # Use atomic transaction to ensure data integrity
-    with transaction.atomic():
-        # Lock the account row for update to prevent race conditions
-        account = instance.account.__class__.objects.select_for_update().get(pk=instance.account.pk)
+    old_state = None if created else getattr(instance, '_persisted_state', None)
+    new_state = instance.get_tracked_state()
 
-        # Calculate impact on balance based on transaction type
-        if instance.transaction_type == Transaction.INCOME:
-            # Income increases the balance
-            account.current_balance += instance.amount
-        else:  # EXPENSE
-            # Expense decreases the balance
-            account.current_balance -= instance.amount
+    apply_transaction_change(old_state, new_state)
 
-        # Save the updated balance
-        account.save(update_fields=['current_balance', 'updated_at'])
+    # The saved values are now the persisted ones
+    instance._persisted_state = new_state
 
 
 @receiver(post_delete, sender=Transaction)
 def revert_account_balance_on_delete(sender, instance, **kwargs):
     """
-    Revert account balance when a transaction is deleted.
+    Revert account balance and monthly rollups when a transaction is deleted.
 
     Removes the transaction's impact from the account balance:
     - For income: decreases the account balance
@@ -98,18 +77,20 @@ def revert_account_balance_on_delete(sender, instance, **kwargs):
         instance: The Transaction instance being deleted
         **kwargs: Additional keyword arguments
     """
-    # Use atomic transaction to ensure data integrity
-    with transaction.atomic():
-        # Lock the account row for update to prevent race conditions
-        account = instance.account.__class__.objects.select_for_update().get(pk=instance.account.pk)
-
-        # Revert the transaction's impact on balance
-        if instance.transaction_type == Transaction.INCOME:
-            # If it was income, subtract it from balance
-            account.current_balance -= instance.amount
-        else:  # EXPENSE
-            # If it was expense, add it back to balance
-            account.current_balance += instance.amount
-
-        # Save the updated balance
-        account.save(update_fields=['current_balance', 'updated_at'])
+    old_state = getattr(instance, '_persisted_state', None) or instance.get_tracked_state()
+
+    apply_transaction_change(old_state, None)
+
+
+@receiver(post_migrate)
+def repair_description_search_index(sender, using, **kwargs):
+    """
+    Recreate the description search triggers dropped by a table rebuild.
+
+    Args:
+        sender: The app config that was migrated
+        using: Alias of the migrated database
+        **kwargs: Additional keyword arguments
+    """
+    if sender.name == 'transactions':
+        repair_search_index(connections[using])
@@ -0,0 +1,197 @@
+"""
+Daily balance snapshots for the transactions app.
+
+DailyBalanceSnapshot stores, per account and day, the net change of the
+balance since the account was opened. The transaction write path only
+invalidates: a write dated D deletes the account's snapshots from D
+forward, so every remaining snapshot is exact. Reads extend the series
+from the last remaining snapshot with one grouped aggregate and then
+answer any date range with a single range read.
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Case, DecimalField, F, OuterRef, Q, Subquery, Sum, When
+
+from accounts.models import Account
+
+from .archive import get_archive_cutoff
+from .models import ArchivedTransaction, DailyBalanceSnapshot, Transaction
+from .rollups import CENT
+
+
+# Maximum number of accounts invalidated by a single DELETE statement
+SNAPSHOT_INVALIDATION_BATCH_SIZE = 500
+
+# Fields of a transaction state that affect the balance series
+SNAPSHOT_FIELDS = ('account_id', 'transaction_date', 'transaction_type', 'amount')
+
+
+def get_snapshot_invalidations(old_state=None, new_state=None):
+    """
+    Return the earliest snapshot date invalidated by a transaction change, per account.
+
+    Args:
+        old_state: The persisted state before the change (None on create)
+        new_state: The state after the change (None on delete)
+
+    Returns:
+        dict: Mapping of account_id -> date
+    """
+    if old_state and new_state and all(old_state[field] == new_state[field] for field in SNAPSHOT_FIELDS):
+        return {}
+
+    invalidations = {}
+    for state in (old_state, new_state):
+        if state is None:
+            continue
+        account_id = state['account_id']
+        if account_id not in invalidations or state['transaction_date'] < invalidations[account_id]:
+            invalidations[account_id] = state['transaction_date']
+
+    return invalidations
+
+
+def get_transactions_snapshot_invalidations(transactions):
+    """
+    Return the earliest snapshot date invalidated by new transactions, per account.
+    """
+    invalidations = {}
+    for item in transactions:
+        if item.account_id not in invalidations or item.transaction_date < invalidations[item.account_id]:
+            invalidations[item.account_id] = item.transaction_date
+
+    return invalidations
+
+
+def invalidate_snapshots(invalidations):
+    """
+    Delete the snapshots of each account from the given date forward.
+
+    The account rows are locked first, so a concurrent extend_snapshots
+    either finishes before the delete or computes after this write commits.
+
+    Args:
+        invalidations: Mapping of account_id -> first invalid date
+    """
+    if not invalidations:
+        return
+
+    account_ids = sorted(invalidations)
+
+    for start in range(0, len(account_ids), SNAPSHOT_INVALIDATION_BATCH_SIZE):
+        batch = account_ids[start:start + SNAPSHOT_INVALIDATION_BATCH_SIZE]
+
+        list(Account.objects.select_for_update().filter(pk__in=batch).order_by('pk').values_list('pk'))
+
+        condition = Q()
+        for account_id in batch:
+            condition |= Q(account_id=account_id, date__gte=invalidations[account_id])
+        DailyBalanceSnapshot.objects.filter(condition).delete()
+
+
+def extend_snapshots(account, through):
+    """
+    Materialize the account's snapshots up to the through date.
+
+    Only the days after the last remaining snapshot are aggregated from the
+    raw transactions (and from the archived ones, for days before the
+    archive cutoff). A snapshot is always written for the through date, so
+    reading the same range again costs no aggregate at all.
+    """
+    snapshots = DailyBalanceSnapshot.objects.filter(account=account)
+    last = snapshots.order_by('-date').values_list('date', flat=True).first()
+    if last is not None and last >= through:
+        return
+
+    with transaction.atomic():
+        # Serialize with invalidate_snapshots on the account row
+        list(Account.objects.select_for_update().filter(pk=account.pk).values_list('pk'))
+
+        last = snapshots.order_by('-date').values_list('date', 'net_total').first()
+        if last is not None and last[0] >= through:
+            return
+
+        # Days before the archive cutoff may also have archived transactions
+        cutoff = get_archive_cutoff()
+        models = [Transaction]
+        if cutoff is not None and (last is None or last[0] < cutoff):
+            models.append(ArchivedTransaction)
+
+        daily = {}
+        for model in models:
+            rows = model.objects.filter(
+                account=account,
+                transaction_date__lte=through,
+            )
+            if last is not None:
+                rows = rows.filter(transaction_date__gt=last[0])
+
+            rows = rows.values(
+                'transaction_date'
+            ).annotate(
+                net=Sum(Case(
+                    When(transaction_type=Transaction.INCOME, then=F('amount')),
+                    default=-F('amount'),
+                    output_field=DecimalField(max_digits=14, decimal_places=2),
+                ))
+            ).order_by()
+
+            for row in rows:
+                daily[row['transaction_date']] = daily.get(row['transaction_date'], Decimal('0.00')) + row['net']
+
+        net_total = last[1] if last is not None else Decimal('0.00')
+        new_snapshots = []
+        for day in sorted(daily):
+            net_total = (net_total + daily[day]).quantize(CENT)
+            new_snapshots.append(DailyBalanceSnapshot(account=account, date=day, net_total=net_total))
+
+        if not new_snapshots or new_snapshots[-1].date != through:
+            new_snapshots.append(DailyBalanceSnapshot(account=account, date=through, net_total=net_total))
+
+        DailyBalanceSnapshot.objects.bulk_create(new_snapshots, ignore_conflicts=True)
+
+
+def get_balance_series(account, date_from, date_to):
+    """
+    Return the end-of-day balance of an account for every day of a period.
+
+    After extend_snapshots, the period is answered by one range read: the
+    snapshots inside the period plus the last one before it, which gives
+    the opening balance.
+
+    Returns:
+        list: (date, balance) tuples from date_from to date_to
+    """
+    extend_snapshots(account, date_to)
+
+    opening_date = Subquery(
+        DailyBalanceSnapshot.objects.filter(
+            account=OuterRef('account'),
+            date__lt=date_from,
+        ).order_by('-date').values('date')[:1]
+    )
+    rows = DailyBalanceSnapshot.objects.filter(
+        Q(date__gte=date_from) | Q(date=opening_date),
+        account=account,
+        date__lte=date_to,
+    ).order_by('date').values_list('date', 'net_total')
+
+    net_total = Decimal('0.00')
+    net_by_date = {}
+    for snapshot_date, value in rows:
+        if snapshot_date < date_from:
+            net_total = value
+        else:
+            net_by_date[snapshot_date] = value
+
+    series = []
+    # Counting days instead of stepping past date_to, which overflows at date.max
+    for offset in range((date_to - date_from).days + 1):
+        day = date_from + timedelta(days=offset)
+        net_total = net_by_date.get(day, net_total)
+        series.append((day, account.initial_balance + net_total))
+
+    return series
@@ -1,3 +1,1034 @@
+import csv
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from io import BytesIO, StringIO
+from tempfile import NamedTemporaryFile
+from unittest import mock, skipIf
+
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import IntegrityError, connection, transaction
 from django.test import TestCase
+from django.urls import reverse
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+from accounts.models import Account
+from categories.models import Category
+from users.models import CustomUser
+
+from .archive import archive_transactions, get_archive_cutoff, restore_transactions
+from . import importers
+from .forms import TransactionForm
+from .models import (
+    ArchivedTransaction,
+    DailyBalanceSnapshot,
+    MonthlyCategoryRollup,
+    RecurringTransaction,
+    Transaction,
+)
+from .pagination import BACKWARD, FORWARD, KeysetPaginator, decode_cursor, encode_cursor
+from .recurring import get_due_occurrences, materialize_due_transactions
+from .rollups import apply_rollup_deltas, find_rollup_mismatches, get_category_totals
+from .search import FTS_TABLE, search_transactions
+from .services import (
+    bulk_create_transactions,
+    bulk_delete_transactions,
+    bulk_update_transactions,
+    find_balance_mismatches,
+    find_category_counter_mismatches,
+)
+from .snapshots import extend_snapshots, get_balance_series, invalidate_snapshots
+
+
+class TransactionDataTestCase(TestCase):
+    """
+    Base class for tests working on one user's transactions.
+
+    Provides a user with an account (opened with initial_balance), the
+    default food and salary categories, and a transaction factory.
+    """
+
+    initial_balance = Decimal('0.00')
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(email=f'{cls.__name__.lower()}@example.com', password='password123')
+        cls.account = Account.objects.create(
+            user=cls.user,
+            name='Conta Corrente',
+            initial_balance=cls.initial_balance,
+            current_balance=cls.initial_balance,
+        )
+        cls.food = Category.objects.get(user=cls.user, name='Alimentação')
+        cls.salary = Category.objects.get(user=cls.user, name='Salário')
+
+    def create_transaction(self, **overrides):
+        """
+        Create an expense of the food category dated today, with the given fields overridden.
+        The transaction type follows the category unless it is overridden too.
+        """
+        values = {
+            'user': self.user,
+            'account': self.account,
+            'category': self.food,
+            'description': 'Mercado',
+            'amount': Decimal('10.00'),
+            'transaction_date': date.today(),
+        }
+        values.update(overrides)
+        values['amount'] = Decimal(values['amount'])
+        values.setdefault('transaction_type', values['category'].category_type)
+        return Transaction.objects.create(**values)
+
+    def create_foreign_transaction(self, email, **overrides):
+        """
+        Create a transaction of another user, with an account and category of their own.
+        """
+        other = CustomUser.objects.create_user(email=email, password='password123')
+        values = {
+            'user': other,
+            'account': Account.objects.create(user=other, name='Outra'),
+            'category': Category.objects.get(user=other, name='Alimentação'),
+        }
+        values.update(overrides)
+        return self.create_transaction(**values)
+
+    def assertTotalsConsistent(self):
+        """
+        Check the stored balances, category counters and rollups against the transactions.
+        """
+        self.assertEqual(find_balance_mismatches(self.user.pk, self.user.pk)[1], [])
+        self.assertEqual(find_category_counter_mismatches([self.user.pk]), [])
+        self.assertEqual(list(find_rollup_mismatches([self.user.pk])), [])
+
+
+class TransactionBalanceTests(TransactionDataTestCase):
+    """
+    Tests for the account balance updates of the transaction write path.
+    """
+
+    initial_balance = Decimal('100.00')
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.savings = Account.objects.create(
+            user=cls.user, name='Poupança', initial_balance=Decimal('50.00'), current_balance=Decimal('50.00')
+        )
+
+    def assertBalances(self, checking, savings):
+        self.account.refresh_from_db()
+        self.savings.refresh_from_db()
+        self.assertEqual(
+            (self.account.current_balance, self.savings.current_balance),
+            (Decimal(checking), Decimal(savings)),
+        )
+        self.assertEqual(find_balance_mismatches(self.user.pk, self.user.pk)[1], [])
+
+    def test_create_and_change_amount(self):
+        item = self.create_transaction(amount='30.00')
+        self.assertBalances('70.00', '50.00')
+
+        item.amount = Decimal('45.50')
+        item.save()
+        self.assertBalances('54.50', '50.00')
+
+    def test_type_flip(self):
+        item = self.create_transaction(amount='30.00')
+        item.transaction_type = Transaction.INCOME
+        item.category = self.salary
+        item.save()
+        self.assertBalances('130.00', '50.00')
+
+    def test_account_move_and_delete(self):
+        item = self.create_transaction(amount='30.00')
+        item.account = self.savings
+        item.amount = Decimal('10.00')
+        item.save()
+        self.assertBalances('100.00', '40.00')
+
+        item.delete()
+        self.assertBalances('100.00', '50.00')
+
+    def test_instance_built_by_hand_and_partial_refresh(self):
+        item = self.create_transaction(amount='30.00')
+
+        # Unsaved edits of other tracked fields are not taken as persisted
+        item.amount = Decimal('80.00')
+        item.refresh_from_db(fields=['description'])
+        item.save()
+        self.assertBalances('20.00', '50.00')
+
+        # An instance built with an existing primary key reads the persisted row
+        copy = Transaction(
+            pk=item.pk,
+            user=self.user,
+            account=self.account,
+            category=self.food,
+            description='Mercado',
+            amount=Decimal('5.00'),
+            transaction_type=Transaction.EXPENSE,
+            transaction_date=item.transaction_date,
+            created_at=item.created_at,
+        )
+        copy.save()
+        self.assertBalances('95.00', '50.00')
+
+
+class TransactionFormChoicesTests(TransactionDataTestCase):
+    """
+    Tests for the per-request account and category choices of the transaction forms.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        Account.objects.create(user=cls.user, name='Conta Inativa', is_active=False)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def get_data(self, **overrides):
+        data = {
+            'description': 'Mercado',
+            'amount': '25.00',
+            'transaction_date': date.today().isoformat(),
+            'transaction_type': Transaction.EXPENSE,
+            'category': self.food.pk,
+            'account': self.account.pk,
+        }
+        data.update(overrides)
+        return data
+
+    def test_create_page_renders_category_types(self):
+        response = self.client.get(reverse('transactions:create'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, f'value="{self.food.pk}"\n                            data-type="expense"')
+        self.assertNotContains(response, 'Conta Inativa')
+
+    def test_form_validates_without_queries(self):
+        form = TransactionForm(data=self.get_data(), user=self.user)
+        # Loads the accounts and categories
+        form.fields['account'].choices
+        form.fields['category'].choices
+
+        with self.assertNumQueries(0):
+            self.assertTrue(form.is_valid())
+        self.assertEqual(form.cleaned_data['category'], self.food)
+        self.assertEqual(form.cleaned_data['amount'], Decimal('25.00'))
+
+    def test_form_rejects_choices_of_other_users(self):
+        other = CustomUser.objects.create_user(email='other@example.com', password='password123')
+        other_account = Account.objects.create(user=other, name='Outra')
+        inactive = Account.objects.get(user=self.user, name='Conta Inativa')
+
+        for account in (other_account, inactive):
+            form = TransactionForm(data=self.get_data(account=account.pk), user=self.user)
+            self.assertFalse(form.is_valid())
+            self.assertIn('account', form.errors)
+
+
+class TransactionSearchTests(TransactionDataTestCase):
+    """
+    Tests for the indexed description search.
+    """
+
+    def search(self, query):
+        return set(search_transactions(Transaction.objects.filter(user=self.user), query))
+
+    def test_matches_word_prefixes_ignoring_case_and_accents(self):
+        market = self.create_transaction(description='Compras no Mercado São Jorge')
+        pharmacy = self.create_transaction(description='Farmácia')
+
+        self.assertEqual(self.search('merc'), {market})
+        self.assertEqual(self.search('farmacia'), {pharmacy})
+        self.assertEqual(self.search('compras sao'), {market})
+        self.assertEqual(self.search('compras farmacia'), set())
+        self.assertEqual(self.search('"*'), {market, pharmacy})
+
+    def test_index_follows_updates_and_deletes(self):
+        item = self.create_transaction(description='Padaria')
+        item.description = 'Restaurante'
+        item.save()
+
+        self.assertEqual(self.search('padaria'), set())
+        self.assertEqual(self.search('restaurante'), {item})
+
+        item.delete()
+        self.assertEqual(self.search('restaurante'), set())
+
+    def test_list_view_combines_search_with_filters(self):
+        self.client.force_login(self.user)
+        self.create_transaction(description='Mercado')
+        self.create_transaction(description='Mercado Livre')
+        self.create_foreign_transaction('other-search@example.com')
+
+        response = self.client.get(reverse('transactions:list'), {'q': 'mercado livre', 'account': self.account.pk})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item.description for item in response.context['transactions']], ['Mercado Livre'])
+
+    def get_statistics(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT count(*) FROM sqlite_master WHERE name = 'sqlite_stat1'")
+            if not cursor.fetchone()[0]:
+                return 0
+            cursor.execute("SELECT count(*) FROM sqlite_stat1 WHERE tbl = 'transactions_transaction'")
+            return cursor.fetchone()[0]
+
+    def test_statistics_are_refreshed_by_the_command_only(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('SQLite statistics')
+        self.create_transaction(description='Mercado')
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE %s", [f'{FTS_TABLE}_%'])
+            self.assertEqual(len(cursor.fetchall()), 3)
+            if self.get_statistics():
+                cursor.execute("DELETE FROM sqlite_stat1 WHERE tbl = 'transactions_transaction'")
+
+        self.assertEqual(len(self.search('mercado')), 1)
+        self.assertEqual(self.get_statistics(), 0)
+
+        call_command('analyze_transactions', stdout=StringIO())
+        self.assertGreater(self.get_statistics(), 0)
+
+
+class TransactionArchiveTests(TransactionDataTestCase):
+    """
+    Tests for the archive tier and its read-through from the transaction list.
+    """
+
+    initial_balance = Decimal('100.00')
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.cutoff = get_archive_cutoff()
+
+    def test_archive_moves_old_rows_and_keeps_totals_exact(self):
+        old = self.create_transaction(
+            description='Mercado antigo', transaction_date=self.cutoff.replace(year=self.cutoff.year - 1)
+        )
+        recent = self.create_transaction(description='Mercado recente', transaction_date=date.today())
+
+        self.assertEqual(archive_transactions(self.cutoff), 1)
+        self.assertFalse(Transaction.objects.filter(pk=old.pk).exists())
+        self.assertTrue(ArchivedTransaction.objects.filter(pk=old.pk).exists())
+
+        self.assertTotalsConsistent()
+
+        self.assertEqual(restore_transactions(None), 1)
+        self.assertEqual(set(Transaction.objects.filter(user=self.user)), {old, recent})
+
+    def test_list_reads_through_to_the_archive_for_old_dates(self):
+        self.client.force_login(self.user)
+        old_date = self.cutoff.replace(year=self.cutoff.year - 1)
+        old = self.create_transaction(description='Mercado antigo', transaction_date=old_date)
+        recent = self.create_transaction(description='Mercado recente', transaction_date=date.today())
+        archive_transactions(self.cutoff)
+
+        response = self.client.get(reverse('transactions:list'))
+        self.assertEqual([item.pk for item in response.context['transactions']], [recent.pk])
+
+        for mode in ('keyset', 'offset'):
+            with self.subTest(mode=mode):
+                params = {'date_from': old_date.isoformat(), 'q': 'mercado'}
+                if mode == 'offset':
+                    params['page'] = 1
+                response = self.client.get(reverse('transactions:list'), params)
+                items = list(response.context['transactions'])
+
+                self.assertEqual([item.pk for item in items], [recent.pk, old.pk])
+                self.assertTrue(items[1].is_archived)
+                self.assertEqual(response.context['total_expense'], Decimal('20.00'))
+                self.assertContains(response, 'Arquivada')
+
+
+class TransactionBulkActionTests(TransactionDataTestCase):
+    """
+    Tests for the bulk delete and move actions.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.savings = Account.objects.create(user=cls.user, name='Poupança')
+
+    def setUp(self):
+        self.items = [
+            self.create_transaction(description=f'Mercado {index}', transaction_date=date(2026, month, 5))
+            for index, month in enumerate((1, 1, 2))
+        ]
+
+    def test_move_to_account_and_category_of_other_type(self):
+        queryset = Transaction.objects.filter(pk__in=[item.pk for item in self.items[:2]])
+
+        self.assertEqual(bulk_update_transactions(queryset, account=self.savings, category=self.salary), 2)
+
+        self.account.refresh_from_db()
+        self.savings.refresh_from_db()
+        self.assertEqual(self.account.current_balance, Decimal('-10.00'))
+        self.assertEqual(self.savings.current_balance, Decimal('20.00'))
+        self.assertEqual(set(queryset.values_list('transaction_type', flat=True)), {Transaction.INCOME})
+        self.assertTotalsConsistent()
+
+    def test_list_delete_action_only_accepts_own_transactions(self):
+        self.client.force_login(self.user)
+        foreign = self.create_foreign_transaction('other-bulk@example.com', transaction_date=date(2026, 1, 5))
+        url = reverse('transactions:bulk_action')
+
+        self.client.post(url, {'action': 'delete', 'transactions': [self.items[0].pk, foreign.pk]})
+        self.assertEqual(Transaction.objects.count(), 4)
+
+        response = self.client.post(url, {'action': 'delete', 'transactions': [item.pk for item in self.items]})
+        self.assertRedirects(response, reverse('transactions:list'))
+        self.assertFalse(Transaction.objects.filter(user=self.user).exists())
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.current_balance, Decimal('0.00'))
+        self.assertTotalsConsistent()
+
+    def test_delete_in_several_statements_reverts_each_row_once(self):
+        queryset = Transaction.objects.filter(pk__in=[item.pk for item in self.items[1:]])
+
+        with mock.patch('transactions.services.DELETE_BATCH_SIZE', 1):
+            self.assertEqual(bulk_delete_transactions(queryset), 2)
+
+        self.assertEqual(list(Transaction.objects.filter(user=self.user)), self.items[:1])
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.current_balance, Decimal('-10.00'))
+        self.assertTotalsConsistent()
+
+
+class RecurringTransactionTests(TransactionDataTestCase):
+    """
+    Tests for recurring transactions and their materialization.
+    """
+
+    def test_monthly_rule_keeps_the_day_of_the_start_date(self):
+        rule = RecurringTransaction(frequency=RecurringTransaction.MONTHLY, interval=1, start_date=date(2026, 1, 31))
+
+        self.assertEqual(rule.get_next_date(date(2026, 1, 31)), date(2026, 2, 28))
+        self.assertEqual(rule.get_next_date(date(2026, 2, 28)), date(2026, 3, 31))
+
+    def test_zero_interval_is_rejected(self):
+        rule = RecurringTransaction(
+            user=self.user,
+            account=self.account,
+            category=self.salary,
+            description='Salário',
+            amount=Decimal('1000.00'),
+            transaction_type=Transaction.INCOME,
+            interval=0,
+            start_date=date(2026, 1, 5),
+            next_run=date(2026, 1, 5),
+        )
+
+        with self.assertRaises(ValidationError):
+            rule.full_clean()
+        with self.assertRaises(ValueError):
+            get_due_occurrences(rule, date(2026, 4, 10))
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            rule.save()
+
+    def test_materialization_is_idempotent(self):
+        rule = RecurringTransaction.objects.create(
+            user=self.user,
+            account=self.account,
+            category=self.salary,
+            description='Salário',
+            amount=Decimal('1000.00'),
+            transaction_type=Transaction.INCOME,
+            start_date=date(2026, 1, 5),
+            end_date=date(2026, 3, 31),
+            next_run=date(2026, 1, 5),
+        )
+
+        self.assertEqual(materialize_due_transactions(date(2026, 4, 10)), (1, 3))
+        self.assertEqual(materialize_due_transactions(date(2026, 4, 10)), (0, 0))
+
+        rule.refresh_from_db()
+        self.account.refresh_from_db()
+        self.assertFalse(rule.is_active)
+        self.assertEqual(
+            list(Transaction.objects.filter(user=self.user).order_by('transaction_date').values_list(
+                'transaction_date', flat=True
+            )),
+            [date(2026, 1, 5), date(2026, 2, 5), date(2026, 3, 5)],
+        )
+        self.assertEqual(self.account.current_balance, Decimal('3000.00'))
+        self.assertEqual(find_balance_mismatches(self.user.pk, self.user.pk)[1], [])
+        self.assertEqual(list(find_rollup_mismatches([self.user.pk])), [])
+
+    def test_create_view_repeats_the_transaction(self):
+        self.client.force_login(self.user)
+
+        self.client.post(reverse('transactions:create'), {
+            'description': 'Aluguel recebido',
+            'amount': '500.00',
+            'transaction_date': '2026-01-10',
+            'transaction_type': Transaction.INCOME,
+            'category': self.salary.pk,
+            'account': self.account.pk,
+            'repeat': RecurringTransaction.MONTHLY,
+        })
+
+        rule = RecurringTransaction.objects.get(user=self.user)
+        self.assertEqual(rule.next_run, date(2026, 2, 10))
+        self.assertEqual(rule.amount, Decimal('500.00'))
+
+
+class DetachedPartitionGuardTests(TestCase):
+    """
+    Tests that the maintenance commands refuse to recompute totals while a year is detached.
+    """
+
+    COMMANDS = [
+        ('rebuild_monthly_rollups', []),
+        ('check_monthly_rollups', ['--fix']),
+        ('repair_category_counters', []),
+        ('reconcile_balances', ['--fix']),
+    ]
+
+    def test_commands_refuse_to_run_with_detached_years(self):
+        with mock.patch('transactions.partitions.get_year_partitions', return_value=([2025], [2020])):
+            for name, args in self.COMMANDS:
+                with self.subTest(command=name), self.assertRaisesMessage(CommandError, '2020'):
+                    call_command(name, *args, stdout=StringIO())
+
+    def test_commands_run_without_detached_years(self):
+        for name, args in self.COMMANDS:
+            with self.subTest(command=name):
+                call_command(name, *args, stdout=StringIO())
+
+
+class StatementImportTests(TransactionDataTestCase):
+    """
+    Tests for the CSV and OFX statement importers.
+    """
+
+    def import_statement(self, contents, statement_format=importers.CSV, **kwargs):
+        return importers.import_statement(
+            self.user,
+            StringIO(contents),
+            self.account,
+            statement_format=statement_format,
+            default_categories={Transaction.INCOME: self.salary, Transaction.EXPENSE: self.food},
+            **kwargs
+        )
+
+    def test_csv_parsing_in_batches_and_dedupe(self):
+        contents = (
+            'Data;Descrição;Valor;Categoria\n'
+            '05/03/2026;Mercado   Central;-1.234,56;alimentação\n'
+            '06/03/2026;Salário;R$ 5.000,00;\n'
+            '07/03/2026;Padaria;-12,50;\n'
+        )
+
+        created, duplicates, errors = self.import_statement(contents, batch_size=2)
+
+        self.assertEqual((created, duplicates, len(errors)), (3, 0, 0))
+        market = Transaction.objects.get(description='Mercado Central')
+        self.assertEqual(
+            (market.transaction_date, market.amount, market.transaction_type, market.category),
+            (date(2026, 3, 5), Decimal('1234.56'), Transaction.EXPENSE, self.food),
+        )
+        self.assertEqual(Transaction.objects.get(description='Salário').transaction_type, Transaction.INCOME)
+        self.assertEqual(find_balance_mismatches(self.user.pk, self.user.pk)[1], [])
+
+        # Importing an overlapping statement again only adds the new rows
+        created, duplicates, errors = self.import_statement(contents + '08/03/2026;Farmácia;-20,00;\n', batch_size=2)
+        self.assertEqual((created, duplicates), (1, 3))
+
+    def test_reimport_finds_duplicates_in_the_archive(self):
+        old_date = get_archive_cutoff().replace(year=2000)
+        contents = (
+            'Data;Descrição;Valor\n'
+            f'{old_date:%d/%m/%Y};Aluguel;-800,00\n'
+            f'{date.today():%d/%m/%Y};Padaria;-12,50\n'
+        )
+        self.assertEqual(self.import_statement(contents)[:2], (2, 0))
+        self.assertEqual(archive_transactions(get_archive_cutoff()), 1)
+
+        self.assertEqual(self.import_statement(contents)[:2], (0, 2))
+        self.assertEqual(ArchivedTransaction.objects.filter(user=self.user).count(), 1)
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), 1)
+
+    def test_ofx_without_line_breaks_read_in_small_chunks(self):
+        contents = (
+            'OFXHEADER:100<OFX><BANKTRANLIST>'
+            '<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20260310120000[-3:BRT]<TRNAMT>-45.90<MEMO>Farmácia</STMTTRN>'
+            '<STMTTRN><TRNTYPE>CREDIT<DTPOSTED>20260311<TRNAMT>100.00<NAME>Reembolso<MEMO>x</STMTTRN>'
+            '</BANKTRANLIST></OFX>'
+        )
+
+        with mock.patch.object(importers, 'OFX_READ_CHUNK_SIZE', 7):
+            created, duplicates, errors = self.import_statement(contents, statement_format=importers.OFX)
+
+        self.assertEqual((created, duplicates, len(errors)), (2, 0, 0))
+        self.assertEqual(
+            set(Transaction.objects.values_list('description', 'amount', 'transaction_type', 'transaction_date')),
+            {
+                ('Farmácia', Decimal('45.90'), Transaction.EXPENSE, date(2026, 3, 10)),
+                ('Reembolso', Decimal('100.00'), Transaction.INCOME, date(2026, 3, 11)),
+            },
+        )
+
+    def test_ofx_buffer_stays_bounded(self):
+        contents = '<OFX>' + 'x' * 500 + '<STMTTRN><TRNAMT>1' + '0' * 500 + '</STMTTRN>'
+        stream = StringIO(contents)
+
+        with mock.patch.object(importers, 'OFX_READ_CHUNK_SIZE', 10), \
+                mock.patch.object(importers, 'OFX_MAX_TOKEN_SIZE', 50):
+            tokens = list(importers._read_ofx_tokens(stream))
+
+        self.assertEqual([tag for _, tag, _ in tokens], ['OFX', 'STMTTRN', 'TRNAMT', 'STMTTRN'])
+        self.assertTrue(all(len(value) <= 50 for _, _, value in tokens))
+
+    def test_invalid_rows_are_counted_with_a_capped_sample(self):
+        rows = ''.join(f'2026-03-{day:02d};Linha;abc\n' for day in range(1, 29)) * 3
+
+        with mock.patch('transactions.services.MAX_ERROR_SAMPLE', 5):
+            created, duplicates, errors = self.import_statement('date;description;amount\n' + rows)
+
+        self.assertEqual((created, len(errors), len(errors.sample)), (0, 84, 5))
+        self.assertEqual(errors.sample[0][0], 1)
+
+
+class MonthlyRollupTests(TransactionDataTestCase):
+    """
+    Tests for the monthly category rollups and the period reports read from them.
+    """
+
+    def get_key(self, month, transaction_type=Transaction.EXPENSE, category=None):
+        category = category or self.food
+        return (self.user.pk, self.account.pk, category.pk, 2026, month, transaction_type)
+
+    def get_totals(self, date_from, date_to):
+        return {
+            row['category__id']: (row['income'], row['expense'])
+            for row in get_category_totals(self.user, date_from, date_to)
+        }
+
+    def test_apply_deltas_creates_increments_and_never_resurrects_rows(self):
+        apply_rollup_deltas({self.get_key(1): (Decimal('10.00'), 1)})
+        apply_rollup_deltas({self.get_key(1): (Decimal('5.50'), 1), self.get_key(2): (Decimal('-3.00'), -1)})
+
+        rollup = MonthlyCategoryRollup.objects.get()
+        self.assertEqual((rollup.month, rollup.total, rollup.transaction_count), (1, Decimal('15.50'), 2))
+
+        apply_rollup_deltas({self.get_key(1): (Decimal('-15.50'), -2), self.get_key(3): (Decimal('0.00'), 0)})
+        rollup.refresh_from_db()
+        self.assertEqual((rollup.total, rollup.transaction_count), (Decimal('0.00'), 0))
+        self.assertEqual(MonthlyCategoryRollup.objects.count(), 1)
+
+    def test_write_path_keeps_rollups_consistent(self):
+        item = self.create_transaction(transaction_date=date(2026, 1, 15), amount='20.00')
+        self.create_transaction(transaction_date=date(2026, 2, 3), amount='7.00')
+        item.transaction_date = date(2026, 2, 20)
+        item.save()
+        item.delete()
+
+        self.assertEqual(list(find_rollup_mismatches([self.user.pk])), [])
+        self.assertEqual(
+            MonthlyCategoryRollup.objects.get(month=2, transaction_count__gt=0).total, Decimal('7.00')
+        )
+
+    def test_totals_read_full_months_from_rollups_and_edges_from_transactions(self):
+        self.create_transaction(transaction_date=date(2026, 1, 10), amount='1.00')
+        self.create_transaction(transaction_date=date(2026, 1, 20), amount='2.00')
+        self.create_transaction(transaction_date=date(2026, 2, 14), amount='4.00')
+        self.create_transaction(transaction_date=date(2026, 3, 10), amount='8.00')
+        self.create_transaction(transaction_date=date(2026, 3, 25), amount='16.00')
+        self.create_transaction(transaction_date=date(2026, 2, 1), amount='100.00', category=self.salary)
+
+        # Partial January and March, whole February
+        expected = {
+            self.food.pk: (Decimal('0.00'), Decimal('14.00')),
+            self.salary.pk: (Decimal('100.00'), Decimal('0.00')),
+        }
+        self.assertEqual(self.get_totals(date(2026, 1, 15), date(2026, 3, 15)), expected)
+
+        # A stale February rollup shows up, the edge months come from the raw rows
+        MonthlyCategoryRollup.objects.filter(month=2, category=self.food).update(total=Decimal('40.00'))
+        MonthlyCategoryRollup.objects.filter(month__in=[1, 3]).update(total=Decimal('999.00'))
+        expected[self.food.pk] = (Decimal('0.00'), Decimal('50.00'))
+        self.assertEqual(self.get_totals(date(2026, 1, 15), date(2026, 3, 15)), expected)
+
+        # A period inside one month only reads transactions
+        self.assertEqual(
+            self.get_totals(date(2026, 3, 5), date(2026, 3, 20)),
+            {self.food.pk: (Decimal('0.00'), Decimal('8.00'))},
+        )
+
+
+class KeysetPaginationTests(TransactionDataTestCase):
+    """
+    Tests for the keyset pagination of the transaction list.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        Transaction.objects.bulk_create([
+            Transaction(
+                user=cls.user,
+                account=cls.account,
+                category=cls.food,
+                description=f'Mercado {index}',
+                amount=Decimal('1.00'),
+                transaction_type=Transaction.EXPENSE,
+                transaction_date=date(2026, 1, 1 + index % 3),
+            )
+            for index in range(11)
+        ])
+        # Ties on date and on created_at leave only the id to order them
+        created_at = Transaction.objects.first().created_at
+        Transaction.objects.filter(user=cls.user).update(created_at=created_at)
+
+    def setUp(self):
+        self.queryset = Transaction.objects.filter(user=self.user)
+        self.expected = list(self.queryset.order_by('-transaction_date', '-created_at', '-id'))
+
+    def test_cursor_round_trip_and_invalid_cursors(self):
+        item = self.expected[0]
+        key = (item.transaction_date, item.created_at, item.pk)
+
+        self.assertEqual(decode_cursor(encode_cursor(key, BACKWARD)), (key, BACKWARD))
+        self.assertEqual(decode_cursor(encode_cursor(None, BACKWARD)), (None, BACKWARD))
+        for cursor in ('', None, 'not a cursor', encode_cursor(key, FORWARD)[:-3], 'eyJkIjoieCJ9'):
+            self.assertEqual(decode_cursor(cursor), (None, FORWARD))
+
+    def test_forward_pages_cover_every_row_once(self):
+        paginator = KeysetPaginator(self.queryset, per_page=3)
+        page = paginator.get_page()
+        self.assertFalse(page.has_previous())
+
+        rows = []
+        while True:
+            rows += page.object_list
+            if not page.has_next():
+                break
+            page = paginator.get_page(page.next_cursor)
+
+        self.assertEqual(rows, self.expected)
+        self.assertEqual(len(page), 2)
+        self.assertTrue(page.has_previous())
+
+    def test_backward_pages_from_the_last_page(self):
+        paginator = KeysetPaginator(self.queryset, per_page=3)
+        page = paginator.get_page(paginator.get_page().last_cursor)
+        self.assertFalse(page.has_next())
+        self.assertEqual(page.object_list, self.expected[-3:])
+
+        pages = [page.object_list]
+        while page.has_previous():
+            page = paginator.get_page(page.previous_cursor)
+            pages.insert(0, page.object_list)
+            self.assertTrue(page.has_next())
+
+        # The walk ends on a full first page, which may overlap the page after it
+        self.assertEqual(pages[0], self.expected[:3])
+        self.assertEqual(pages[1:], [self.expected[2:5], self.expected[5:8], self.expected[8:]])
+
+    def test_count_is_capped(self):
+        paginator = KeysetPaginator(self.queryset, per_page=3, count_cap=5)
+        self.assertEqual((paginator.count, paginator.count_is_capped), (5, True))
+
+        paginator = KeysetPaginator(self.queryset, per_page=3, count_cap=11)
+        self.assertEqual((paginator.count, paginator.count_is_capped), (11, False))
+
+
+class DailyBalanceSnapshotTests(TransactionDataTestCase):
+    """
+    Tests for the daily balance snapshots behind the balance series.
+    """
+
+    initial_balance = Decimal('100.00')
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.other_account = Account.objects.create(user=cls.user, name='Poupança')
+
+    def get_snapshots(self, account=None):
+        return list(
+            DailyBalanceSnapshot.objects.filter(account=account or self.account)
+            .order_by('date').values_list('date', 'net_total')
+        )
+
+    def test_extend_writes_running_totals_once(self):
+        self.create_transaction(transaction_date=date(2026, 3, 2), amount='10.00')
+        self.create_transaction(transaction_date=date(2026, 3, 2), amount='5.00')
+        self.create_transaction(transaction_date=date(2026, 3, 4), amount='2.50')
+
+        extend_snapshots(self.account, date(2026, 3, 5))
+
+        self.assertEqual(self.get_snapshots(), [
+            (date(2026, 3, 2), Decimal('-15.00')),
+            (date(2026, 3, 4), Decimal('-17.50')),
+            (date(2026, 3, 5), Decimal('-17.50')),
+        ])
+        with self.assertNumQueries(1):
+            extend_snapshots(self.account, date(2026, 3, 5))
+
+    def test_invalidate_only_deletes_from_the_date_forward(self):
+        self.create_transaction(transaction_date=date(2026, 3, 2), amount='10.00')
+        self.create_transaction(transaction_date=date(2026, 3, 6), amount='10.00', account=self.other_account)
+        extend_snapshots(self.account, date(2026, 3, 8))
+        extend_snapshots(self.other_account, date(2026, 3, 8))
+
+        invalidate_snapshots({self.account.pk: date(2026, 3, 3)})
+
+        self.assertEqual(self.get_snapshots(), [(date(2026, 3, 2), Decimal('-10.00'))])
+        self.assertEqual(len(self.get_snapshots(self.other_account)), 2)
+
+    def test_back_dated_write_invalidates_later_snapshots(self):
+        self.create_transaction(transaction_date=date(2026, 3, 2), amount='10.00')
+        self.create_transaction(transaction_date=date(2026, 3, 6), amount='20.00')
+        self.assertEqual(get_balance_series(self.account, date(2026, 3, 5), date(2026, 3, 6)), [
+            (date(2026, 3, 5), Decimal('90.00')),
+            (date(2026, 3, 6), Decimal('70.00')),
+        ])
+
+        item = self.create_transaction(transaction_date=date(2026, 3, 4), amount='5.00')
+        self.assertEqual(self.get_snapshots(), [(date(2026, 3, 2), Decimal('-10.00'))])
+        self.assertEqual(get_balance_series(self.account, date(2026, 3, 5), date(2026, 3, 6)), [
+            (date(2026, 3, 5), Decimal('85.00')),
+            (date(2026, 3, 6), Decimal('65.00')),
+        ])
+
+        item.transaction_date = date(2026, 3, 1)
+        item.save()
+        self.assertEqual(self.get_snapshots(), [])
+        self.assertEqual(get_balance_series(self.account, date(2026, 3, 1), date(2026, 3, 2)), [
+            (date(2026, 3, 1), Decimal('95.00')),
+            (date(2026, 3, 2), Decimal('85.00')),
+        ])
+
+    def test_series_reaches_the_last_representable_date(self):
+        self.create_transaction(transaction_date=date(2026, 3, 2), amount='10.00')
+
+        self.assertEqual(get_balance_series(self.account, date.max - timedelta(days=1), date.max), [
+            (date.max - timedelta(days=1), Decimal('90.00')),
+            (date.max, Decimal('90.00')),
+        ])
+
+
+class CategoryCounterTests(TransactionDataTestCase):
+    """
+    Tests for the category usage counters maintained by the write paths.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.transport = Category.objects.get(user=cls.user, name='Transporte')
+
+    def assertCounters(self, category, total, count):
+        category.refresh_from_db()
+        self.assertEqual((category.transaction_total, category.transaction_count), (Decimal(total), count))
+        self.assertEqual(find_category_counter_mismatches([self.user.pk]), [])
+
+    def test_create_update_and_delete_keep_counters_exact(self):
+        first = self.create_transaction(amount='10.00')
+        self.create_transaction(amount='2.50')
+        self.assertCounters(self.food, '12.50', 2)
+
+        first.amount = Decimal('20.00')
+        first.save()
+        self.assertCounters(self.food, '22.50', 2)
+
+        first.category = self.transport
+        first.save()
+        self.assertCounters(self.food, '2.50', 1)
+        self.assertCounters(self.transport, '20.00', 1)
+
+        first.delete()
+        self.assertCounters(self.transport, '0.00', 0)
+
+    def test_bulk_paths_and_archive_keep_counters_exact(self):
+        items = [self.create_transaction(amount='5.00') for _ in range(3)]
+        self.create_transaction(amount='7.00', transaction_date=get_archive_cutoff().replace(year=2000))
+        archive_transactions(get_archive_cutoff())
+        self.assertCounters(self.food, '22.00', 4)
+
+        bulk_update_transactions(Transaction.objects.filter(pk=items[0].pk), category=self.transport)
+        bulk_delete_transactions(Transaction.objects.filter(pk=items[1].pk))
+        self.assertCounters(self.food, '12.00', 2)
+        self.assertCounters(self.transport, '5.00', 1)
+
+    def test_repair_command_corrects_drifted_counters(self):
+        self.create_transaction(amount='10.00')
+        Category.objects.filter(pk=self.food.pk).update(transaction_total=Decimal('99.00'), transaction_count=9)
+
+        self.assertEqual(
+            find_category_counter_mismatches([self.user.pk]),
+            [(self.food.pk, self.user.pk, (Decimal('99.00'), 9), (Decimal('10.00'), 1))],
+        )
+        call_command('repair_category_counters', '--check', stdout=StringIO())
+        self.assertEqual(len(find_category_counter_mismatches([self.user.pk])), 1)
+
+        call_command('repair_category_counters', stdout=StringIO())
+        self.assertCounters(self.food, '10.00', 1)
+
+
+class TransactionExportTests(TransactionDataTestCase):
+    """
+    Tests for the streaming CSV and XLSX export of the filtered transaction list.
+    """
+
+    def setUp(self):
+        self.client.force_login(self.user)
+        self.create_transaction(description='Mercado\x01 Central', amount='1234.56', transaction_date=date(2026, 3, 5))
+        self.create_transaction(
+            description='Salário', amount='5000.00', category=self.salary, transaction_date=date(2026, 3, 6)
+        )
+        self.create_transaction(description='Padaria', transaction_date=date(2026, 1, 2))
+        self.create_foreign_transaction('other-export@example.com', transaction_date=date(2026, 3, 7))
+
+    def export(self, export_format):
+        response = self.client.get(reverse('transactions:export'), {'format': export_format, 'date_from': '2026-03-01'})
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content)
+
+    def test_csv_export(self):
+        content = self.export('csv').decode('utf-8')
+
+        self.assertTrue(content.startswith('\ufeff'))
+        self.assertEqual(list(csv.reader(StringIO(content[1:]))), [
+            ['Data', 'Descrição', 'Tipo', 'Categoria', 'Conta', 'Valor'],
+            ['2026-03-06', 'Salário', 'Receita', 'Salário', 'Conta Corrente', '5000.00'],
+            ['2026-03-05', 'Mercado\x01 Central', 'Despesa', 'Alimentação', 'Conta Corrente', '1234.56'],
+        ])
+
+    @skipIf(openpyxl is None, 'openpyxl is not installed')
+    def test_xlsx_export_opens_with_typed_cells(self):
+        workbook = openpyxl.load_workbook(BytesIO(self.export('xlsx')))
+        rows = list(workbook.active.iter_rows(values_only=True))
+
+        self.assertEqual(rows, [
+            ('Data', 'Descrição', 'Tipo', 'Categoria', 'Conta', 'Valor'),
+            (datetime(2026, 3, 6), 'Salário', 'Receita', 'Salário', 'Conta Corrente', 5000),
+            (datetime(2026, 3, 5), 'Mercado Central', 'Despesa', 'Alimentação', 'Conta Corrente', 1234.56),
+        ])
+        self.assertEqual(workbook.active['A2'].number_format, 'dd/mm/yyyy')
+
+
+class TransactionIngestionTests(TransactionDataTestCase):
+    """
+    Tests for the batched bulk ingestion service and the ingest_transactions command.
+    """
+
+    initial_balance = Decimal('100.00')
+
+    def get_rows(self):
+        """
+        Seven valid rows (two incomes, five expenses) with three invalid rows mixed in.
+        """
+        def row(amount, category, transaction_type, day, **overrides):
+            values = {
+                'description': 'Lançamento',
+                'amount': amount,
+                'transaction_date': f'2026-03-{day:02d}',
+                'transaction_type': transaction_type,
+                'category': str(category.pk),
+                'account': str(self.account.pk),
+            }
+            values.update(overrides)
+            return values
+
+        return [
+            row('10.00', self.food, Transaction.EXPENSE, 1),
+            row('1000.00', self.salary, Transaction.INCOME, 1),
+            row('abc', self.food, Transaction.EXPENSE, 2),
+            row('5.50', self.food, Transaction.EXPENSE, 2),
+            row('7.00', self.salary, Transaction.EXPENSE, 3),
+            row('2.00', self.food, Transaction.EXPENSE, 3),
+            row('3.00', self.food, Transaction.EXPENSE, 4),
+            row('4.00', self.food, Transaction.EXPENSE, 4, account='999999'),
+            row('500.00', self.salary, Transaction.INCOME, 5),
+            row('1.50', self.food, Transaction.EXPENSE, 5),
+        ]
+
+    def assertIngested(self):
+        self.account.refresh_from_db()
+        self.food.refresh_from_db()
+        self.assertEqual(self.account.current_balance, Decimal('1578.00'))
+        self.assertEqual((self.food.transaction_total, self.food.transaction_count), (Decimal('22.00'), 5))
+        self.assertEqual(
+            MonthlyCategoryRollup.objects.get(category=self.salary).total, Decimal('1500.00')
+        )
+        self.assertTotalsConsistent()
+
+    def test_batches_skip_and_count_invalid_rows(self):
+        with mock.patch('transactions.services.MAX_ERROR_SAMPLE', 2):
+            created, errors = bulk_create_transactions(self.user, iter(self.get_rows()), batch_size=3)
+
+        self.assertEqual((created, len(errors)), (7, 3))
+        self.assertEqual([row_number for row_number, _ in errors.sample], [3, 5])
+        self.assertIngested()
+
+    def test_command_loads_a_csv_file(self):
+        rows = self.get_rows()
+        contents = StringIO()
+        writer = csv.DictWriter(contents, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+        with NamedTemporaryFile('w', suffix='.csv', encoding='utf-8') as csv_file:
+            csv_file.write(contents.getvalue())
+            csv_file.flush()
+            output = StringIO()
+            call_command('ingest_transactions', csv_file.name, user_id=self.user.pk, batch_size=4, stdout=output)
+
+        self.assertIn('TOTAL: 7 transactions created, 3 rows skipped', output.getvalue())
+        self.assertIn('Row 8:', output.getvalue())
+        self.assertIngested()
+
+
+class ReconcileBalancesCommandTests(TransactionDataTestCase):
+    """
+    Tests for the reconcile_balances command.
+    """
+
+    initial_balance = Decimal('100.00')
+
+    def setUp(self):
+        self.create_transaction(amount='30.00')
+        self.create_transaction(amount='500.00', category=self.salary)
+        self.create_transaction(amount='20.00', transaction_date=get_archive_cutoff().replace(year=2000))
+        archive_transactions(get_archive_cutoff())
+        # Another user's consistent account is checked but left alone
+        self.create_foreign_transaction('other-reconcile@example.com')
+
+    def reconcile(self, *args):
+        output = StringIO()
+        call_command('reconcile_balances', '--workers', '1', *args, stdout=output)
+        return output.getvalue()
+
+    def test_reports_and_fixes_drift_including_archived_rows(self):
+        self.assertEqual(ArchivedTransaction.objects.filter(user=self.user).count(), 1)
+        self.assertIn('account balances are consistent', self.reconcile())
+
+        Account.objects.filter(pk=self.account.pk).update(current_balance=Decimal('600.00'))
+
+        output = self.reconcile()
+        self.assertIn(
+            f'Account {self.account.pk} (user {self.user.pk}): '
+            'stored R$ 600.00, expected R$ 550.00 (drift R$ 50.00)',
+            output,
+        )
+        self.assertIn('TOTAL: 1 of 2 accounts have drifted', output)
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.current_balance, Decimal('600.00'))
 
-# Create your tests here.
+        self.assertIn('Corrected 1 account balances', self.reconcile('--fix'))
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.current_balance, Decimal('550.00'))
+        self.assertIn('account balances are consistent', self.reconcile())
@@ -2,6 +2,8 @@ from django.urls import path
 
 from .views import (
     TransactionListView,
+    TransactionExportView,
+    TransactionBulkActionView,
     TransactionCreateView,
     TransactionDetailView,
     TransactionUpdateView,
@@ -12,6 +14,8 @@ app_name = 'transactions'
 
 urlpatterns = [
     path('', TransactionListView.as_view(), name='list'),
+    path('export/', TransactionExportView.as_view(), name='export'),
+    path('bulk/', TransactionBulkActionView.as_view(), name='bulk_action'),
     path('create/', TransactionCreateView.as_view(), name='create'),
     path('<int:pk>/', TransactionDetailView.as_view(), name='detail'),
     path('<int:pk>/edit/', TransactionUpdateView.as_view(), name='update'),
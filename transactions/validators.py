@@ -0,0 +1,75 @@
+"""
+Validation rules for the transactions app.
+
+Shared by TransactionForm and the bulk ingestion services so that rows
+imported in batches follow exactly the same rules as the web form,
+without building a form instance per row.
+"""
+
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+
+from .models import Transaction
+
+
+def validate_amount(amount):
+    """
+    Ensure the amount is present and positive (greater than 0).
+
+    Raises:
+        ValidationError: If the amount is missing or not positive
+    """
+    if amount is None:
+        raise ValidationError('O valor é obrigatório')
+
+    if amount <= Decimal('0'):
+        raise ValidationError(
+            'O valor deve ser maior que zero. '
+            'Informe apenas valores positivos.'
+        )
+
+    return amount
+
+
+def validate_category(category, user, transaction_type=None):
+    """
+    Ensure the category belongs to the user and matches the transaction type.
+
+    Raises:
+        ValidationError: If the category belongs to another user or has the wrong type
+    """
+    # Verify the category belongs to the user
+    if category.user_id != user.pk:
+        raise ValidationError('Selecione uma categoria válida')
+
+    # Verify the category type matches the transaction type
+    if transaction_type and category.category_type != transaction_type:
+        type_label = 'receita' if transaction_type == Transaction.INCOME else 'despesa'
+        raise ValidationError(
+            f'A categoria selecionada não é do tipo {type_label}. '
+            f'Selecione uma categoria compatível.'
+        )
+
+    return category
+
+
+def validate_account(account, user):
+    """
+    Ensure the account belongs to the user and is active.
+
+    Raises:
+        ValidationError: If the account belongs to another user or is inactive
+    """
+    # Verify the account belongs to the user
+    if account.user_id != user.pk:
+        raise ValidationError('Selecione uma conta válida')
+
+    # Verify the account is active
+    if not account.is_active:
+        raise ValidationError(
+            'A conta selecionada está inativa. '
+            'Selecione uma conta ativa.'
+        )
+
+    return account
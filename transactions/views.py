@@ -5,49 +5,63 @@ from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.contrib.messages.views import SuccessMessageMixin
 from django.db.models import Sum, Q
-from django.urls import reverse_lazy
+from django.http import StreamingHttpResponse
+from django.shortcuts import redirect
+from django.urls import reverse, reverse_lazy
+from django.utils.http import url_has_allowed_host_and_scheme
+from django.views import View
 from django.views.generic import ListView, CreateView, UpdateView, DeleteView, DetailView
 
-from .forms import TransactionForm, TransactionFilterForm
-from .models import Transaction
+from . import exporters
+from .archive import CombinedQuerySet, reaches_archive
+from .choices import get_user_choices
+from .forms import TransactionBulkActionForm, TransactionForm, TransactionFilterForm
+from .models import ArchivedTransaction, Transaction
+from .pagination import KeysetPaginator
+from .recurring import create_rule_from_transaction
+from .search import search_transactions
+from .services import bulk_delete_transactions, bulk_update_transactions
 
 
-class TransactionListView(LoginRequiredMixin, ListView):
+class TransactionFilterMixin:
     """
-    Display list of user's transactions with filtering capabilities.
-    Filters transactions to show only those belonging to the current user.
-    Supports filtering by date range, transaction type, category, and account.
-    Orders by transaction_date descending, then created_at descending.
-    Includes pagination (20 items per page).
-    Optimizes queries with select_related for account and category.
-    Calculates filtered totals for income, expense, and balance.
+    Build the current user's transaction queryset filtered by GET parameters.
+    Shared by the list and export views so both apply exactly the same filters.
     """
-    model = Transaction
-    template_name = 'transactions/transaction_list.html'
-    context_object_name = 'transactions'
-    paginate_by = 20
 
-    def get_queryset(self):
+    def get_filtered_queryset(self):
         """
-        Filter transactions to only show those belonging to current user.
+        Filter transactions to only those belonging to current user.
         Apply additional filters based on GET parameters (date_from, date_to,
-        transaction_type, category, account).
-        Order by transaction_date desc, then created_at desc.
-        Use select_related to optimize database queries.
+        transaction_type, category, account, q).
+        When the date filters reach back before the archive cutoff, archived
+        transactions are combined with the live ones (see transactions.archive).
         """
-        queryset = Transaction.objects.filter(
-            user=self.request.user
-        ).select_related(
-            'account',
-            'category'
-        )
+        queryset = self.apply_filters(
+            Transaction.objects.filter(user=self.request.user)
+        ).order_by('-transaction_date', '-created_at')
 
+        date_from = parse_date_param(self.request.GET.get('date_from'))
+        date_to = parse_date_param(self.request.GET.get('date_to'))
+        if reaches_archive(date_from, date_to):
+            archived = self.apply_filters(
+                ArchivedTransaction.objects.filter(user=self.request.user)
+            ).order_by('-transaction_date', '-created_at')
+            return CombinedQuerySet(queryset, archived)
+
+        return queryset
+
+    def apply_filters(self, queryset):
+        """
+        Apply the GET parameter filters to a live or archived transaction queryset.
+        """
         # Apply filters based on GET parameters
         date_from = self.request.GET.get('date_from')
         date_to = self.request.GET.get('date_to')
         transaction_type = self.request.GET.get('transaction_type')
         category_id = self.request.GET.get('category')
         account_id = self.request.GET.get('account')
+        search_query = self.request.GET.get('q')
 
         # Filter by date_from
         if date_from:
@@ -69,7 +83,67 @@ class TransactionListView(LoginRequiredMixin, ListView):
         if account_id:
             queryset = queryset.filter(account_id=account_id)
 
-        return queryset.order_by('-transaction_date', '-created_at')
+        # Search the description through the full-text index
+        if search_query:
+            queryset = search_transactions(queryset, search_query)
+
+        return queryset
+
+
+def parse_date_param(value):
+    """
+    Return the date of an ISO formatted GET parameter, or None if missing or invalid.
+    """
+    try:
+        return date.fromisoformat(value) if value else None
+    except ValueError:
+        return None
+
+
+class TransactionListView(LoginRequiredMixin, TransactionFilterMixin, ListView):
+    """
+    Display list of user's transactions with filtering capabilities.
+    Filters transactions to show only those belonging to the current user.
+    Supports filtering by date range, transaction type, category, and account,
+    and searching the description.
+    Orders by transaction_date descending, then created_at descending.
+    Includes pagination (20 items per page), using keyset (cursor) pagination
+    by default so deep pages cost the same as the first one.
+    Reads account and category labels from the cached reference data.
+    Calculates filtered totals for income, expense, and balance.
+    """
+    model = Transaction
+    template_name = 'transactions/transaction_list.html'
+    context_object_name = 'transactions'
+    paginate_by = 20
+
+    # 'keyset' for cursor pagination, 'offset' for classic numbered pages
+    pagination_mode = 'keyset'
+
+    def get_queryset(self):
+        """
+        Return the filtered transactions for the current user.
+        Account and category labels come from the cached reference data
+        (see paginate_queryset), so they are not joined.
+        """
+        return self.get_filtered_queryset()
+
+    def paginate_queryset(self, queryset, page_size):
+        """
+        Paginate with KeysetPaginator, addressed by the opaque 'cursor' GET parameter.
+        Falls back to Django's offset pagination when pagination_mode is 'offset'.
+        Attaches the accounts and categories of the page from the reference data.
+        """
+        if self.pagination_mode != 'keyset':
+            paginator, page, object_list, is_paginated = super().paginate_queryset(queryset, page_size)
+        else:
+            paginator = KeysetPaginator(queryset, page_size)
+            page = paginator.get_page(self.request.GET.get('cursor'))
+            object_list, is_paginated = page.object_list, page.has_other_pages()
+
+        object_list = list(object_list)
+        get_user_choices(self.request).reference.attach_to(object_list)
+        return paginator, page, object_list, is_paginated
 
     def get_context_data(self, **kwargs):
         """
@@ -81,21 +155,24 @@ class TransactionListView(LoginRequiredMixin, ListView):
         # Instantiate filter form with GET data and user
         context['filter_form'] = TransactionFilterForm(
             data=self.request.GET or None,
-            user=self.request.user
+            user=self.request.user,
+            choices=get_user_choices(self.request)
+        )
+        context['pagination_mode'] = self.pagination_mode
+        context['bulk_form'] = TransactionBulkActionForm(
+            user=self.request.user,
+            choices=get_user_choices(self.request),
+            auto_id='bulk_%s'
         )
 
-        # Get the filtered queryset (without pagination)
-        filtered_queryset = self.get_queryset()
-
-        # Calculate totals from filtered queryset
-        # Use aggregate to sum amounts by transaction type
-        income_total = filtered_queryset.filter(
-            transaction_type=Transaction.INCOME
-        ).aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
-
-        expense_total = filtered_queryset.filter(
-            transaction_type=Transaction.EXPENSE
-        ).aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
+        # Reuse the filtered queryset built by get() (without pagination) and
+        # compute both totals in a single conditional aggregate
+        totals = self.object_list.order_by().aggregate(
+            income=Sum('amount', filter=Q(transaction_type=Transaction.INCOME), default=Decimal('0.00')),
+            expense=Sum('amount', filter=Q(transaction_type=Transaction.EXPENSE), default=Decimal('0.00')),
+        )
+        income_total = totals['income']
+        expense_total = totals['expense']
 
         # Calculate balance (income - expense)
         balance = income_total - expense_total
@@ -108,6 +185,33 @@ class TransactionListView(LoginRequiredMixin, ListView):
         return context
 
 
+class TransactionExportView(LoginRequiredMixin, TransactionFilterMixin, View):
+    """
+    Export the filtered transaction list as CSV or XLSX.
+    Applies the same filters as TransactionListView and streams the file,
+    reading rows in chunks so the full result is never loaded into memory.
+    """
+
+    def get(self, request, *args, **kwargs):
+        """
+        Stream the export in the format requested by the 'format' GET parameter (csv or xlsx).
+        """
+        export_format = request.GET.get('format', exporters.CSV)
+        if export_format not in exporters.EXPORT_CONTENT_TYPES:
+            export_format = exporters.CSV
+
+        rows = exporters.iter_export_rows(self.get_filtered_queryset())
+        content = exporters.iter_xlsx(rows) if export_format == exporters.XLSX else exporters.iter_csv(rows)
+
+        response = StreamingHttpResponse(
+            content,
+            content_type=exporters.EXPORT_CONTENT_TYPES[export_format]
+        )
+        filename = f'transacoes-{date.today().isoformat()}.{export_format}'
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+
 class TransactionCreateView(LoginRequiredMixin, SuccessMessageMixin, CreateView):
     """
     Create a new transaction.
@@ -135,14 +239,19 @@ class TransactionCreateView(LoginRequiredMixin, SuccessMessageMixin, CreateView)
         """
         kwargs = super().get_form_kwargs()
         kwargs['user'] = self.request.user
+        kwargs['choices'] = get_user_choices(self.request)
         return kwargs
 
     def form_valid(self, form):
         """
         Set the user field to current user before saving.
+        Creates the recurring rule when the transaction is repeated.
         """
         form.instance.user = self.request.user
-        return super().form_valid(form)
+        response = super().form_valid(form)
+        if form.cleaned_data.get('repeat'):
+            create_rule_from_transaction(self.object, form.cleaned_data['repeat'])
+        return response
 
 
 class TransactionUpdateView(LoginRequiredMixin, UserPassesTestMixin, SuccessMessageMixin, UpdateView):
@@ -163,6 +272,7 @@ class TransactionUpdateView(LoginRequiredMixin, UserPassesTestMixin, SuccessMess
         """
         kwargs = super().get_form_kwargs()
         kwargs['user'] = self.request.user
+        kwargs['choices'] = get_user_choices(self.request)
         return kwargs
 
     def test_func(self):
@@ -200,6 +310,61 @@ class TransactionDeleteView(LoginRequiredMixin, UserPassesTestMixin, SuccessMess
         return super().delete(request, *args, **kwargs)
 
 
+class TransactionBulkActionView(LoginRequiredMixin, View):
+    """
+    Apply a bulk action to the transactions selected in the list.
+    Deletes them or moves them to another account or category with one
+    set-based statement, updating each affected account balance once.
+    """
+    http_method_names = ['post']
+
+    def post(self, request, *args, **kwargs):
+        """
+        Validate the TransactionBulkActionForm and run the selected action.
+        Redirects back to the list, keeping its filters.
+        """
+        form = TransactionBulkActionForm(
+            data=request.POST,
+            user=request.user,
+            choices=get_user_choices(request)
+        )
+
+        if not form.is_valid():
+            for errors in form.errors.values():
+                for error in errors:
+                    messages.error(request, error)
+            return redirect(self.get_success_url())
+
+        queryset = form.cleaned_data['transactions']
+        action = form.cleaned_data['action']
+
+        if action == TransactionBulkActionForm.DELETE:
+            count = bulk_delete_transactions(queryset)
+            messages.success(request, f'{count} transação(ões) excluída(s) com sucesso!')
+        else:
+            count = bulk_update_transactions(
+                queryset,
+                account=form.cleaned_data['account'] if action == TransactionBulkActionForm.MOVE_ACCOUNT else None,
+                category=form.cleaned_data['category'] if action == TransactionBulkActionForm.MOVE_CATEGORY else None,
+            )
+            messages.success(request, f'{count} transação(ões) atualizada(s) com sucesso!')
+
+        return redirect(self.get_success_url())
+
+    def get_success_url(self):
+        """
+        Return the list URL with the filters the action was submitted from.
+        """
+        next_url = self.request.POST.get('next')
+        if next_url and url_has_allowed_host_and_scheme(
+            next_url,
+            allowed_hosts={self.request.get_host()},
+            require_https=self.request.is_secure()
+        ):
+            return next_url
+        return reverse('transactions:list')
+
+
 class TransactionDetailView(LoginRequiredMixin, UserPassesTestMixin, DetailView):
     """
     Display detailed information about a transaction.